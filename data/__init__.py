@@ -0,0 +1,7 @@
+"""
+Shared helpers of the WARRA scripts (number/date parsing, schemas, exports,
+reconciliation, HTTP downloads, batch jobs).
+
+The repository is installed in editable mode (``pipenv install`` or
+``pip install -e .``), so every script imports them as ``from data.<module> import ...``.
+"""
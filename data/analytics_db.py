@@ -0,0 +1,194 @@
+"""
+Local analytical database with every output table of data/csv.
+
+Loading dozens of CSV files with pandas for every question gets slow as
+more Anfragen are added. build_database() writes all datasets (with the
+column types of dataset_schema.py) and the long fact table into a single
+SQLite file, indexes (Date, LST, FG-Code) and creates views for the common
+plot inputs:
+
+    python data/analytics_db.py
+    query('SELECT LST, SUM(Gesamt) FROM oegk_antraege_pro_bundesland WHERE "FG-Code" IS NOT NULL GROUP BY LST')
+    read_view("oegk_betraege_pro_fachrichtung")
+
+SQLite ships with Python, so the database needs no extra packages. Dates are
+stored as "YYYY-MM" text, which sorts and compares like the dates. FG-Code is
+a nullable INTEGER; totals over all Fachrichtungen ("ALL" in dataset 01 and
+the Gesamt rows) are NULL.
+"""
+
+import os
+import sqlite3
+
+import pandas as pd
+
+from data.dataset_schema import CSV_DIR, DATASET_SCHEMAS, TEXT, apply_schema, load_dataset
+
+DATA_DIR = os.path.dirname(os.path.abspath(__file__))
+DATABASE_PATH = os.path.join(DATA_DIR, "warra.sqlite")
+
+# Columns indexed together in every table that has them
+INDEX_COLUMNS = ["Date", "LST", "FG-Code"]
+FACT_TABLE_INDEX_COLUMNS = ["measure", "insurer", "bundesland", "period"]
+
+# Views for the inputs of the plot scripts: view name -> SELECT
+VIEWS = {
+    "oegk_antraege_bundesweit": """
+        SELECT * FROM "03_OEGK_Antraege_pro_Monat_2023_pro_Fachrichtung_online_postal_Bundesweit"
+    """,
+    "oegk_antraege_pro_bundesland": """
+        SELECT * FROM "04_OEGK_Antraege_pro_Monat_2023_pro_Fachrichtung_online_postal_pro_Bundesland"
+    """,
+    # 2023 and the historical processing times in one view (both cover Jan-May 2023)
+    "oegk_bearbeitungszeit": """
+        SELECT Date, LST, Bundesland_pretty, Postal, OnlineMeine, OnlineWAH, '2023' AS source
+        FROM "07_OEGK_Durchschnittliche_Bearbeitungszeit_pro_Monat_2023_postal_online_online_pro_Bundesland"
+        UNION ALL
+        SELECT Date, LST, Bundesland_pretty, Postal, OnlineMeine, NULL AS OnlineWAH, 'historical' AS source
+        FROM "07a_OEGK_Durchschnittliche_Bearbeitungszeit_pro_Monat_2021_bis_Mai_2023_postal_online_online_pro_Bundesland"
+    """,
+    # Beträge per Fachrichtung with the average monthly Anträge (plot_oegk_betraege_pro_fachrichtung.py)
+    "oegk_betraege_pro_fachrichtung": """
+        SELECT b.*, a.Gesamt
+        FROM "02_OEGK_Betraege_pro_Fachrichtung_2023" AS b
+        LEFT JOIN (
+            SELECT Fachrichtung, AVG(Gesamt) AS Gesamt
+            FROM "03_OEGK_Antraege_pro_Monat_2023_pro_Fachrichtung_online_postal_Bundesweit"
+            GROUP BY Fachrichtung
+        ) AS a USING (Fachrichtung)
+    """,
+    # Yearly totals of all insurers (plot_insurance_comparison_*.py)
+    "insurance_yearly_totals": """
+        SELECT insurer, period, measure, value
+        FROM fact_table
+        WHERE bundesland = 'Gesamt'
+          AND source IN ('BVAEB_Betraege_updated', 'OEGK_Betraege_updated2025', 'SVS_Betraege_updated')
+    """,
+}
+
+
+def connect(path=DATABASE_PATH):
+    """Open the database (created if it does not exist)."""
+    return sqlite3.connect(path)
+
+
+def _sql_type(dtype):
+    """SQLite column type for a pandas dtype."""
+    if pd.api.types.is_integer_dtype(dtype) or pd.api.types.is_bool_dtype(dtype):
+        return "INTEGER"
+    if pd.api.types.is_float_dtype(dtype):
+        return "REAL"
+    return "TEXT"
+
+
+def _to_sql_frame(df):
+    """Convert Periods and categoricals to plain values SQLite can store (FG-Codes stay integers)."""
+    converted = {}
+    for column, dtype in df.dtypes.items():
+        if isinstance(dtype, pd.PeriodDtype):
+            converted[column] = df[column].astype(TEXT).mask(df[column].isna())
+        elif isinstance(dtype, pd.CategoricalDtype):
+            converted[column] = df[column].astype(dtype.categories.dtype)
+    return df.assign(**converted)
+
+
+def write_table(connection, df, name, index_columns=INDEX_COLUMNS):
+    """
+    Write a DataFrame as a table (replacing it) and index it.
+
+    Args:
+        connection: open database connection
+        df: DataFrame to write (named index levels are written as columns, an unnamed index is not)
+        name: table name
+        index_columns: columns to index together; columns missing in df are left out
+    """
+    named_index = any(level is not None for level in df.index.names)
+    table = _to_sql_frame(df.reset_index(drop=not named_index))
+    table.to_sql(
+        name, connection, if_exists="replace", index=False,
+        dtype={column: _sql_type(dtype) for column, dtype in table.dtypes.items()},
+    )
+
+    indexed = [column for column in index_columns if column in table.columns]
+    if indexed:
+        column_list = ", ".join(f'"{column}"' for column in indexed)
+        connection.execute(f'CREATE INDEX IF NOT EXISTS "idx_{name}" ON "{name}" ({column_list})')
+    connection.commit()
+
+
+def create_views(connection, views=VIEWS):
+    """(Re)create the saved views whose tables exist in the database."""
+    for name, select in views.items():
+        connection.execute(f'DROP VIEW IF EXISTS "{name}"')
+        try:
+            connection.execute(f'CREATE VIEW "{name}" AS {select}')
+            # SQLite only resolves the tables of a view when it is used
+            connection.execute(f'SELECT * FROM "{name}" LIMIT 0')
+        except sqlite3.OperationalError as e:
+            print(f"Skipping view {name}: {e}")
+            connection.execute(f'DROP VIEW IF EXISTS "{name}"')
+    connection.commit()
+
+
+def build_database(path=DATABASE_PATH, csv_dir=CSV_DIR, include_fact_table=True):
+    """
+    Load every dataset in csv_dir (and the fact table) into the database.
+
+    Datasets without a CSV file in csv_dir are skipped.
+
+    Returns:
+        List of the tables written
+    """
+    tables = []
+    with connect(path) as connection:
+        for dataset in DATASET_SCHEMAS:
+            if not os.path.exists(os.path.join(csv_dir, f"{dataset}.csv")):
+                continue
+            write_table(connection, load_dataset(dataset, csv_dir=csv_dir), dataset)
+            tables.append(dataset)
+
+        if include_fact_table:
+            from data.fact_table import build_fact_table
+            write_table(connection, build_fact_table(), "fact_table", index_columns=FACT_TABLE_INDEX_COLUMNS)
+            tables.append("fact_table")
+
+        create_views(connection)
+    connection.close()
+    return tables
+
+
+def write_dataset(df, dataset, path=DATABASE_PATH):
+    """Write a single DataFrame to the database, with its schema if it is a known dataset."""
+    if dataset in DATASET_SCHEMAS:
+        df = apply_schema(df, dataset)
+    connection = connect(path)
+    try:
+        write_table(connection, df, dataset)
+    finally:
+        connection.close()
+    return path
+
+
+def query(sql, params=(), path=DATABASE_PATH):
+    """Run a SELECT and return the result as a DataFrame."""
+    connection = connect(path)
+    try:
+        return pd.read_sql_query(sql, connection, params=params)
+    finally:
+        connection.close()
+
+
+def read_view(name, path=DATABASE_PATH, **filters):
+    """Read a saved view (or table), optionally filtered by column values (pushed down to SQL)."""
+    conditions = " AND ".join(f'"{column}" = ?' for column in filters)
+    where = f" WHERE {conditions}" if conditions else ""
+    return query(f'SELECT * FROM "{name}"{where}', params=tuple(filters.values()), path=path)
+
+
+def main():
+    tables = build_database()
+    print(f"Wrote {len(tables)} tables and {len(VIEWS)} views to {DATABASE_PATH}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""
+Serial or parallel execution of independent jobs for the batch drivers
+(raw_data/ingest_anfragen.py and visualize/warra_plot.py).
+
+    failures = run_jobs(ingest_beilage, jobs, num_jobs=4, verb="Ingesting", describe="/".join)
+
+A failing job is reported and collected; it does not stop the other jobs.
+"""
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+
+def run_jobs(function, jobs, num_jobs=1, verb="Running", describe=str, **kwargs):
+    """
+    Call function(*job, **kwargs) for every job, in parallel worker processes if num_jobs > 1.
+
+    Args:
+        function: module-level function (picklable for the worker processes)
+        jobs: tuples of positional arguments, one per job
+        num_jobs: number of worker processes; 1 runs the jobs in this process
+        verb: progress verb, e.g. "Ingesting" ("Ingesting X...", "Error ingesting X: ...")
+        describe: returns the short description of a job used in the messages
+        **kwargs: keyword arguments passed to every call
+
+    Returns:
+        List of (job, exception) for the jobs that failed
+    """
+    failures = []
+    if num_jobs <= 1:
+        for job in jobs:
+            print(f"{verb} {describe(job)}...")
+            try:
+                function(*job, **kwargs)
+            except Exception as e:
+                print(f"Error {verb.lower()} {describe(job)}: {e}")
+                failures.append((job, e))
+        return failures
+
+    with ProcessPoolExecutor(max_workers=num_jobs) as executor:
+        futures = {executor.submit(function, *job, **kwargs): job for job in jobs}
+        for future in as_completed(futures):
+            job = futures[future]
+            try:
+                future.result()
+                print(f"Done: {describe(job)}")
+            except Exception as e:
+                print(f"Error {verb.lower()} {describe(job)}: {e}")
+                failures.append((job, e))
+    return failures
@@ -3,6 +3,8 @@ import io
 import os
 import sys
 
+from data.german_numbers import parse_german_integer
+
 # Get the input file path from command line or use default
 input_file = "data/csv/manually_extracted/BVAEB_Betraege_updated.txt"
 if len(sys.argv) > 1:
@@ -49,8 +51,8 @@ while i < erstattungsbetrage_start and current_bl_index < len(bundeslaender):
     values = []
     for j in range(1, 6):  # 5 years of data
         if i + j < len(lines):
-            value = lines[i + j].strip().replace('.', '')
-            values.append(value)
+            values.append(lines[i + j].strip())
+    values = parse_german_integer(values).tolist()  # Whole Euro amounts like "14.788.694"
     
     rechnungsbetrage[bundesland] = values
     i += 6  # Move to the next Bundesland (1 label + 5 values)
@@ -66,8 +68,8 @@ while i < len(lines) and current_bl_index < len(bundeslaender):
     values = []
     for j in range(1, 6):  # 5 years of data
         if i + j < len(lines):
-            value = lines[i + j].strip().replace('.', '')
-            values.append(value)
+            values.append(lines[i + j].strip())
+    values = parse_german_integer(values).tolist()  # Whole Euro amounts like "14.788.694"
     
     erstattungsbetrage[bundesland] = values
     i += 6  # Move to the next Bundesland (1 label + 5 values)
@@ -8,12 +8,25 @@ import pandas as pd
 import json
 import shutil
 
+from data.dataset_schema import DATASET_SCHEMAS, apply_schema
+
 def ensure_directory(directory):
     """Create directory if it doesn't exist."""
     if not os.path.exists(directory):
         os.makedirs(directory)
         print(f"Created directory: {directory}")
 
+def apply_dataset_schema(df, filename):
+    """
+    Apply the column types of a known dataset (see dataset_schema.py).
+
+    Categorical columns are written dictionary encoded by Parquet and Feather.
+    DataFrames that are not one of the datasets in data/csv are returned unchanged.
+    """
+    if filename in DATASET_SCHEMAS:
+        return apply_schema(df, filename)
+    return df
+
 def export_to_csv(df, filename, export_dir="data/csv", index=True):
     """
     Export DataFrame to CSV format.
@@ -81,6 +94,7 @@ def export_to_parquet(df, filename, export_dir="data/parquet", compression="snap
     
     ensure_directory(export_dir)
     filepath = os.path.join(export_dir, f"{filename}.parquet")
+    df = apply_dataset_schema(df, filename)
     df.to_parquet(filepath, compression=compression)
     print(f"Data exported to Parquet: {filepath}")
     return filepath
@@ -133,6 +147,7 @@ def export_to_feather(df, filename, export_dir="data/feather"):
     
     ensure_directory(export_dir)
     filepath = os.path.join(export_dir, f"{filename}.feather")
+    df = apply_dataset_schema(df, filename)
     df.to_feather(filepath)
     print(f"Data exported to Feather: {filepath}")
     return filepath
@@ -165,6 +180,25 @@ def export_to_rds(df, filename, export_dir="data/rds"):
     print(f"Data exported to RDS: {filepath}")
     return filepath
 
+def export_to_database(df, filename, database_path=None):
+    """
+    Export DataFrame as a table of the local SQLite analytical database.
+    Known datasets get their schema types and an index on (Date, LST, FG-Code).
+    
+    Args:
+        df: pandas DataFrame to export
+        filename: table name (the dataset name, without extension)
+        database_path: database file (default: data/warra.sqlite)
+    
+    Returns:
+        Path to the database file
+    """
+    from data.analytics_db import DATABASE_PATH, write_dataset
+    
+    filepath = write_dataset(df, filename, path=database_path or DATABASE_PATH)
+    print(f"Data exported to database: {filepath} (table {filename})")
+    return filepath
+
 def export_metadata(df, filename, export_dir="data/metadata", lang="en"):
     """
     Export metadata about the DataFrame to help with documentation.
@@ -230,6 +264,7 @@ def export_thesis_format(df, filename, export_dir="data/thesis"):
         import subprocess
         subprocess.check_call(["pip", "install", "pyarrow"])
     
+    df = apply_dataset_schema(df, filename)
     df.to_parquet(filepath, compression="brotli", index=True)
     
     # Also create a metadata file specifically for the thesis data
@@ -253,13 +288,14 @@ def export_thesis_format(df, filename, export_dir="data/thesis"):
     
     return filepath
 
-def export_all_formats(df, filename_base):
+def export_all_formats(df, filename_base, database_path=None):
     """
     Export DataFrame to all supported formats in their respective directories.
     
     Args:
         df: pandas DataFrame to export
         filename_base: base name for the files (without extension)
+        database_path: if given, also write the DataFrame to this SQLite database
     
     Returns:
         Dictionary with paths to all exported files
@@ -274,6 +310,8 @@ def export_all_formats(df, filename_base):
     paths['metadata_en'] = export_metadata(df, filename_base, lang="en")
     paths['metadata_de'] = export_metadata(df, f"{filename_base}_de", lang="de")
     paths['thesis'] = export_thesis_format(df, filename_base)
+    if database_path:
+        paths['database'] = export_to_database(df, filename_base, database_path=database_path)
     
     return paths
 
@@ -1,11 +1,36 @@
+import argparse
+import json
 import os
-import requests
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import re
 from bs4 import BeautifulSoup
-import time
 from pathlib import Path
 
+from data.http_fetch import PART_SUFFIX, TokenBucket, create_session, download_many, fetch_text, format_timing_summary
+from data.http_fetch import download_file as download_file_shared
+
+# Manifest of the downloaded files (URL, ETag/Last-Modified, size, SHA-256),
+# used to skip unchanged files with conditional requests on the next run
+MANIFEST_FILE = "manifest.json"
+
+# Politeness towards sozialversicherung.at: average requests per second and
+# the number of requests that may be sent at once after a pause
+REQUESTS_PER_SECOND = 1
+BURST = 3
+
+# Parallel downloads in total and per host
+MAX_WORKERS = 4
+MAX_CONNECTIONS_PER_HOST = 2
+
+# Copies of the category pages, revalidated on every run and used when the
+# website cannot be reached
+PAGE_CACHE_DIR = ".page_cache"
+
+# Website the category pages and files are on; main(site_url=...) replaces it,
+# e.g. with a local server that serves saved copies of the pages for testing
+SITE_URL = "https://www.sozialversicherung.at"
+
 # Configuration for all categories
 CATEGORIES = {
     "Beschaeftigte_Oesterreich": {
@@ -48,27 +73,97 @@ def create_directory_structure():
         category_dir.mkdir(exist_ok=True)
     return base_dir
 
-def download_file(url, filename, category_dir):
-    """Download a file from the given URL and save it to the specified directory."""
-    try:
-        response = requests.get(url, stream=True)
-        response.raise_for_status()
-        
-        filepath = category_dir / filename
-        with open(filepath, 'wb') as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                if chunk:
-                    f.write(chunk)
-        return True
-    except Exception as e:
-        print(f"Error downloading {filename}: {str(e)}")
-        return False
+def load_manifest(base_dir):
+    """Load the manifest ("category/filename" -> file entry), empty on the first run."""
+    manifest_path = base_dir / MANIFEST_FILE
+    if not manifest_path.exists():
+        return {}
+    with open(manifest_path, encoding="utf-8") as f:
+        return json.load(f)
+
+def save_manifest(base_dir, manifest):
+    """Write the manifest (via a temporary file, so an interrupted run keeps the old one)."""
+    manifest_path = base_dir / MANIFEST_FILE
+    temp_path = manifest_path.with_suffix(".json.tmp")
+    with open(temp_path, "w", encoding="utf-8") as f:
+        # dict() takes a snapshot, the download threads may add entries meanwhile
+        json.dump(dict(manifest), f, ensure_ascii=False, indent=2, sort_keys=True)
+    os.replace(temp_path, manifest_path)
+
+def _request_headers(url, filepath, part_path, entry):
+    """Conditional (unchanged file) and Range (interrupted download) headers for a request."""
+    headers = {}
+    # Only trust the validators if the local file is the one they were recorded for
+    if filepath.exists() and entry.get("url") == url and entry.get("size") == filepath.stat().st_size:
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+
+    partial = entry.get("partial", {})
+    validator = partial.get("etag") or partial.get("last_modified")
+    if part_path.exists() and partial.get("url") == url and validator:
+        # If-Range: the server sends the whole file instead if it changed in the meantime
+        headers["Range"] = f"bytes={part_path.stat().st_size}-"
+        headers["If-Range"] = validator
+    return headers
 
-def extract_file_info(link_element, category):
+def download_file(url, filename, category_dir, manifest=None, rate_limiter=None, session=None):
+    """Download a file from the given URL and save it to the specified directory.
+
+    Files recorded in the manifest are requested conditionally and skipped if
+    the server reports them unchanged. The download goes to a ".part" file
+    that is renamed when complete; an interrupted download is resumed with a
+    Range request on the next run.
+
+    Returns:
+        "downloaded", "unchanged" or "failed"
+    """
+    manifest = {} if manifest is None else manifest
+    filepath = category_dir / filename
+    part_path = category_dir / f"{filename}{PART_SUFFIX}"
+    key = f"{category_dir.name}/{filename}"
+    entry = manifest.get(key, {})
+    headers = _request_headers(url, filepath, part_path, entry)
+
+    result = download_file_shared(
+        url, filepath, session=session, headers=headers, resume=True, rate_limiter=rate_limiter
+    )
+    if result["status"] == 304:
+        return "unchanged"
+
+    validators = {
+        "url": url,
+        "etag": result["headers"].get("ETag"),
+        "last_modified": result["headers"].get("Last-Modified"),
+    }
+    if result["error"]:
+        if part_path.exists():
+            # Resume from the partial file on the next run
+            manifest[key] = {**entry, "partial": validators}
+        print(f"Error downloading {filename}: {result['error']}")
+        return "failed"
+
+    manifest[key] = {
+        **validators,
+        "size": result["size"],
+        "sha256": result["sha256"],
+        "downloaded": datetime.now().isoformat(timespec="seconds"),
+    }
+    return "downloaded"
+
+def on_site(url, site_url=SITE_URL):
+    """Point a URL of the SV website to site_url instead."""
+    if site_url != SITE_URL and url.startswith(SITE_URL):
+        return site_url + url[len(SITE_URL):]
+    return url
+
+def extract_file_info(link_element, category, site_url=SITE_URL):
     """Extract file information from a link element."""
     url = link_element.get('href', '')
     if not url.startswith('http'):
-        url = 'https://www.sozialversicherung.at' + url
+        url = site_url + url
+    url = on_site(url, site_url)
     
     # Extract filename and size from the link text
     link_text = link_element.get_text(strip=True)
@@ -122,12 +217,14 @@ def get_last_update_date(soup):
             return date_match.group(1)
     return None
 
-def scrape_file_links(category):
+def scrape_file_links(category, session=None, rate_limiter=None, site_url=SITE_URL, cache_dir=None):
     """Scrape file links from the webpage for a specific category."""
     try:
-        response = requests.get(CATEGORIES[category]["base_url"])
-        response.raise_for_status()
-        soup = BeautifulSoup(response.text, 'html.parser')
+        page = fetch_text(
+            on_site(CATEGORIES[category]["base_url"], site_url),
+            session=session, cache_dir=cache_dir, rate_limiter=rate_limiter,
+        )
+        soup = BeautifulSoup(page, 'html.parser')
         
         # Find all file links based on category
         if category == "Statistisches_Handbuch":
@@ -141,7 +238,7 @@ def scrape_file_links(category):
         
         files_info = []
         for link in file_links:
-            file_info = extract_file_info(link, category)
+            file_info = extract_file_info(link, category, site_url)
             files_info.append(file_info)
         
         # Get last update date
@@ -152,8 +249,33 @@ def scrape_file_links(category):
         print(f"Error scraping webpage for {category}: {str(e)}")
         return [], None
 
-def create_markdown_documentation(base_dir, all_files_info, last_updates):
-    """Create a markdown file documenting all downloaded files."""
+def _format_size(size):
+    for unit in ["Bytes", "KB", "MB"]:
+        if size < 1024:
+            return f"{size:.0f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+def manifest_files(manifest):
+    """File information (as returned by extract_file_info) of the completely downloaded files in the manifest."""
+    files_info = []
+    for key, entry in manifest.items():
+        if "sha256" not in entry:
+            continue
+        category, filename = key.split("/", 1)
+        files_info.append({
+            "url": entry["url"],
+            "filename": filename,
+            "size": entry.get("size_label") or _format_size(entry["size"]),
+            "year": entry.get("year", "Unknown"),
+            "month": entry.get("month", 0),
+            "category": category,
+        })
+    return files_info
+
+def create_markdown_documentation(base_dir, manifest, last_updates):
+    """Create a markdown file documenting all downloaded files (as recorded in the manifest)."""
+    all_files_info = manifest_files(manifest)
     md_content = """# Austrian Social Insurance Data Archive
 
 This directory contains various data files downloaded from the Austrian Social Insurance website.
@@ -206,6 +328,7 @@ SV_Daten_Archive/
 ├── Jahresergebnisse/              # Annual results
 ├── Sozialversicherung_Zahlen/     # Key figures
 ├── Statistisches_Handbuch/        # Statistical handbook
+├── manifest.json                  # Downloaded files (URL, ETag, size, SHA-256)
 └── README.md                      # This file
 ```
 
@@ -213,50 +336,109 @@ SV_Daten_Archive/
 To download all data:
 1. Run the download script: `python download_sv_data.py`
 2. Check the README.md file for documentation
+
+Re-runs only download new or changed files; `manifest.json` records the
+URL, ETag/Last-Modified, size and SHA-256 of every file, and this README is
+generated from it.
 """
     
     # Write the markdown file
     with open(base_dir / "README.md", "w", encoding="utf-8") as f:
         f.write(md_content)
 
-def main():
+def scrape_all_categories(session=None, rate_limiter=None, site_url=SITE_URL, cache_dir=None):
+    """Scrape the pages of all categories concurrently; returns {category: (files_info, last_update)}."""
+    with ThreadPoolExecutor(max_workers=len(CATEGORIES)) as executor:
+        futures = {
+            category: executor.submit(scrape_file_links, category, session, rate_limiter, site_url, cache_dir)
+            for category in CATEGORIES
+        }
+    return {category: future.result() for category, future in futures.items()}
+
+def download_priority(file_info, manifest):
+    """Sort key for the download queue: files not downloaded yet first, then the newest."""
+    entry = manifest.get(f"{file_info['category']}/{file_info['filename']}", {})
+    year = int(file_info["year"]) if file_info["year"].isdigit() else 0
+    return ("sha256" in entry, -year, -file_info["month"])
+
+def _download_to(url, path, **kwargs):
+    return download_file(url, path.name, path.parent, **kwargs)
+
+def download_all(files_info, base_dir, manifest, rate_limiter=None, session=None, max_workers=MAX_WORKERS):
+    """
+    Download the files of all categories from one prioritized queue.
+
+    At most max_workers downloads run at once, and at most
+    MAX_CONNECTIONS_PER_HOST per host. The manifest is saved after every
+    finished download.
+
+    Returns:
+        {"downloaded": n, "unchanged": n, "failed": n}
+    """
+    # One download per target file, in priority order (the pool starts them in submission order)
+    queue = {}
+    for file_info in sorted(files_info, key=lambda file_info: download_priority(file_info, manifest)):
+        queue.setdefault(f"{file_info['category']}/{file_info['filename']}", file_info)
+
+    counts = {"downloaded": 0, "unchanged": 0, "failed": 0}
+    downloads = [(file_info["url"], base_dir / key) for key, file_info in queue.items()]
+    try:
+        for _, path, status in download_many(
+            downloads, max_workers=max_workers, max_per_host=MAX_CONNECTIONS_PER_HOST, download=_download_to,
+            manifest=manifest, rate_limiter=rate_limiter, session=session,
+        ):
+            key = f"{path.parent.name}/{path.name}"
+            file_info = queue[key]
+            counts[status] += 1
+            if status == "downloaded":
+                print(f"Successfully downloaded {key}")
+            elif status == "unchanged":
+                print(f"Unchanged since the last download: {key}")
+            else:
+                print(f"Failed to download {key}")
+            if "sha256" in manifest.get(key, {}):
+                # Listing details for the README
+                manifest[key].update(year=file_info["year"], month=file_info["month"], size_label=file_info["size"])
+            save_manifest(base_dir, manifest)
+    finally:
+        save_manifest(base_dir, manifest)
+    return counts
+
+def main(site_url=SITE_URL, max_workers=MAX_WORKERS):
     # Create directory structure
     base_dir = create_directory_structure()
+    manifest = load_manifest(base_dir)
+    rate_limiter = TokenBucket(REQUESTS_PER_SECOND, BURST)
+    session = create_session(max(max_workers, len(CATEGORIES)))
+
+    # Scrape the file links of all categories
+    print("Scraping file links from the category pages...")
     all_files_info = []
     last_updates = {}
-    
-    # Process each category
-    for category in CATEGORIES.keys():
-        print(f"\nProcessing category: {category}")
-        
-        # Scrape file links
-        print(f"Scraping file links from webpage...")
-        files_info, last_update = scrape_file_links(category)
-        
+    for category, (files_info, last_update) in scrape_all_categories(
+        session, rate_limiter, site_url, cache_dir=base_dir / PAGE_CACHE_DIR
+    ).items():
         if not files_info:
             print(f"No files found for {category}. Skipping...")
             continue
-        
+        print(f"Found {len(files_info)} files for {category}")
         if last_update:
             last_updates[category] = last_update
-        
-        # Download files
-        category_dir = base_dir / category
-        print(f"\nStarting downloads of {len(files_info)} files for {category}...")
-        for file_info in files_info:
-            print(f"Downloading {file_info['filename']}...")
-            success = download_file(file_info['url'], file_info['filename'], category_dir)
-            if success:
-                print(f"Successfully downloaded {file_info['filename']}")
-            else:
-                print(f"Failed to download {file_info['filename']}")
-            time.sleep(1)  # Add a small delay between downloads
-        
         all_files_info.extend(files_info)
-    
+
+    # Download files
+    print(f"\nStarting downloads of {len(all_files_info)} files...")
+    counts = download_all(all_files_info, base_dir, manifest, rate_limiter, session, max_workers=max_workers)
+    print(f"Downloaded {counts['downloaded']}, unchanged {counts['unchanged']}, failed {counts['failed']}")
+    print(format_timing_summary())
+
     # Create markdown documentation
-    create_markdown_documentation(base_dir, all_files_info, last_updates)
+    create_markdown_documentation(base_dir, manifest, last_updates)
     print("\nDownload process completed. Check the README.md file for documentation.")
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Download the data files of the Austrian social insurance website.")
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS, help=f"parallel downloads (default: {MAX_WORKERS})")
+    parser.add_argument("--site-url", default=SITE_URL, help="website to scrape, e.g. a local server with saved pages")
+    args = parser.parse_args()
+    main(site_url=args.site_url, max_workers=args.workers) 
\ No newline at end of file
@@ -0,0 +1,307 @@
+"""
+One long fact table over all ÖGK, BVAEB and SVS datasets.
+
+Each dataset has its own shape and column names (ÖGK-LS vs LST vs
+Bundesland, postal/online vs Postal/OnlineMeine, ...). build_fact_table()
+normalizes all of them into one row per value with the dimensions
+
+    source, insurer, bundesland, fg_code, fachrichtung, year, period,
+    frequency, channel, measure, value
+
+so cross-dataset questions need no bespoke merges. Rows with an FG-Code get
+the Fachrichtung spelling of the FG-Code lookup
+(misc/FG-Codes/fg_code_kategorien.csv), whatever the source calls it:
+
+    facts = load_fact_table()
+    totals = ["BVAEB_Betraege_updated", "OEGK_Betraege_updated2025", "SVS_Betraege_updated"]
+    pivot(facts, index="period", columns="insurer", measure="refundierungen", bundesland="Gesamt", source=totals)
+    aggregate(facts, ["period", "channel"], measure="antraege", fachrichtung="Physiotherapie")
+
+"period" is "2023-01" for monthly values and the year ("2023", "2024Q1-Q3")
+otherwise. The same figures can appear in several sources (e.g. 05 and 05a
+overlap), so filter by source or frequency before summing across sources.
+Average processing times (measure "bearbeitungszeit_tage") must be
+aggregated with aggfunc="mean", not summed.
+
+Run this file to write the table to data/parquet/fact_table.parquet, sorted
+by the dimensions so Parquet filters skip unrelated row groups.
+"""
+
+import os
+
+import pandas as pd
+
+from data.dataset_schema import CSV_DIR, DATASET_SCHEMAS, load_dataset
+from data.export_utils import export_to_parquet
+from visualize.fachrichtung_categories import load_fachrichtung_map
+
+DATA_DIR = os.path.dirname(os.path.abspath(__file__))
+
+FACT_TABLE_DIR = os.path.join(DATA_DIR, "parquet")
+FACT_TABLE_NAME = "fact_table"
+
+DIMENSIONS = [
+    "source", "insurer", "bundesland", "fg_code", "fachrichtung", "year", "period", "frequency", "channel", "measure",
+]
+# Sort order of the stored table, most selective filters first
+SORT_ORDER = ["measure", "insurer", "bundesland", "year", "period", "fg_code", "channel", "source"]
+
+# Name used for Austria-wide rows in every source
+TOTAL = "Gesamt"
+
+LST_TO_BUNDESLAND = {
+    "W": "Wien",
+    "N": "Niederösterreich",
+    "O": "Oberösterreich",
+    "B": "Burgenland",
+    "S": "Salzburg",
+    "ST": "Steiermark",
+    "K": "Kärnten",
+    "T": "Tirol",
+    "V": "Vorarlberg",
+}
+
+# Spellings of Bundesländer and of the Austria-wide total in the sources
+BUNDESLAND_NAMES = {
+    "Bgld": "Burgenland",
+    "Ktn": "Kärnten",
+    "NÖ": "Niederösterreich",
+    "OÖ": "Oberösterreich",
+    "Sbg": "Salzburg",
+    "Stmk": "Steiermark",
+    "Vbg": "Vorarlberg",
+    "ÖGK": TOTAL,
+    "ALL": TOTAL,
+    "Alle": TOTAL,
+    "Bundesweit": TOTAL,
+}
+
+AMOUNTS = {"Refundierungen": ("refundierungen", "gesamt"), "Rechnungsbeträge": ("rechnungsbetraege", "gesamt")}
+PROCESSING_TIMES = {
+    "Postal": ("bearbeitungszeit_tage", "postal"),
+    "OnlineMeine": ("bearbeitungszeit_tage", "online_meine"),
+    "OnlineWAH": ("bearbeitungszeit_tage", "online_wah"),
+}
+
+
+def _counts(measure):
+    return {"postal": (measure, "postal"), "online": (measure, "online"), "Gesamt": (measure, "gesamt")}
+
+
+# How every source maps onto the fact table:
+#   measures: value column -> (measure, channel)
+#   bundesland: column holding the Landesstelle or Bundesland (None: Austria-wide)
+#   fachrichtung: constant for sources without a Fachrichtung column
+SOURCES = {
+    "01_OEGK_Betraege_pro_Landesstelle_2023": {"insurer": "ÖGK", "bundesland": "LST", "measures": AMOUNTS},
+    "02_OEGK_Betraege_pro_Fachrichtung_2023": {"insurer": "ÖGK", "bundesland": None, "measures": AMOUNTS},
+    "03_OEGK_Antraege_pro_Monat_2023_pro_Fachrichtung_online_postal_Bundesweit": {
+        "insurer": "ÖGK", "bundesland": None, "measures": _counts("antraege"),
+    },
+    "04_OEGK_Antraege_pro_Monat_2023_pro_Fachrichtung_online_postal_pro_Bundesland": {
+        "insurer": "ÖGK", "bundesland": "LST", "measures": _counts("antraege"),
+    },
+    "05_OEGK_Abgearbeitete_Antraege_pro_Monat_2023_pro_Fachrichtung_postal_online_Bundesweit": {
+        "insurer": "ÖGK", "bundesland": None, "measures": _counts("erledigte_antraege"),
+    },
+    "05a_OEGK_Abgearbeitete_Antraege_pro_Monat_2021_bis_Mai_2023_pro_Fachrichtung_postal_online_Bundesweit": {
+        "insurer": "ÖGK", "bundesland": None, "measures": _counts("erledigte_antraege"),
+    },
+    "06_OEGK_Abgearbeitete_Antraege_pro_Monat_2023_pro_Fachrichtung_postal_online_pro_Bundesland": {
+        "insurer": "ÖGK", "bundesland": "LST", "measures": _counts("erledigte_antraege"),
+    },
+    "06a_OEGK_Abgearbeitete_Antraege_pro_Monat_2021_bis_Mai_2023_pro_Fachrichtung_postal_online_pro_Bundesland": {
+        "insurer": "ÖGK", "bundesland": "LST", "measures": _counts("erledigte_antraege"),
+    },
+    "07_OEGK_Durchschnittliche_Bearbeitungszeit_pro_Monat_2023_postal_online_online_pro_Bundesland": {
+        "insurer": "ÖGK", "bundesland": "LST", "measures": PROCESSING_TIMES,
+    },
+    "07a_OEGK_Durchschnittliche_Bearbeitungszeit_pro_Monat_2021_bis_Mai_2023_postal_online_online_pro_Bundesland": {
+        "insurer": "ÖGK", "bundesland": "LST",
+        "measures": {column: PROCESSING_TIMES[column] for column in ["Postal", "OnlineMeine"]},
+    },
+    "08_OEGK_Betraege_MTD_Berufe_2021_2022_2023_Bundesweit": {"insurer": "ÖGK", "bundesland": "LST", "measures": AMOUNTS},
+    "09_OEGK_Betraege_MTD_Berufe_2021_2022_2023_pro_Bundesland": {
+        "insurer": "ÖGK", "bundesland": "LST", "measures": AMOUNTS,
+    },
+    "10_OEGK_Antraege_MTD_Berufe_pro_Monat_2021_2022_2023_postal_online_pro_Fachrichtung_Bundesweit_und_pro_Bundesland": {
+        "insurer": "ÖGK", "bundesland": "LST", "measures": _counts("antraege"),
+    },
+    "11_OEGK_Bearbeitete_Antraege_MTD_Berufe_pro_Monat_2021_2022_2023_postal_online_pro_Fachrichtung_Bundesweit_und_pro_Bundesland": {
+        "insurer": "ÖGK", "bundesland": "LST", "measures": _counts("erledigte_antraege"),
+    },
+    "12_OEGK_Durchschnittliche_Bearbeitungszeit_MTD_Berufe_pro_Monat_2023_postal_online_online_pro_Fachrichtung_Bundesweit_und_pro_Bundesland": {
+        "insurer": "ÖGK", "bundesland": "LST", "measures": PROCESSING_TIMES, "fachrichtung": "MTD",
+    },
+    "13_OEGK_Refundierungen_Heilbehelfe_pro_Monat_2021_2022_2023_pro_Bundesland": {
+        "insurer": "ÖGK", "bundesland": "Bundesland", "fachrichtung": "Heilbehelfe",
+        "measures": {"Refundierung": ("refundierungen", "gesamt")},
+    },
+    "14_OEGK_Antraege_Heilbehelfe_pro_Monat_2021_2022_2023_pro_Bundesland": {
+        "insurer": "ÖGK", "bundesland": "Bundesland", "fachrichtung": "Heilbehelfe",
+        "measures": {"Refundierung": ("antraege", "gesamt")},
+    },
+    "15a_SVS_Antraege_2023_pro_Fachrichtung": {
+        "insurer": "SVS", "bundesland": None, "measures": {"Antragsanzahl": ("antraege", "gesamt")},
+    },
+    "15b_SVS_Betraege_2023_pro_Fachrichtung": {"insurer": "SVS", "bundesland": None, "measures": AMOUNTS},
+    "15c_SVS_Ausgaben_MTD_Berufe_2021_2022_2023": {
+        "insurer": "SVS", "bundesland": None, "measures": {"Ausgaben": ("ausgaben", "gesamt")},
+    },
+    # Yearly totals per insurer, extracted by hand (2024 only covers Q1-Q3)
+    "manually_extracted/BVAEB_Betraege_updated": {
+        "insurer": "BVAEB", "bundesland": "Bundesland", "fachrichtung": TOTAL, "measures": AMOUNTS,
+    },
+    "manually_extracted/OEGK_Betraege_updated2025": {
+        "insurer": "ÖGK", "bundesland": "LST", "fachrichtung": TOTAL, "measures": AMOUNTS,
+    },
+    "manually_extracted/SVS_Betraege_updated": {
+        "insurer": "SVS", "bundesland": "Bundesland", "fachrichtung": TOTAL, "measures": AMOUNTS,
+    },
+}
+
+
+def normalize_bundesland(values):
+    """Map Landesstellen ("ÖGK-W"), abbreviations ("Bgld") and totals ("ALL") to Bundesland names."""
+    values = pd.Series(values, dtype="str")
+    codes = values.str.extract(r"^ÖGK-(\w+)$")[0].map(LST_TO_BUNDESLAND)
+    return codes.fillna(values.replace(BUNDESLAND_NAMES))
+
+
+def _read_source(source):
+    """Read a source with the column types of its schema (if it has one)."""
+    if source in DATASET_SCHEMAS:
+        return load_dataset(source)
+    return pd.read_csv(os.path.join(CSV_DIR, f"{source}.csv"), dtype={"Year": "str"})
+
+
+def _period_columns(df):
+    """Return (year, period, frequency) for every row of a source."""
+    if "Date" in df.columns:
+        dates = df["Date"]
+        return dates.dt.year.astype("Int16"), dates.astype("str"), "month"
+    labels = df["Year"].astype("str")
+    frequency = labels.str.fullmatch(r"\d{4}").map({True: "year", False: "part_year"})
+    return pd.to_numeric(labels.str[:4]).astype("Int16"), labels, frequency
+
+
+def normalize_source(source, spec):
+    """Turn one source into fact table rows."""
+    df = _read_source(source)
+
+    if spec["bundesland"] is None:
+        bundesland = TOTAL
+    else:
+        # Rows without a Landesstelle (11 leaves Bundesland_pretty empty) are Austria-wide
+        bundesland = normalize_bundesland(df[spec["bundesland"]]).fillna(TOTAL).to_numpy()
+
+    fachrichtung = df["Fachrichtung"].astype("str") if "Fachrichtung" in df.columns else spec.get("fachrichtung", TOTAL)
+    if "FG-Code" in df.columns:
+        fg_code = pd.to_numeric(df["FG-Code"].astype("str"), errors="coerce").astype("Int16")
+        # One spelling per FG-Code ("FA f. Chirurgie" in 15a is "FA für Chirurgie" in 03)
+        fachrichtung = fg_code.map(load_fachrichtung_map()).fillna(fachrichtung).to_numpy()
+        fg_code = fg_code.to_numpy()
+    else:
+        fg_code = pd.NA
+        if not isinstance(fachrichtung, str):
+            fachrichtung = fachrichtung.to_numpy()
+    year, period, frequency = _period_columns(df)
+
+    rows = pd.DataFrame({
+        "source": os.path.basename(source),
+        "insurer": spec["insurer"],
+        "bundesland": bundesland,
+        "fg_code": fg_code,
+        "fachrichtung": fachrichtung,
+        "year": year.to_numpy(),
+        "period": period.to_numpy(),
+        "frequency": frequency if isinstance(frequency, str) else frequency.to_numpy(),
+    })
+
+    facts = []
+    for column, (measure, channel) in spec["measures"].items():
+        facts.append(rows.assign(
+            channel=channel,
+            measure=measure,
+            value=pd.to_numeric(df[column]).astype(float).to_numpy(),
+        ))
+    return pd.concat(facts, ignore_index=True)
+
+
+def build_fact_table(sources=SOURCES):
+    """Normalize all sources into one long fact table (dimensions as categoricals)."""
+    facts = pd.concat([normalize_source(source, spec) for source, spec in sources.items()], ignore_index=True)
+    facts = facts.dropna(subset=["value"])
+
+    for dimension in DIMENSIONS:
+        if dimension not in ("year", "fg_code"):
+            facts[dimension] = facts[dimension].astype("category")
+    facts["fg_code"] = facts["fg_code"].astype("Int16")
+    facts["year"] = facts["year"].astype("Int16")
+    return facts.sort_values(SORT_ORDER, ignore_index=True)[DIMENSIONS + ["value"]]
+
+
+def export_fact_table(facts=None, export_dir=FACT_TABLE_DIR):
+    """Build (if not given) and write the fact table to Parquet."""
+    if facts is None:
+        facts = build_fact_table()
+    return export_to_parquet(facts.reset_index(drop=True), FACT_TABLE_NAME, export_dir=export_dir)
+
+
+def load_fact_table(path=os.path.join(FACT_TABLE_DIR, f"{FACT_TABLE_NAME}.parquet"), **filters):
+    """
+    Load the fact table, restricted to the given filters.
+
+    Reads the Parquet file if it has been written (filters are pushed down
+    to the reader), otherwise builds the table from the CSV files.
+    """
+    if os.path.exists(path):
+        parquet_filters = [
+            (dimension, "in", _as_list(value)) for dimension, value in filters.items()
+        ] or None
+        return select(pd.read_parquet(path, filters=parquet_filters), **filters)
+    return select(build_fact_table(), **filters)
+
+
+def _as_list(value):
+    return list(value) if isinstance(value, (list, tuple, set)) else [value]
+
+
+def select(facts, **filters):
+    """
+    Filter the fact table by dimension values.
+
+    Each keyword is a dimension; the value is a single value or a list of
+    values, e.g. select(facts, measure="antraege", bundesland=["Wien", "Tirol"]).
+    """
+    unknown = [dimension for dimension in filters if dimension not in DIMENSIONS]
+    if unknown:
+        raise ValueError(f"Unknown dimensions {unknown}, choose from {', '.join(DIMENSIONS)}")
+
+    mask = pd.Series(True, index=facts.index)
+    for dimension, value in filters.items():
+        mask &= facts[dimension].isin(_as_list(value))
+    return facts[mask]
+
+
+def aggregate(facts, by, aggfunc="sum", **filters):
+    """Filter the fact table and aggregate the values by the given dimensions."""
+    selected = select(facts, **filters)
+    return selected.groupby(by, observed=True, dropna=False)["value"].agg(aggfunc).reset_index()
+
+
+def pivot(facts, index, columns, aggfunc="sum", **filters):
+    """Filter the fact table and pivot the values (index and columns are dimensions)."""
+    selected = select(facts, **filters)
+    return selected.pivot_table(index=index, columns=columns, values="value", aggfunc=aggfunc, observed=True)
+
+
+def main():
+    facts = build_fact_table()
+    print(f"Fact table: {len(facts)} rows from {facts['source'].nunique()} sources")
+    print(facts.groupby(["insurer", "measure"], observed=True).size().to_string())
+    export_fact_table(facts)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""
+Conversion between German month names and dates.
+
+The Anfragebeantwortungen label months as "Jän.23", "Feb.23", ... and the
+plots label them as "Jän 2023". All conversions use the same month table.
+Monthly tables repeat a few dozen distinct labels over thousands of rows, so
+the parser factorizes the column and parses every distinct label only once.
+"""
+
+from functools import lru_cache
+
+import pandas as pd
+
+# German month abbreviations, January first
+GERMAN_MONTHS = ["Jän", "Feb", "Mär", "Apr", "Mai", "Jun", "Jul", "Aug", "Sep", "Okt", "Nov", "Dez"]
+MONTH_NUMBERS = {name: number for number, name in enumerate(GERMAN_MONTHS, start=1)}
+
+
+@lru_cache(maxsize=None)
+def parse_month_year(label):
+    """Parse a single "Jän.23" label to a monthly Period."""
+    month_name, year = label.strip().split(".")
+    if month_name not in MONTH_NUMBERS:
+        raise ValueError(f"Unknown month in '{label}'")
+    return pd.Period(year=2000 + int(year), month=MONTH_NUMBERS[month_name], freq="M")
+
+
+def parse_month_year_column(column):
+    """
+    Parse a column of "Jän.23" labels to monthly Periods.
+
+    Each distinct label is parsed once (and cached across calls); missing
+    labels become NaT.
+    """
+    codes, labels = pd.factorize(column)
+    periods = pd.PeriodIndex([parse_month_year(label) for label in labels] + [pd.NaT], freq="M")
+    # Code -1 (missing label) picks the trailing NaT
+    return pd.Series(periods[codes], index=column.index, name=column.name)
+
+
+def format_german_month(date):
+    """Format a date (Timestamp, Period or datetime) as "Jän 2023"."""
+    return f"{GERMAN_MONTHS[date.month - 1]} {date.year}"
+
+
+def format_month_year(date):
+    """Format a date (Timestamp, Period or datetime) as a "Jän.23" label."""
+    return f"{GERMAN_MONTHS[date.month - 1]}.{date.year % 100:02d}"
@@ -0,0 +1,207 @@
+"""
+Locale-independent formatting and parsing of German numbers and amounts.
+
+The functions work on whole columns (vectorized with NumPy and pandas string
+methods) and never touch the process locale, so they are fast, work on
+machines without the de_DE locale and are safe to use in parallel workers.
+
+    format_euro(df["Refundierungen"])           # 44992965.36 -> "44.992.965,36 €"
+    parse_german_number(df["Refundierungen"])   # "44.992.965,36" -> 44992965.36
+"""
+
+import numpy as np
+import pandas as pd
+
+# Strings that stand for "no value" in the Anfragebeantwortungen
+MISSING_VALUES = ["", "-"]
+
+# Amount columns of the Beilagen, parsed as exact integer cents and written as
+# Euro plus the exact "<column>_cents" column (see add_cent_columns)
+MONEY_COLUMNS = ["Refundierungen", "Rechnungsbeträge"]
+
+# Suffix of the exact integer cent columns written next to the Euro columns
+CENTS_SUFFIX = "_cents"
+
+
+def _group_thousands(digits, separator="."):
+    """Insert a thousands separator into a Series of digit strings."""
+    return digits.str.replace(r"\B(?=(\d{3})+$)", separator, regex=True)
+
+
+def _format_units(units, decimals):
+    """Format signed integer units of the last decimal place (e.g. cents) German style."""
+    missing = units.isna()
+    magnitude = units.fillna(0).abs().to_numpy(dtype=np.int64)
+    scale = 10 ** decimals
+
+    integer_part = pd.Series(magnitude // scale, index=units.index).astype(str)
+    formatted = _group_thousands(integer_part)
+    if decimals > 0:
+        fraction = pd.Series(magnitude % scale, index=units.index).astype(str).str.zfill(decimals)
+        formatted = formatted + "," + fraction
+
+    sign = np.where(units.fillna(0).to_numpy() < 0, "-", "")
+    formatted = sign + formatted
+    return formatted.mask(missing)
+
+
+def format_german_number(values, decimals=2):
+    """
+    Format numbers German style ("1.234,56"), like locale.format_string with grouping.
+
+    Args:
+        values: numbers (Series, array or list)
+        decimals: number of decimal places
+
+    Returns:
+        Series of strings (missing values stay missing)
+    """
+    values = pd.Series(values, dtype=float) if not isinstance(values, pd.Series) else values.astype(float)
+
+    # Round once to integer units of the last decimal place
+    units = np.rint(values * 10 ** decimals).astype("Int64")
+    return _format_units(units, decimals)
+
+
+def format_euro(values, decimals=2, symbol="€"):
+    """
+    Format amounts as German currency strings ("1.234,56 €").
+
+    Produces the same output as locale.currency(x, symbol="€", grouping=True)
+    under de_DE.UTF-8, without changing the locale.
+    """
+    return format_german_number(values, decimals=decimals) + f" {symbol}"
+
+
+def format_euro_cents(cents, symbol="€"):
+    """Format integer cent amounts as German currency strings ("1.234,56 €"), exactly."""
+    cents = cents if isinstance(cents, pd.Series) else pd.Series(cents)
+    return _format_units(cents.astype("Int64"), 2) + f" {symbol}"
+
+
+def _normalize_german_number(values, thousands="."):
+    """Turn German number strings into strings float() understands ("1.234,56" -> "1234.56")."""
+    text = pd.Series(values).astype("string").str.strip()
+    text = text.str.replace("€", "", regex=False).str.strip()
+    text = text.mask(text.isin(MISSING_VALUES))
+    for separator in [thousands, " ", " "]:
+        text = text.str.replace(separator, "", regex=False)
+    return text.str.replace(",", ".", regex=False)
+
+
+def _is_text(series):
+    """Mask of the str values of a Series (object columns may mix strings and numbers)."""
+    if series.dtype == object:
+        return series.map(lambda value: isinstance(value, str)).astype(bool)
+    return series.notna()
+
+
+def parse_german_number(values, thousands=".", errors="raise"):
+    """
+    Parse German number strings ("1.234,56", "131 668", "2.570.697,70 €") to floats.
+
+    "-" and empty strings become NaN. Numbers (a numeric column, or the
+    non-string values of an object column) are returned as floats unchanged.
+
+    Args:
+        values: strings (Series, array or list)
+        thousands: thousands separator used in the strings (spaces are always removed)
+        errors: "raise" or "coerce" (invalid strings become NaN), as in pd.to_numeric
+    """
+    series = values if isinstance(values, pd.Series) else pd.Series(values)
+    if pd.api.types.is_numeric_dtype(series):
+        return series.astype(float)
+    is_text = _is_text(series)
+    numbers = pd.to_numeric(series.mask(is_text), errors=errors).astype(float)
+    if is_text.any():
+        normalized = _normalize_german_number(series[is_text], thousands=thousands)
+        numbers[is_text] = pd.to_numeric(normalized, errors=errors).astype(float)
+    return numbers
+
+
+def parse_german_integer(values, thousands=".", errors="raise"):
+    """
+    Parse German integer strings ("1.234.567", "131 668") to a nullable Int64 Series.
+
+    Raises a ValueError if a value has a fractional part.
+    """
+    numbers = parse_german_number(values, thousands=thousands, errors=errors)
+    fractional = numbers.notna() & (numbers != np.round(numbers))
+    if fractional.any():
+        raise ValueError(f"Values are not integers: {list(numbers[fractional])}")
+    return numbers.astype("Int64")
+
+
+def parse_german_cents(values, thousands=".", errors="raise"):
+    """
+    Parse German amount strings ("1.234,56", "2.570.697,7 €") to exact integer cents.
+
+    The digits are split at the decimal comma and combined as integers, so no
+    floating point rounding is involved. Returns a nullable Int64 Series; "-"
+    and empty strings become <NA>. Raises a ValueError for more than two
+    decimal places (unless errors="coerce").
+    """
+    series = values if isinstance(values, pd.Series) else pd.Series(values)
+    if pd.api.types.is_numeric_dtype(series):
+        return euro_to_cents(series)
+    is_text = _is_text(series)
+    if not is_text.all():
+        # Numbers in an object column are Euro amounts already
+        cents = euro_to_cents(series.mask(is_text))
+        cents[is_text] = parse_german_cents(series[is_text], thousands=thousands, errors=errors)
+        return cents
+
+    normalized = _normalize_german_number(series, thousands=thousands)
+    parts = normalized.str.extract(r"^(?P<sign>-?)(?P<euros>\d*)(?:\.(?P<cents>\d{0,2}))?$")
+    invalid = normalized.notna() & (parts["euros"].isna() | (parts["euros"] == "") & parts["cents"].isna())
+    if invalid.any():
+        if errors != "coerce":
+            raise ValueError(f"Not a Euro amount: {list(series[invalid])}")
+        parts = parts.mask(invalid)
+
+    euros = pd.to_numeric(parts["euros"].replace("", "0")).astype("Int64")
+    cents = pd.to_numeric(parts["cents"].fillna("").str.ljust(2, "0")).astype("Int64")
+    amount = euros * 100 + cents
+    return amount.where(parts["sign"] != "-", -amount).astype("Int64")
+
+
+def euro_to_cents(values):
+    """Convert Euro amounts (floats) to integer cents, rounding to the nearest cent."""
+    values = values if isinstance(values, pd.Series) else pd.Series(values)
+    return np.rint(pd.to_numeric(values).astype(float) * 100).astype("Int64")
+
+
+def cents_to_euro(cents):
+    """Convert integer cents to Euro floats (for export and presentation only)."""
+    cents = cents if isinstance(cents, pd.Series) else pd.Series(cents)
+    return cents.astype("Int64").astype(float) / 100
+
+
+def add_cent_columns(df, columns):
+    """
+    Turn amount columns held as integer cents into Euro columns for export.
+
+    The exact amounts are kept in a "<column>_cents" column (Int64) right after
+    each Euro column, so readers of the exports never have to round floats.
+    """
+    for column in columns:
+        if column in df.columns:
+            cents = df[column].astype("Int64")
+            df[column] = cents_to_euro(cents)
+            df.insert(df.columns.get_loc(column) + 1, column + CENTS_SUFFIX, cents)
+    return df
+
+
+def read_cent_columns(df, columns):
+    """
+    Amount columns as integer cents, the inverse of add_cent_columns.
+
+    Takes the "<column>_cents" column where the file has one, so the cents
+    are read exactly; older files with Euro columns only are rounded.
+    """
+    for column in columns:
+        if column + CENTS_SUFFIX in df.columns:
+            df[column] = df.pop(column + CENTS_SUFFIX).astype("Int64")
+        elif column in df.columns:
+            df[column] = euro_to_cents(df[column])
+    return df
@@ -0,0 +1,296 @@
+"""
+HTTP downloads shared by the downloader scripts.
+
+download_2024_pdfs.py, download_parliament_files.py and download_sv_data.py
+all fetch files over one pooled session with the settings below:
+
+    session = create_session()
+    result = download_file(url, "Beilage_1.pdf", session=session)
+    for url, path, result in download_many([(url, path), ...]):
+        ...
+
+Files are streamed in chunks to "<path>.part" and renamed when complete, so
+an interrupted download never leaves a truncated file under the final name.
+Timeouts, retries with exponential backoff, SHA-256 checksums and per-request
+timings (see timing_summary()) are handled here, so tuning concurrency or
+chunk size happens in one place. fetch_text() fetches pages (e.g. index pages
+to scrape) through an optional response cache directory.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlparse
+
+import requests
+
+# Parallel downloads in total and per host
+MAX_WORKERS = 8
+MAX_CONNECTIONS_PER_HOST = 4
+
+TIMEOUT = (10, 60)  # connect and read timeout in seconds
+CHUNK_SIZE = 64 * 1024
+
+# Retry policy: connection errors and these status codes are retried, waiting
+# BACKOFF seconds before the first retry and twice as long before every further one
+RETRIES = 3
+BACKOFF = 1.0
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+PART_SUFFIX = ".part"
+
+# Timing of every request made through this module (see timing_summary)
+TIMINGS = []
+_timings_lock = threading.Lock()
+
+
+class TokenBucket:
+    """Rate limiter shared by all download threads.
+
+    Allows `rate` requests per second on average and bursts of up to
+    `capacity` requests.
+    """
+
+    def __init__(self, rate, capacity=1):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a request may be sent."""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+def create_session(max_workers=MAX_WORKERS):
+    """Create a session whose connection pool is large enough for max_workers parallel requests."""
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def record_timing(url, status, size, seconds, attempts):
+    with _timings_lock:
+        TIMINGS.append({"url": url, "status": status, "bytes": size, "seconds": seconds, "attempts": attempts})
+
+
+def timing_summary(timings=None):
+    """Summarize request timings: count, bytes, total and slowest seconds, retries and throughput."""
+    timings = TIMINGS if timings is None else timings
+    with _timings_lock:
+        timings = list(timings)
+    seconds = sum(timing["seconds"] for timing in timings)
+    size = sum(timing["bytes"] for timing in timings)
+    return {
+        "requests": len(timings),
+        "bytes": size,
+        "seconds": seconds,
+        "slowest_seconds": max((timing["seconds"] for timing in timings), default=0),
+        "retries": sum(timing["attempts"] - 1 for timing in timings),
+        "megabytes_per_second": size / 1e6 / seconds if seconds else 0,
+    }
+
+
+def format_timing_summary(timings=None):
+    summary = timing_summary(timings)
+    return (
+        f"{summary['requests']} requests, {summary['bytes'] / 1e6:.1f} MB, "
+        f"{summary['megabytes_per_second']:.2f} MB/s per request, "
+        f"slowest {summary['slowest_seconds']:.1f}s, {summary['retries']} retries"
+    )
+
+
+def sha256_of_file(path, digest=None):
+    """SHA-256 of a file (continuing digest if given)."""
+    digest = digest or hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest
+
+
+def download_file(url, path, session=None, headers=None, resume=False, rate_limiter=None,
+                  retries=RETRIES, backoff=BACKOFF, timeout=TIMEOUT, chunk_size=CHUNK_SIZE):
+    """
+    Download url to path, streaming through "<path>.part".
+
+    Args:
+        url: file to download
+        path: target file
+        session: session to use (connection pooling), default a plain request
+        headers: extra request headers (e.g. If-None-Match, or Range/If-Range to resume)
+        resume: append a 206 (partial content) response to an existing .part
+            file, and resume interrupted bodies with a Range request when
+            retrying (if the server sent an ETag or Last-Modified)
+        rate_limiter: TokenBucket to acquire before every request
+
+    Returns:
+        dict with the HTTP "status" (0 if no response), the response
+        "headers", the "size" and "sha256" of the written file (None if
+        nothing was written, e.g. on 304) and the "error" (None on success)
+    """
+    session = session or requests
+    path = str(path)
+    part_path = path + PART_SUFFIX
+    headers = dict(headers or {})
+    result = {"status": 0, "headers": {}, "size": None, "sha256": None, "error": None}
+
+    start = time.perf_counter()
+    received = 0
+    attempts = 0
+    for attempt in range(retries + 1):
+        if attempt:
+            time.sleep(backoff * 2 ** (attempt - 1))
+        attempts += 1
+        try:
+            if rate_limiter:
+                rate_limiter.acquire()
+            with session.get(url, headers=headers, stream=True, timeout=timeout) as response:
+                result.update(status=response.status_code, headers=response.headers, error=None)
+                if response.status_code in RETRY_STATUS_CODES:
+                    result["error"] = f"Status code: {response.status_code}"
+                    continue
+                if response.status_code == 416 and os.path.exists(part_path):
+                    # The partial file does not fit the file on the server, start over next time
+                    os.remove(part_path)
+                if response.status_code not in (200, 206):
+                    if response.status_code != 304:
+                        result["error"] = f"Status code: {response.status_code}"
+                    break
+
+                append = response.status_code == 206 and resume and os.path.exists(part_path)
+                digest = sha256_of_file(part_path) if append else hashlib.sha256()
+                with open(part_path, "ab" if append else "wb") as f:
+                    for chunk in response.iter_content(chunk_size=chunk_size):
+                        f.write(chunk)
+                        digest.update(chunk)
+                        received += len(chunk)
+
+            os.replace(part_path, path)
+            result.update(size=os.path.getsize(path), sha256=digest.hexdigest())
+            break
+        except (requests.RequestException, OSError) as e:
+            result["error"] = str(e)
+            validator = result["headers"].get("ETag") or result["headers"].get("Last-Modified")
+            if resume and validator and os.path.exists(part_path):
+                headers.update({"Range": f"bytes={os.path.getsize(part_path)}-", "If-Range": validator})
+
+    record_timing(url, result["status"], received, time.perf_counter() - start, attempts)
+    return result
+
+
+def download_many(downloads, max_workers=MAX_WORKERS, max_per_host=MAX_CONNECTIONS_PER_HOST,
+                  download=None, **kwargs):
+    """
+    Run downloads in parallel.
+
+    Args:
+        downloads: (url, path) pairs; they are started in this order
+        max_workers: parallel downloads in total
+        max_per_host: parallel downloads per host
+        download: function(url, path, **kwargs) doing one download, default download_file
+            (with a session shared by all downloads unless one is passed)
+        kwargs: passed on to download
+
+    Yields:
+        (url, path, result) as the downloads finish
+    """
+    if download is None:
+        download = download_file
+        kwargs.setdefault("session", create_session(max_workers))
+    host_limits = {urlparse(url).netloc: threading.BoundedSemaphore(max_per_host) for url, _ in downloads}
+
+    def limited(url, path):
+        with host_limits[urlparse(url).netloc]:
+            return download(url, path, **kwargs)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(limited, url, path): (url, path) for url, path in downloads}
+        for future in as_completed(futures):
+            url, path = futures[future]
+            yield url, path, future.result()
+
+
+def _cache_path(cache_dir, url):
+    return os.path.join(cache_dir, hashlib.sha256(url.encode()).hexdigest()[:32] + ".json")
+
+
+def fetch_text(url, session=None, cache_dir=None, rate_limiter=None,
+               retries=RETRIES, backoff=BACKOFF, timeout=TIMEOUT):
+    """
+    Fetch a page and return its text.
+
+    With cache_dir, every response is stored there and revalidated with
+    If-None-Match/If-Modified-Since on the next call; if the server cannot
+    be reached, the cached copy is returned. Raises requests.RequestException
+    if the page can neither be fetched nor read from the cache.
+    """
+    session = session or requests
+    cached = None
+    headers = {}
+    if cache_dir and os.path.exists(_cache_path(cache_dir, url)):
+        with open(_cache_path(cache_dir, url), encoding="utf-8") as f:
+            cached = json.load(f)
+        if cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+
+    start = time.perf_counter()
+    status = 0
+    text = None
+    error = None
+    for attempt in range(retries + 1):
+        if attempt:
+            time.sleep(backoff * 2 ** (attempt - 1))
+        try:
+            if rate_limiter:
+                rate_limiter.acquire()
+            response = session.get(url, headers=headers, timeout=timeout)
+            status = response.status_code
+            if status in RETRY_STATUS_CODES:
+                error = requests.HTTPError(f"Status code: {status}", response=response)
+                continue
+            if status == 304 and cached:
+                text = cached["text"]
+                break
+            response.raise_for_status()
+            text = response.text
+            if cache_dir:
+                os.makedirs(cache_dir, exist_ok=True)
+                entry = {
+                    "url": url,
+                    "etag": response.headers.get("ETag"),
+                    "last_modified": response.headers.get("Last-Modified"),
+                    "text": text,
+                }
+                with open(_cache_path(cache_dir, url), "w", encoding="utf-8") as f:
+                    json.dump(entry, f, ensure_ascii=False)
+            break
+        except requests.HTTPError:
+            raise
+        except requests.RequestException as e:
+            error = e
+    record_timing(url, status, len(text or ""), time.perf_counter() - start, attempt + 1)
+
+    if text is None:
+        if cached:
+            print(f"Using the cached copy of {url} ({error})")
+            return cached["text"]
+        raise error
+    return text
@@ -0,0 +1,206 @@
+"""
+Consistency checks for sums and totals in the Anfragebeantwortungen data.
+
+All checks are vectorized (grouped sums, aligned joins and shifted columns)
+and return a DataFrame with one row per discrepancy, so they stay fast no
+matter how many rows do not match. Use format_report() to print the result
+and assert_reconciled() to stop when a check has to pass.
+"""
+
+import pandas as pd
+
+
+def check_row_sums(df, parts, total, keys, tolerance=0):
+    """
+    Find rows where the sum of the part columns differs from the total column.
+
+    Args:
+        df: DataFrame to check
+        parts: columns that should add up to the total (e.g. ["postal", "online"])
+        total: column holding the reported total (e.g. "Gesamt")
+        keys: columns identifying a row in the report (e.g. ["LST", "Date", "FG-Code"])
+        tolerance: maximum allowed absolute difference
+
+    Returns:
+        DataFrame (indexed like df) with the keys, parts, total, the calculated
+        total and the difference for every mismatching row. Rows with a missing
+        part or total count as mismatching.
+    """
+    calculated = df[parts].sum(axis=1, skipna=False)
+    difference = calculated - df[total]
+    mismatch = ~(difference.abs() <= tolerance)
+
+    discrepancies = df.loc[mismatch, keys + parts + [total]].copy()
+    discrepancies["calculated"] = calculated[mismatch]
+    discrepancies["difference"] = difference[mismatch]
+    return discrepancies
+
+
+def check_group_sums(df, parts, total, keys, tolerance=0):
+    """
+    Find groups where the summed parts differ from the summed total.
+
+    Missing values count as 0, so single missing cells do not flag a group.
+
+    Returns:
+        DataFrame with one row per mismatching group (see check_row_sums)
+    """
+    sums = df.groupby(keys, dropna=False)[parts + [total]].sum().reset_index()
+    return check_row_sums(sums, parts, total, keys, tolerance=tolerance)
+
+
+def compare_totals(left, right, keys, columns, tolerance=0, labels=("left", "right"), how="outer"):
+    """
+    Compare the grouped sums of two tables reporting the same figures.
+
+    Args:
+        left, right: DataFrames to compare
+        keys: columns to group by (e.g. ["Date"])
+        columns: value columns to compare
+        tolerance: maximum allowed absolute difference
+        labels: names of the two sources used in the report
+        how: which groups to compare ("left" only checks groups of the left table)
+
+    Returns:
+        Long DataFrame with keys, column, both values and the difference for
+        every mismatching (group, column). Groups missing on one side sum to 0.
+    """
+    left_sums = left.groupby(keys)[columns].sum()
+    right_sums = right.groupby(keys)[columns].sum()
+    left_sums, right_sums = left_sums.align(right_sums, join=how, fill_value=0)
+
+    comparison = pd.concat(
+        {
+            column: pd.DataFrame({labels[0]: left_sums[column], labels[1]: right_sums[column]})
+            for column in columns
+        },
+        names=["column"],
+    )
+    comparison["difference"] = comparison[labels[0]] - comparison[labels[1]]
+
+    mismatch = ~(comparison["difference"].abs() <= tolerance)
+    return comparison[mismatch].reset_index()[keys + ["column", labels[0], labels[1], "difference"]]
+
+
+def _as_numbers(values):
+    """Return values as numbers if every present value is numeric, else None."""
+    if pd.api.types.is_numeric_dtype(values):
+        return values
+    numbers = pd.to_numeric(values, errors="coerce")
+    return numbers if numbers.notna().sum() == values.notna().sum() else None
+
+
+def compare_cells(left, right, keys, columns=None, tolerance=0, labels=("left", "right")):
+    """
+    Compare two tables holding the same rows cell by cell.
+
+    The tables are aligned on the key columns (which must be unique in each
+    table). Columns that are numeric in both tables (numbers stored as text
+    included) match within tolerance, other columns must be equal; two
+    missing values match.
+
+    Args:
+        left, right: DataFrames to compare
+        keys: columns identifying a row (e.g. ["ÖGK-LS", "Monat.Jahr"])
+        columns: value columns to compare, default all shared non-key columns
+        tolerance: maximum allowed absolute difference of numeric cells
+        labels: names of the two sources used in the report
+
+    Returns:
+        Long DataFrame with keys, column, both values and a "status" for every
+        mismatching cell ("different"), plus one row per row missing in one of
+        the tables ("only in <label>", column "*").
+    """
+    if columns is None:
+        columns = [column for column in left.columns if column not in keys and column in right.columns]
+    left_cells = left.set_index(keys)[columns]
+    right_cells = right.set_index(keys)[columns]
+    for label, cells in zip(labels, (left_cells, right_cells)):
+        duplicated = cells.index[cells.index.duplicated()]
+        if len(duplicated):
+            raise ValueError(f"Duplicate keys in {label}: {list(duplicated.unique())[:5]}")
+
+    in_left = left_cells.index
+    in_right = right_cells.index
+    left_cells, right_cells = left_cells.align(right_cells, join="outer")
+    in_both = left_cells.index.isin(in_left) & left_cells.index.isin(in_right)
+
+    differences = []
+    for column in columns:
+        left_values, right_values = left_cells[column], right_cells[column]
+        left_numbers, right_numbers = _as_numbers(left_values), _as_numbers(right_values)
+        if left_numbers is not None and right_numbers is not None:
+            equal = (left_numbers - right_numbers).abs() <= tolerance
+        else:
+            equal = left_values.astype("string") == right_values.astype("string")
+        equal = equal.fillna(False).astype(bool) | (left_values.isna() & right_values.isna())
+        mismatch = in_both & ~equal.to_numpy()
+        differences.append(
+            pd.DataFrame(
+                {"column": column, labels[0]: left_values[mismatch], labels[1]: right_values[mismatch]},
+                index=left_cells.index[mismatch],
+            ).assign(status="different")
+        )
+
+    for label, present in ((labels[0], ~left_cells.index.isin(in_right)), (labels[1], ~left_cells.index.isin(in_left))):
+        differences.append(
+            pd.DataFrame({"column": "*", labels[0]: None, labels[1]: None}, index=left_cells.index[present])
+            .assign(status=f"only in {label}")
+        )
+
+    columns_out = keys + ["column", labels[0], labels[1], "status"]
+    differences = [frame for frame in differences if not frame.empty]
+    if not differences:
+        return pd.DataFrame(columns=columns_out)
+    return pd.concat(differences).reset_index()[columns_out]
+
+
+def check_total_rows(df, columns, is_total, keys=None, tolerance=0):
+    """
+    Compare the reported total rows ("Gesamt") with the sum of the other rows.
+
+    Args:
+        df: DataFrame containing both the detail rows and the total rows
+        columns: value columns to compare (use integer cents for exact checks)
+        is_total: boolean Series marking the total rows
+        keys: columns the totals are reported per (e.g. ["LST", "Year"]), None for one grand total
+
+    Returns:
+        Long discrepancy DataFrame (see compare_totals) with "calculated" and "reported" values
+    """
+    keys = list(keys) if keys else []
+    if not keys:
+        df = df.assign(total="Gesamt")
+        keys = ["total"]
+    return compare_totals(
+        df[~is_total], df[is_total], keys, columns, tolerance=tolerance, labels=("calculated", "reported")
+    )
+
+
+def add_neighbour_months(discrepancies, df, group_keys, columns, date_column="Date"):
+    """
+    Add the previous and next month of the same group to each discrepancy.
+
+    The neighbours are taken from df with a grouped shift (sorted by date), so
+    discrepancies must carry the index of df (as returned by check_row_sums).
+    The added columns are prefixed with "prev_" and "next_".
+    """
+    ordered = df.sort_values(date_column)
+    grouped = ordered.groupby(group_keys, dropna=False)[[date_column] + columns]
+    previous = grouped.shift(1).add_prefix("prev_")
+    following = grouped.shift(-1).add_prefix("next_")
+    return discrepancies.join(previous).join(following)
+
+
+def format_report(discrepancies, title):
+    """Render a discrepancy DataFrame as a printable report."""
+    if discrepancies.empty:
+        return f"{title}: no discrepancies"
+    with pd.option_context("display.max_columns", None, "display.width", None):
+        return f"{title}: {len(discrepancies)} discrepancies\n{discrepancies.to_string()}"
+
+
+def assert_reconciled(discrepancies, title):
+    """Raise an AssertionError with the report if there are discrepancies."""
+    if not discrepancies.empty:
+        raise AssertionError(format_report(discrepancies, title))
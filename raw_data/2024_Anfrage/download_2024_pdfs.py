@@ -1,6 +1,7 @@
 import json
 import os
-import requests
+
+from data.http_fetch import download_many, format_timing_summary
 
 # Load the JSON data
 with open('extras/export_Gegenstand_Refundierung von Wahlarztkosten und Hilfsmitteln 2023.json', 'r') as f:
@@ -13,21 +14,19 @@ base_url = 'https://www.parlament.gv.at'
 output_dir = 'downloaded_files'
 os.makedirs(output_dir, exist_ok=True)
 
-# Function to download a file
-def download_file(url, filename):
-    response = requests.get(url)
-    if response.status_code == 200:
-        with open(filename, 'wb') as f:
-            f.write(response.content)
-        print(f"Downloaded: {filename}")
-    else:
-        print(f"Failed to download: {url}")
-
-# Iterate through the documents and download each file
+# Collect the documents and download them in parallel
+downloads = []
 for doc in data['documents']:
     for file in doc['documents']:
         file_url = base_url + file['link']
         file_name = os.path.join(output_dir, f"{doc['title'].replace(' ', '_')}.pdf")
-        download_file(file_url, file_name)
+        downloads.append((file_url, file_name))
+
+for file_url, file_name, result in download_many(downloads):
+    if result["error"]:
+        print(f"Failed to download: {file_url} ({result['error']})")
+    else:
+        print(f"Downloaded: {file_name}")
 
 print("All files have been downloaded.")
+print(format_timing_summary())
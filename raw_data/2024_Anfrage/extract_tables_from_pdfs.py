@@ -1,11 +1,108 @@
 import os
-import tabula
+import sys
+import io
+import hashlib
 import pandas as pd
-import json
 import re
 import glob
+from bisect import bisect_right
+from contextlib import contextmanager
 from PyPDF2 import PdfReader
 import pdfplumber
+from pdfplumber.utils import DEFAULT_X_TOLERANCE, cluster_objects, extract_words
+
+from extract_text_from_pdfs import saved_page_texts
+
+from data.german_numbers import MONEY_COLUMNS, parse_german_cents
+
+# Registry and output helpers shared by all Anfragen live in raw_data/
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from anfrage_registry import ANFRAGEN, OUTPUT_SCHEMAS
+from beilage_output import beilage_metadata, check_and_convert_to_int, save_beilage_table
+
+# Header line of the Anträge tables; its words mark where the columns start (see read_column_rows)
+ANTRAEGE_HEADER = ["ÖGK-LS", "Monat", "FG-Code", "FG-Bezeichnung", "Anträge", "Anträge", "Gesamt"]
+
+# Header lines of the Bearbeitungszeit tables (Beilage_7 and _12): "postalische KE" and
+# the line below it with the two online columns ("online KE" is on the line above)
+BEARBEITUNGSZEIT_HEADER = ["ÖGK-LS", "Monat", "postalische", "KE"]
+BEARBEITUNGSZEIT_SUBHEADER = ["MeineÖGK", "WAHonline"]
+
+# Header lines of the amount tables (Beilage_8 and _9): mostly with "ÖGK- FG- MTD- MTD-"
+# on the line above "LS ...", on the ÖGK-ST page with "ÖGK-LS" on one line
+BETRAEGE_HEADERS = [
+    ["LS", "Jahr", "Code", "FG-Bezeichnung", "Kostenrefundierungen", "Kostenrechnungsbeträge"],
+    ["ÖGK-LS", "Jahr", "Code", "FG-Bezeichnung", "Kostenrefundierungen", "Kostenrechnungsbeträge"],
+]
+
+# Beilage_1 has no ruling lines between its columns, so they are found from the text positions
+BEILAGE_1_TABLE_SETTINGS = {"vertical_strategy": "text", "horizontal_strategy": "text"}
+
+
+class PdfDocument:
+    """
+    A Beilage PDF read from disk once and shared by the table parsers and the question extractor.
+
+        with PdfDocument(pdf_path) as document:
+            table = process_beilage_7(document)
+            question = extract_question_from_pdf(document)
+
+    The pdfplumber document is opened on first use and keeps its parsed pages.
+    The PyPDF2 page texts the question patterns are written for come from the
+    pages JSON of extract_text_from_pdfs.py --pages when it was saved for the
+    same content, and are extracted once otherwise.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self.data = f.read()
+        self._pdf = None
+        self._page_texts = None
+
+    @property
+    def pdf(self):
+        if self._pdf is None:
+            self._pdf = pdfplumber.open(io.BytesIO(self.data))
+        return self._pdf
+
+    @property
+    def pages(self):
+        return self.pdf.pages
+
+    @property
+    def page_texts(self):
+        if self._page_texts is None:
+            self._page_texts = saved_page_texts(self.path, hashlib.sha256(self.data).hexdigest())
+        if self._page_texts is None:
+            reader = PdfReader(io.BytesIO(self.data))
+            self._page_texts = [page.extract_text() for page in reader.pages]
+        return self._page_texts
+
+    def close(self):
+        if self._pdf is not None:
+            self._pdf.close()
+            self._pdf = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+@contextmanager
+def open_pdf(source):
+    """Use an open PdfDocument as is, or open (and afterwards close) the PDF at a path."""
+    if isinstance(source, PdfDocument):
+        yield source
+    else:
+        with PdfDocument(source) as document:
+            yield document
+
+
+def _pdf_path(source):
+    return source.path if isinstance(source, PdfDocument) else source
 
 
 def process_beilage_1(tables, headers):
@@ -18,231 +115,149 @@ def process_beilage_1(tables, headers):
     # Set proper column names
     combined_table.columns = ["LST", "Refundierungen", "Rechnungsbeträge"]
 
-    # Convert numbers to float
-    for col in ["Refundierungen", "Rechnungsbeträge"]:
-        combined_table[col] = (
-            combined_table[col].str.replace(".", "").str.replace(",", ".").astype(float)
-        )
+    # Convert amounts to integer cents
+    for col in MONEY_COLUMNS:
+        combined_table[col] = parse_german_cents(combined_table[col])
 
     return combined_table
 
 
+def line_text(chars, x_tolerance=DEFAULT_X_TOLERANCE):
+    """Text of characters on one line (sorted left to right), words separated by a single space"""
+    text = ""
+    for previous, char in zip([None] + chars, chars):
+        # A gap wider than x_tolerance separates words, as in pdfplumber's extract_words
+        if previous is not None and char["x0"] > previous["x1"] + x_tolerance:
+            text += " "
+        text += char["text"]
+    return " ".join(text.split())
+
+
+# Column starts of the header lines read so far, by layout (see header_columns).
+# The pages are not cropped to the table bbox: pdfplumber parses all characters
+# of a page before page.crop filters them, and that parsing is nearly all of the
+# time (Beilage_10: 16.6 s for page.chars, 0.16 s for read_column_rows).
+HEADER_COLUMNS = {}
+
+
+def layout_signature(chars):
+    """Text and rounded positions of the characters of a line; equal for repeated table layouts"""
+    return tuple((char["text"], round(char["x0"]), round(char["x1"])) for char in chars)
+
+
+def header_columns(line, header, page_number):
+    """
+    Column starts (x0 of the words) of a header line, checked against header
+
+    The Beilagen repeat a few table layouts on hundreds of pages, so the words
+    of a header line are extracted and checked once per layout; the pages after
+    that look the columns up by the layout signature of the line.
+    """
+    key = (tuple(header), layout_signature(line))
+    if key not in HEADER_COLUMNS:
+        words = extract_words(line)
+        if [word["text"] for word in words] != header:
+            found = " ".join(word["text"] for word in words)
+            raise ValueError(f"Unexpected table header on page {page_number}: {found}")
+        HEADER_COLUMNS[key] = [word["x0"] for word in words]
+    return HEADER_COLUMNS[key]
+
+
+def read_column_rows(page, header, line_tolerance=3, subheader=None):
+    """
+    Read table rows from the characters of a page, column by column
+
+    The columns are the x-ranges starting at the words of a header line (the
+    line whose first word is header[0], see header_columns) and, for headers
+    written over two lines, at the words of the subheader line right below it;
+    every character of the following lines goes into the column its midpoint
+    falls in. Yields None for each header line (a new table starts) and a list
+    of column texts for every other line below a header.
+    """
+    columns = None
+    subheader_next = False
+    for line in cluster_objects(page.chars, "top", line_tolerance):
+        line = sorted(line, key=lambda char: char["x0"])
+        if "".join(char["text"] for char in line[: len(header[0])]) == header[0]:
+            columns = header_columns(line, header, page.page_number)
+            subheader_next = subheader is not None
+            yield None
+            continue
+        if subheader_next:
+            columns = sorted(columns + header_columns(line, subheader, page.page_number))
+            subheader_next = False
+            continue
+        if columns is None:
+            continue
+
+        cells = [[] for _ in columns]
+        for char in line:
+            index = bisect_right(columns, (char["x0"] + char["x1"]) / 2) - 1
+            if index >= 0:
+                cells[index].append(char)
+        yield [line_text(chars) for chars in cells]
+
+
+def parse_count(text):
+    """Count with thousands separators ("38.168"); "-" or an empty cell is None"""
+    # A count may be split by a gap between its digits ("1 4.481")
+    text = "".join(text.split()).replace(".", "")
+    if text in ("", "-"):
+        return None
+    return int(text)
+
+
+def parse_days(text):
+    """Bearbeitungszeit in Kalendertagen ("29 KT"); None for a cell without one ("-", notes)"""
+    match = re.match(r"(\d+) KT", text)
+    return int(match.group(1)) if match else None
+
+
 def process_beilage_3(pdf_path):
+    """Anträge per ÖGK-LS, month and FG-Code (Beilage_3 to _6a, and _10 and _11 for the MTD-Berufe)"""
 
     total_df = pd.DataFrame([])
-    # Read the PDF with pdfplumber
-    with pdfplumber.open(pdf_path) as pdf:
+    # Read the PDF with pdfplumber (once per PdfDocument)
+    with open_pdf(pdf_path) as pdf:
         for page in pdf.pages:
+            tables = []
 
-            raw_table = page.extract_table(table_settings={"join_x_tolerance": 10})
-            # print(raw_table)
-
-            # Initialize lists for cleaned data
-            cleaned_data = []
-
-            # keep LS and month_year in this scope to save for last row
+            # keep LS and month_year in this scope to save for the Gesamt row
             month_year = None
             ls = None
 
-            for index, row in enumerate(raw_table):
-
-                # print(row, index)
-                if index == 0:  # Skip only the header row
+            for row in read_column_rows(page, ANTRAEGE_HEADER):
+                if row is None:
+                    tables.append([])
                     continue
-                parts = row[0].split(" ")
-                last_row = False
-                if index == len(raw_table) - 1:
-                    last_row = True
+
+                first_column = row[0].strip()
+                if first_column == "Gesamt":
+                    # ls and month_year are carried over from the row before
                     fg_code = None
                     title = "Gesamt"
-                    # ls and month_year are carried over from the second to last row in this table
-
-                print(parts)
-                if not last_row:
-                    ls = parts[0]
-                    month_year = parts[1]
-                    fg_code = int("".join(filter(str.isdigit, parts[2])))
-                if str(
-                    parts[-4].replace(".", "")
-                ).isnumeric():  # some rows have different format from pdfplumber
-                    # another test could probably be to check is len(parts[-2]) is 1
-                    if not last_row:
-                        title = " ".join(
-                            [parts[2].split(str(fg_code))[1]] + parts[3:-4]
-                        )
-                    if parts[-4] == "-":
-                        postal = None
-                    else:
-                        postal = int(parts[-4].replace(".", ""))
-                    if parts[-3] == "-":
-                        online = None
-                    else:
-                        online = int("".join(parts[-3:-1]).replace(".", ""))
-                else:
-                    if not last_row:
-                        title = " ".join(
-                            [parts[2].split(str(fg_code))[1]] + parts[3:-3]
-                        )
-                    if parts[-3] == "-":
-                        postal = None
-                    else:
-                        postal = int(parts[-3].replace(".", ""))
-                    if parts[-2] == "-":
-                        online = None
-                    else:
-                        online = int(parts[-2].replace(".", ""))
-                if parts[-1] == "-":
-                    gesamt = None
-                else:
-                    gesamt = int(parts[-1].replace(".", ""))
-
-                print(
-                    {
-                        "LS": ls,
-                        "Month_Year": month_year,
-                        "FG-Code": fg_code,
-                        "Title": title,
-                        "Postal": postal,
-                        "Online": online,
-                        "Gesamt": gesamt,
-                    }
-                )
+                elif first_column.startswith("ÖGK"):
+                    ls = first_column
+                    month_year = row[1].strip()
+                    fg_code = int(row[2])
+                    title = row[3]
+                else:  # "postalische online" above the header, page numbers and footers
+                    continue
 
                 data_entry = {
                     "ÖGK-LS": ls,
                     "Monat.Jahr": month_year,
                     "FG-Code": fg_code,
                     "Fachrichtung": title.strip(),
-                    "postal": postal,
-                    "online": online,
-                    "Gesamt": gesamt,
+                    "postal": parse_count(row[4]),
+                    "online": parse_count(row[5]),
+                    "Gesamt": parse_count(row[6]),
                 }
-                # print(data_entry)
-                cleaned_data.append(data_entry)
-
-            # Create DataFrame from cleaned data
-            cleaned_df = pd.DataFrame(cleaned_data)
-
-            # Sort by FG-Code, putting None values at the end
-            cleaned_df = cleaned_df.sort_values(
-                "FG-Code", na_position="last"
-            ).reset_index(drop=True)
+                tables[-1].append(data_entry)
 
-            total_df = pd.concat([total_df, cleaned_df])
-
-        return total_df
-
-
-def process_beilage_10(pdf_path):
-
-    total_df = pd.DataFrame([])
-    # Read the PDF with pdfplumber
-    with pdfplumber.open(pdf_path) as pdf:
-        for page in pdf.pages:
-            tables = page.find_tables()
-            extracted_tables = list(map(lambda x: x.extract(), tables))
-            if pdf_path.endswith("Beilage_10.pdf"):
-                if page.page_number in [2, 10, 18, 26, 34, 42, 50, 58, 66, 74]:
-                    relevant_table = extracted_tables[2]
-                    relevant_table[4] = [relevant_table[4][0].split("\n")[0]]
-                    extracted_tables = (
-                        extracted_tables[:2]
-                        + [relevant_table[:5]]
-                        + [relevant_table[4:]]
-                        + extracted_tables[3:]
-                    )
-                    # if table_index == 2:
-                    #    print(raw_table)
-                    #    raw_table[3] = [raw_table[3][0].split("\n")[0]]
-                    #    #raw_table = raw_table[1:]
-            for table_index, raw_table in enumerate(extracted_tables):
+            for table_index, cleaned_data in enumerate(tables):
                 print(f"processing table {table_index+1} on page {page.page_number}")
 
-                # Initialize lists for cleaned data
-                cleaned_data = []
-                # print(raw_table)
-                # raw_table = raw_table[1][0].split("\n")+[raw_table[2][0], raw_table[3][0]]
-                raw_table = raw_table[1:]
-                print(raw_table)
-                month_year = None
-                ls = None
-                for index, row in enumerate(raw_table):
-
-                    print(row, index)
-                    # if index in [0, 1, 2, 3, 4]:  # Skip header rows
-                    #    continue
-                    parts = row[0].split(" ")
-                    print(parts)
-                    last_row = False
-                    if index == len(raw_table) - 1:
-                        last_row = True
-                        fg_code = None
-                        title = "Gesamt"
-                        # ls and month_year are carried over from the second to last row in this table
-
-                    # print(parts)
-                    if not last_row:
-                        ls = parts[0]
-                        month_year = parts[1]
-                        fg_code = int("".join(filter(str.isdigit, parts[2])))
-                    if str(
-                        parts[-4].replace(".", "")
-                    ).isnumeric():  # some rows have different format from pdfplumber
-                        # another test could probably be to check is len(parts[-2]) is 1
-                        if not last_row:
-                            title = " ".join(
-                                [parts[2].split(str(fg_code))[1]] + parts[3:-4]
-                            )
-                        if parts[-4] == "-":
-                            postal = None
-                        else:
-                            postal = int(parts[-4].replace(".", ""))
-                        if parts[-3] == "-":
-                            online = None
-                        else:
-                            online = int("".join(parts[-3:-1]).replace(".", ""))
-                    else:
-                        if not last_row:
-                            title = " ".join(
-                                [parts[2].split(str(fg_code))[1]] + parts[3:-3]
-                            )
-                        if parts[-3] == "-":
-                            postal = None
-                        else:
-                            postal = int(parts[-3].replace(".", ""))
-                        if parts[-2] == "-":
-                            online = None
-                        else:
-                            online = int(parts[-2].replace(".", ""))
-                    if parts[-1] == "-":
-                        gesamt = None
-                    else:
-                        gesamt = int(parts[-1].replace(".", ""))
-
-                    print(
-                        {
-                            "LS": ls,
-                            "Month_Year": month_year,
-                            "FG-Code": fg_code,
-                            "Title": title,
-                            "Postal": postal,
-                            "Online": online,
-                            "Gesamt": gesamt,
-                        }
-                    )
-
-                    data_entry = {
-                        "ÖGK-LS": ls,
-                        "Monat.Jahr": month_year,
-                        "FG-Code": fg_code,
-                        "Fachrichtung": title.strip(),
-                        "postal": postal,
-                        "online": online,
-                        "Gesamt": gesamt,
-                    }
-                    # print(data_entry)
-                    cleaned_data.append(data_entry)
-
                 # Create DataFrame from cleaned data
                 cleaned_df = pd.DataFrame(cleaned_data)
 
@@ -259,18 +274,16 @@ def process_beilage_10(pdf_path):
 def process_beilage_2(pdf_path):
     """Special processing for Beilage_2 tables"""
 
-    # Read the PDF with pdfplumber
-    with pdfplumber.open(pdf_path) as pdf:
+    # Read the PDF with pdfplumber (once per PdfDocument)
+    with open_pdf(pdf_path) as pdf:
         page = pdf.pages[0]
         raw_table = page.extract_table()
-        # print(raw_table)
 
         # Initialize lists for cleaned data
         cleaned_data = []
 
         for index, row in enumerate(raw_table):
 
-            # print(row)
             if index == 0:  # Skip header row
                 continue
 
@@ -290,7 +303,6 @@ def process_beilage_2(pdf_path):
             else:
                 if index == len(raw_table) - 1:
                     # last row
-                    print(parts[0].split(" "))
                     fg_code = None
                     title = "Gesamt"
                     ref = "".join(parts[0].split(" ")[1:3])
@@ -309,27 +321,19 @@ def process_beilage_2(pdf_path):
                     ref = parts[0].split(" ")[-2]
                     rech = parts[0].split(" ")[-1]
 
-            ref_value = (
-                float(str(ref).replace(".", "").replace(",", "."))
-                if ref != "-"
-                else None
-            )
-            rech_value = (
-                float(str(rech).replace(".", "").replace(",", "."))
-                if rech != "-"
-                else None
-            )
+            # Amounts are kept as text here and parsed for the whole table below
             data_entry = {
                 "FG-Code": fg_code,
                 "Fachrichtung": title.strip(),
-                "Refundierungen": ref_value,
-                "Rechnungsbeträge": rech_value,
+                "Refundierungen": ref,
+                "Rechnungsbeträge": rech,
             }
-            # print(data_entry)
             cleaned_data.append(data_entry)
 
         # Create DataFrame from cleaned data
         cleaned_df = pd.DataFrame(cleaned_data)
+        for col in MONEY_COLUMNS:
+            cleaned_df[col] = parse_german_cents(cleaned_df[col])
 
         # Sort by FG-Code, putting None values at the end
         cleaned_df = cleaned_df.sort_values("FG-Code", na_position="last").reset_index(
@@ -340,105 +344,62 @@ def process_beilage_2(pdf_path):
 
 
 def process_beilage_8(pdf_path):
-    """Special processing for Beilage_8 and Beilage_9 tables"""
+    """Refundierungen and Rechnungsbeträge per ÖGK-LS, year and MTD-Beruf (Beilage_8 and Beilage_9)"""
     total_df = pd.DataFrame([])
-    # Read the PDF with pdfplumber
-    with pdfplumber.open(pdf_path) as pdf:
+    # Read the PDF with pdfplumber (once per PdfDocument)
+    with open_pdf(pdf_path) as pdf:
         for page in pdf.pages:
-            tables = page.find_tables()
-            for table_index, table in enumerate(tables):
-                print(f"processing table {table_index+1} on page {page.page_number}")
-                raw_table = table.extract()
+            tables = []
 
-                # Initialize lists for cleaned data
-                cleaned_data = []
-                # print(raw_table)
-                raw_table = raw_table[1][0].split("\n") + [
-                    raw_table[2][0],
-                    raw_table[3][0],
-                ]
-                # print(raw_table)
-                month_year = None
-                ls = None
-                for index, row in enumerate(raw_table):
+            # keep LS and month_year in this scope to save for the Gesamt row
+            month_year = None
+            ls = None
 
-                    # keep LS and month_year in this scope to save for last row
+            for header in BETRAEGE_HEADERS:
+                rows = list(read_column_rows(page, header))
+                if rows:  # rows are only read below a header line
+                    break
 
-                    last_row = False
-                    if index == len(raw_table) - 1:
-                        last_row = True
-                    parts = row.split("\n")
-                    print(parts)
+            for row in rows:
+                if row is None:
+                    tables.append([])
+                    continue
 
-                    parts_parts = parts[0].split(" ")
-                    if last_row:
-                        month_year = "Durchschnitt " + month_year[-2:]
-                        fg_code = None
-                        title = "Gesamt"
-                        ref = parts_parts[1]
-                        if pdf_path.endswith("Beilage_9.pdf"):
-                            rech = "".join(parts_parts[2:4])
-                        else:
-                            rech = parts_parts[2]
-                    else:
-                        ls = parts_parts[0]
-                        month_year = parts_parts[1]
-                        fg_code = int(parts_parts[2])
-                        title = parts_parts[3]
-                        unprofessional = False
-                        if pdf_path.endswith("Beilage_9.pdf"):
-                            if ls == "ÖGK-K" and index in [0, 2]:
-                                unprofessional = True
-                            if ls == "ÖGK-O" and table_index == 0 and index in [1]:
-                                unprofessional = True
-                            if ls == "ÖGK-S":
-                                if table_index in [0, 1]:
-                                    if index in [2]:
-                                        unprofessional = True
-                                if table_index == 2:
-                                    if index in [1, 2]:
-                                        unprofessional = True
-                            if ls == "ÖGK-ST":
-                                if table_index in [0, 1]:
-                                    if index in [0, 1]:
-                                        unprofessional = True
-                                if table_index == 2:
-                                    if index in [0, 1, 2]:
-                                        unprofessional = True
-                            if ls == "ÖGK-T":
-                                if index in [1]:
-                                    unprofessional = True
-
-                        if unprofessional:
-                            ref = parts_parts[-3]
-                            rech = "".join(parts_parts[-2:])
-                        else:
-                            ref = parts_parts[-2]
-                            rech = parts_parts[-1]
-
-                    ref_value = (
-                        float(str(ref).replace(".", "").replace(",", "."))
-                        if ref != "-"
-                        else None
-                    )
-                    rech_value = (
-                        float(str(rech).replace(".", "").replace(",", "."))
-                        if rech != "-"
-                        else None
-                    )
-                    data_entry = {
-                        "ÖGK-LS": ls,
-                        "Monat.Jahr": month_year,
-                        "FG-Code": fg_code,
-                        "Fachrichtung": title.strip(),
-                        "Refundierungen": ref_value,
-                        "Rechnungsbeträge": rech_value,
-                    }
-                    # print(data_entry)
-                    cleaned_data.append(data_entry)
+                first_column = row[0].strip()
+                if first_column == "ÖGK-":  # upper header line "ÖGK- FG- MTD- MTD-" of the next table
+                    continue
+                if "".join(row[:2]) == "Gesamt":  # the label reaches into the Jahr column
+                    # ls is carried over from the rows before, the Gesamt row averages their year
+                    month_year = "Durchschnitt " + month_year[-2:]
+                    fg_code = None
+                    title = "Gesamt"
+                elif first_column.startswith("ÖGK"):
+                    ls = first_column
+                    month_year = row[1].strip()
+                    fg_code = int(row[2])
+                    title = row[3]
+                else:  # footers
+                    continue
+
+                # Amounts are kept as text here and parsed for the whole table below;
+                # an amount may be split by a gap between its digits ("5 .322.730,11")
+                data_entry = {
+                    "ÖGK-LS": ls,
+                    "Monat.Jahr": month_year,
+                    "FG-Code": fg_code,
+                    "Fachrichtung": title.strip(),
+                    "Refundierungen": "".join(row[4].split()),
+                    "Rechnungsbeträge": "".join(row[5].split()),
+                }
+                tables[-1].append(data_entry)
+
+            for table_index, cleaned_data in enumerate(tables):
+                print(f"processing table {table_index+1} on page {page.page_number}")
 
                 # Create DataFrame from cleaned data
                 cleaned_df = pd.DataFrame(cleaned_data)
+                for col in MONEY_COLUMNS:
+                    cleaned_df[col] = parse_german_cents(cleaned_df[col])
 
                 # Sort by FG-Code, putting None values at the end
                 cleaned_df = cleaned_df.sort_values(
@@ -451,108 +412,45 @@ def process_beilage_8(pdf_path):
 
 
 def process_beilage_7(pdf_path):
+    """Bearbeitungszeit per ÖGK-LS, month and Antragsart (Beilage_7 and Beilage_12)"""
     total_df = pd.DataFrame([])
-    # Read the PDF with pdfplumber
-    with pdfplumber.open(pdf_path) as pdf:
+    # Read the PDF with pdfplumber (once per PdfDocument)
+    with open_pdf(pdf_path) as pdf:
         for page in pdf.pages:
-            raw_table = page.extract_table(table_settings={"join_x_tolerance": 10})
-            # print(raw_table)
-
             # Initialize lists for cleaned data
             cleaned_data = []
 
-            # keep LS and month_year in this scope to save for last row
-            month_year = None
+            # keep LS in this scope to save for the Durchschnitt row
             ls = None
 
-            for index, row in enumerate(raw_table):
-
-                print(row, index)
-                if index in [0, 1, len(raw_table) - 1]:  # Skip header and empty rows
+            for row in read_column_rows(page, BEARBEITUNGSZEIT_HEADER, subheader=BEARBEITUNGSZEIT_SUBHEADER):
+                if row is None:
                     continue
-                # split by new line (needed for Vorarlberg)
-                parts = row[0].split("\n")[-1].split(" ")
-                print(parts)
-                last_row = False
-                shift = 0
-                if index == len(raw_table) - 2:  # empty row after last row with content
-                    last_row = True
-                    month_year = "Durchschnitt"
-                    shift = -1
-
-                if not last_row:
-                    ls = parts[0]
-                    month_year = parts[1]
-
-                # WAHonline data is not avilable for all
-                WAHonline_available = False
-                if ls in [
-                    "ÖGK-B",
-                    "ÖGK-K",
-                    "ÖGK-N",
-                    "ÖGK-O",
-                    "ÖGK-S",
-                    "ÖGK-ST",
-                    "ÖGK-T",
-                ]:
-                    if month_year not in ["Jän.23", "Feb.23", "Mär.23", "Apr.23"]:
-                        WAHonline_available = True
-                elif ls in ["ÖGK-W"]:
-                    if month_year not in [
-                        "Jän.23",
-                        "Feb.23",
-                        "Mär.23",
-                        "Apr.23",
-                        "Mai.23",
-                        "Jun.23",
-                    ]:
-                        WAHonline_available = True
-                elif "ÖGK-V" in row[0]:
-                    WAHonline_available = False  # no data available for ÖGK-V
-
-                if WAHonline_available:
-                    onlineWAH = int(parts[6 + shift].replace(".", ""))
-                else:
-                    onlineWAH = None
-
-                if pdf_path.endswith("Beilage_12.pdf"):
-                    if month_year not in ["Jän.23", "Feb.23", "Mär.23", "Apr.23"]:
-                        # no data in any bundesland before Mai.23
-                        postal = int(parts[2 + shift].replace(".", ""))
-                        onlineMeine = int(parts[4 + shift].replace(".", ""))
-                    else:
-                        postal = None
-                        onlineMeine = None
-                else:
-                    postal = int(parts[2 + shift].replace(".", ""))
-                    onlineMeine = int(parts[4 + shift].replace(".", ""))
 
-                print(
-                    {
-                        "LS": ls,
-                        "Month_Year": month_year,
-                        "Postal": postal,
-                        "OnlineMeine": onlineMeine,
-                        "OnlineWAH": onlineWAH,
-                    }
-                )
+                first_column = row[0].strip()
+                if first_column == "Ø":
+                    month_year = "Durchschnitt"
+                elif first_column.startswith("ÖGK"):
+                    ls = first_column
+                    # the note of a month without data may reach into the Monat column
+                    month_year = row[1].split()[0]
+                else:  # notes spanning several lines (ÖGK-V), page numbers and footers
+                    continue
 
+                # Months without data have a note ("Vor Mai 2023 keine zentralen ...") or "-"
+                # instead of the Kalendertage (row[3] is the empty column under "KE")
                 data_entry = {
                     "ÖGK-LS": ls,
                     "Monat.Jahr": month_year,
-                    "Postal": postal,
-                    "OnlineMeine": onlineMeine,
-                    "OnlineWAH": onlineWAH,
+                    "Postal": parse_days(row[2]),
+                    "OnlineMeine": parse_days(row[4]),
+                    "OnlineWAH": parse_days(row[5]),
                 }
-                # print(data_entry)
                 cleaned_data.append(data_entry)
 
             # Create DataFrame from cleaned data
             cleaned_df = pd.DataFrame(cleaned_data)
 
-            # Sort by FG-Code, putting None values at the end
-            cleaned_df = cleaned_df.reset_index(drop=True)
-
             total_df = pd.concat([total_df, cleaned_df])
 
         return total_df
@@ -560,8 +458,8 @@ def process_beilage_7(pdf_path):
 
 def process_beilage_7a(pdf_path):
     total_df = pd.DataFrame([])
-    # Read the PDF with pdfplumber
-    with pdfplumber.open(pdf_path) as pdf:
+    # Read the PDF with pdfplumber (once per PdfDocument)
+    with open_pdf(pdf_path) as pdf:
         for page in pdf.pages:
             tables = page.find_tables()
             for table_index, table in enumerate(tables):
@@ -589,7 +487,6 @@ def process_beilage_7a(pdf_path):
                         continue
 
                 for index, row in enumerate(raw_table):
-                    print(row, index)
                     if table_index == 0:
                         wrong_row_indices = [0, 1, last_row_index + 1]
                     else:
@@ -610,7 +507,6 @@ def process_beilage_7a(pdf_path):
                     if index in wrong_row_indices:  # Skip header and empty rows
                         continue
                     parts = row[0].split(" ")
-                    print(parts)
                     last_row = False
                     shift = 0
                     if index == last_row_index:
@@ -625,22 +521,12 @@ def process_beilage_7a(pdf_path):
                     postal = int(parts[2 + shift].replace(".", ""))
                     onlineMeine = int(parts[4 + shift].replace(".", ""))
 
-                    print(
-                        {
-                            "LS": ls,
-                            "Month_Year": month_year,
-                            "Postal": postal,
-                            "OnlineMeine": onlineMeine,
-                        }
-                    )
-
                     data_entry = {
                         "ÖGK-LS": ls,
                         "Monat.Jahr": month_year,
                         "Postal": postal,
                         "OnlineMeine": onlineMeine,
                     }
-                    # print(data_entry)
                     cleaned_data.append(data_entry)
 
                 # Create DataFrame from cleaned data
@@ -655,12 +541,9 @@ def process_beilage_7a(pdf_path):
 
 
 def extract_question_from_pdf(pdf_path):
-    """Extract the question from a PDF"""
-    with open(pdf_path, "rb") as file:
-        reader = PdfReader(file)
-        text = ""
-        for page in reader.pages:
-            text += page.extract_text() + "\n\n"
+    """Extract the question from a PDF (path or PdfDocument)"""
+    with open_pdf(pdf_path) as pdf:
+        text = "".join(page_text + "\n\n" for page_text in pdf.page_texts)
 
     # Try different patterns to find the question
     patterns = [
@@ -681,312 +564,77 @@ def extract_question_from_pdf(pdf_path):
     return "Question not found"
 
 
-def check_and_convert_to_int(df, columns, filename=None):
-    """
-    Check if any values in the specified columns are floats and convert them to integers.
-    Raises a warning if floating point values are found.
-    
-    Args:
-        df (pandas.DataFrame): The dataframe to check and convert
-        columns (list): List of column names to check and convert
-        filename (str, optional): Name of the file being processed, for better warning messages
-        
-    Returns:
-        pandas.DataFrame: The dataframe with converted columns
-    """
-    file_info = f" in {filename}" if filename else ""
-    
-    for col in columns:
-        if col in df.columns:
-            # Check if any non-null values have decimal parts
-            non_null_values = df[col].dropna()
-            if len(non_null_values) > 0:
-                # Check if any values are not equal to their integer representation
-                if any(non_null_values != non_null_values.astype(int)):
-                    print(f"WARNING: Found floating point values in column {col}{file_info}!")
-                    # Print the problematic values for debugging
-                    problematic = non_null_values[non_null_values != non_null_values.astype(int)]
-                    print(f"Problematic values: {problematic.tolist()}")
-                
-                # Convert to int regardless (will truncate any decimals)
-                df[col] = df[col].apply(
-                    lambda x: int(x) if pd.notnull(x) else None
-                )
-    
-    return df
+def parse_pdf_beilage(spec, pdf_path, tables=None):
+    """Run the parser of a registry entry (see anfrage_registry.py) on a Beilage PDF"""
+    parser = globals()[spec["function"]]
+    if spec["parser"] == "pdf_tables":
+        if tables is None:
+            tables = extract_tables_from_pdf(pdf_path, None)
+        headers = tables[0].iloc[0] if tables else None
+        combined_table = parser(tables, headers)
+    else:
+        combined_table = parser(pdf_path)
 
+    if spec.get("check_integers"):
+        integer_columns = OUTPUT_SCHEMAS[spec["schema"]]["integer_columns"]
+        combined_table = check_and_convert_to_int(combined_table, integer_columns, _pdf_path(pdf_path))
+    return combined_table
 
-def ensure_integers_in_dict(data_dict):
-    """
-    Recursively check dictionaries and lists for float values that are actually integers
-    and convert them to proper integers.
-    
-    Args:
-        data_dict: Dictionary, list, or scalar value to process
-        
-    Returns:
-        Processed data with floats converted to ints where appropriate
-    """
-    if isinstance(data_dict, dict):
-        return {k: ensure_integers_in_dict(v) for k, v in data_dict.items()}
-    elif isinstance(data_dict, list):
-        return [ensure_integers_in_dict(item) for item in data_dict]
-    elif isinstance(data_dict, float) and data_dict.is_integer():
-        return int(data_dict)
-    else:
-        return data_dict
 
+def process_beilage_tables(tables, pdf_path, save_dir, anfrage="2024_Anfrage"):
+    """
+    Process tables from a Beilage PDF (path or PdfDocument) and save as both CSV and JSON
 
-def process_beilage_tables(tables, pdf_path, save_dir):
-    """Process tables from a Beilage PDF and save as both CSV and JSON"""
+    With tables=None the tables are only extracted for Beilagen that need
+    them (pdf_tables parsers and unregistered Beilagen); the pdf_text parsers
+    read the pages themselves.
+    """
 
     # Get the base filename without extension
-    base_filename = os.path.splitext(os.path.basename(pdf_path))[0]
-
-    if not tables:
-        print(f"No tables found in: {pdf_path}")
-        return
-
-    # Store headers
-    headers = tables[0].iloc[0] if tables else None
-
-    # Process based on Beilage type
-    if base_filename == "Beilage_1":
-        combined_table = process_beilage_1(tables, headers)
-        metadata = {
-            "question": extract_question_from_pdf(pdf_path),
-            "units": {"Refundierungen": "EUR", "Rechnungsbeträge": "EUR"},
-            "year": "2023",
-            "original_headers": {
-                "columns": [
-                    "LST",
-                    "Wahlarztkostenrefundierungen",
-                    "Wahlarztkostenrechnungsbeträge",
-                ]
-            },
-        }
-
-    elif base_filename in ("Beilage_2"):
-        combined_table = process_beilage_2(pdf_path)
-        metadata = {
-            "question": extract_question_from_pdf(pdf_path),
-            "units": {"Refundierungen": "EUR", "Rechnungsbeträge": "EUR"},
-            "year": "2023",
-            "description": {
-                "Refundierungen": "Wahlarztkostenrefundierungen nach Fachrichtung",
-                "Rechnungsbeträge": "Wahlarztkostenrechnungsbeträge nach Fachrichtung",
-            },
-        }
-
-    elif base_filename in (
-        "Beilage_3",
-        "Beilage_4",
-        "Beilage_5",
-        "Beilage_5a",
-        "Beilage_6",
-        "Beilage_6a",
-    ):
-        combined_table = process_beilage_3(pdf_path)
-        
-        # For Beilage_3 and Beilage_4, check if any values are floats and convert to int
-        if base_filename in ("Beilage_3", "Beilage_4"):
-            combined_table = check_and_convert_to_int(combined_table, ["postal", "online", "Gesamt"], pdf_path)
-        
-        metadata = {
-            "question": extract_question_from_pdf(pdf_path),
-            "units": {"postal": "Anzahl", "online": "Anzahl", "Gesamt": "Anzahl"},
-            "year": "2023",
-            "description": {
-                "postal": "postalische Anträge nach Monat und Fachrichtung",
-                "online": "online Anträge nach Monat und Fachrichtung",
-            },
-        }
-
-    elif base_filename in ("Beilage_7", "Beilage_12"):
-        combined_table = process_beilage_7(pdf_path)
-        metadata = {
-            "question": extract_question_from_pdf(pdf_path),
-            "units": {
-                "postal": "Kalendertage",
-                "OnlineMeine": "Kalendertage",
-                "OnlineWAH": "Kalendertage",
-            },
-            "year": "2023",
-            "description": {
-                "postal": "postalische Anträge nach Monat",
-                "OnlineMeine": "online Anträge nach Monat",
-                "OnlineWAH": "online Anträge nach Monat",
-            },
-        }
-    elif base_filename in ("Beilage_7a"):
-        combined_table = process_beilage_7a(pdf_path)
-        metadata = {
-            "question": extract_question_from_pdf(pdf_path),
-            "units": {
-                "postal": "Kalendertage",
-                "OnlineMeine": "Kalendertage",
-            },
-            "year": "2023",
-            "description": {
-                "postal": "postalische Anträge nach Monat",
-                "OnlineMeine": "online Anträge nach Monat",
-            },
-        }
-    elif base_filename in ("Beilage_8", "Beilage_9"):
-        combined_table = process_beilage_8(pdf_path)
-        metadata = {
-            "question": extract_question_from_pdf(pdf_path),
-            "units": {"Refundierungen": "EUR", "Rechnungsbeträge": "EUR"},
-            "year": "2023",
-            "description": {
-                "Refundierungen": "Wahlarztkostenrefundierungen nach Fachrichtung",
-                "Rechnungsbeträge": "Wahlarztkostenrechnungsbeträge nach Fachrichtung",
-            },
-        }
-    elif base_filename in ("Beilage_10", "Beilage_11"):
-        combined_table = process_beilage_10(pdf_path)
-        
-        # Check if any numeric values are actually floats and convert to int
-        combined_table = check_and_convert_to_int(combined_table, ["postal", "online", "Gesamt"], pdf_path)
-        
-        metadata = {
-            "question": extract_question_from_pdf(pdf_path),
-            "units": {"postal": "Anzahl", "online": "Anzahl", "Gesamt": "Anzahl"},
-            "year": "2023",
-            "description": {
-                "postal": "postalische Anträge nach Monat und Fachrichtung",
-                "online": "online Anträge nach Monat und Fachrichtung",
-            },
-        }
+    base_filename = os.path.splitext(os.path.basename(_pdf_path(pdf_path)))[0]
 
-    else:
-        # Default processing for other Beilage files
-        combined_table = pd.concat(tables, ignore_index=True)
-        metadata = {
-            "question": extract_question_from_pdf(pdf_path),
-            "processed_date": pd.Timestamp.now().strftime("%Y-%m-%d"),
-        }
-
-    # Convert all numeric columns to integers where appropriate
-    for col in combined_table.columns:
-        if combined_table[col].dtype == float:
-            # Check if all non-null values are integers
-            non_null = combined_table[col].dropna()
-            if len(non_null) > 0 and all(non_null == non_null.astype(int)):
-                # Convert to integer type for both CSV and JSON output
-                combined_table[col] = combined_table[col].apply(
-                    lambda x: int(x) if pd.notnull(x) else None
-                )
-
-    # Save as JSON with metadata
-    data_dict = combined_table.to_dict(orient="records")
-    
-    # Ensure all integer values are properly represented in the data dictionary
-    data_dict = ensure_integers_in_dict(data_dict)
-    
-    data_with_metadata = {
-        "metadata": metadata,
-        "data": data_dict,
-    }
-    save_json(save_dir, base_filename, data_with_metadata)
-    save_csv(save_dir, base_filename, combined_table)
+    # Parser and output schema of this Beilage
+    spec = ANFRAGEN[anfrage]["beilagen"].get(base_filename)
 
+    with open_pdf(pdf_path) as document:
+        if tables is None and (spec is None or spec["parser"] == "pdf_tables"):
+            tables = extract_tables_from_pdf(document, save_dir)
 
-def verify_json_integers(json_path):
-    """
-    Verify that integer values are properly saved as integers in the JSON file.
-    
-    Args:
-        json_path (str): Path to the JSON file to verify
-        
-    Returns:
-        bool: True if all integer values are properly saved as integers, False otherwise
-    """
-    with open(json_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-    
-    def check_for_integer_floats(obj, path=""):
-        """Check if any floats should be integers in the JSON data"""
-        if isinstance(obj, dict):
-            for k, v in obj.items():
-                current_path = f"{path}.{k}" if path else k
-                if not check_for_integer_floats(v, current_path):
-                    return False
-        elif isinstance(obj, list):
-            for i, item in enumerate(obj):
-                current_path = f"{path}[{i}]"
-                if not check_for_integer_floats(item, current_path):
-                    return False
-        elif isinstance(obj, float) and obj.is_integer():
-            print(f"WARNING: Found float with integer value at {path}: {obj}")
-            return False
-        return True
-    
-    return check_for_integer_floats(data)
+        if tables is not None and not tables:
+            print(f"No tables found in: {document.path}")
+            return
 
+        if spec is not None:
+            combined_table = parse_pdf_beilage(spec, document, tables)
+            metadata = beilage_metadata(
+                spec, spec.get("year", ANFRAGEN[anfrage]["year"]), extract_question_from_pdf(document)
+            )
+        else:
+            # Default processing for other Beilage files
+            combined_table = pd.concat(tables, ignore_index=True)
+            metadata = {
+                "question": extract_question_from_pdf(document),
+                "processed_date": pd.Timestamp.now().strftime("%Y-%m-%d"),
+            }
 
-def save_json(save_dir, base_filename, data_with_metadata):
-    """
-    Save data with metadata as JSON file.
-    Ensures integer values are saved as integers, not floats.
-    """
-    # Custom JSON encoder to handle integer values
-    class IntegerEncoder(json.JSONEncoder):
-        def default(self, obj):
-            if isinstance(obj, pd.Series):
-                return obj.tolist()
-            if isinstance(obj, float) and obj.is_integer():
-                return int(obj)
-            return super().default(obj)
-    
-    # Apply the conversion to the entire data structure
-    processed_data = ensure_integers_in_dict(data_with_metadata)
-
-    json_dir = os.path.join(save_dir, "json_files")
-    os.makedirs(json_dir, exist_ok=True)
-    json_path = os.path.join(json_dir, f"{base_filename}_data.json")
-    with open(json_path, "w", encoding="utf-8") as f:
-        json.dump(processed_data, f, ensure_ascii=False, indent=4, cls=IntegerEncoder)
-    print(f"Saved JSON to: {json_path}")
-    
-    # Verify that integer values are properly saved
-    if not verify_json_integers(json_path):
-        print(f"WARNING: Some integer values may not be properly saved in {json_path}")
-    else:
-        print(f"Integer values verified in {json_path}")
+    save_beilage_table(combined_table, metadata, base_filename, save_dir)
 
 
-def save_csv(save_dir, base_filename, combined_table):
-    """
-    Save combined table as CSV file.
-    Ensures integer values are saved as integers, not floats.
-    """
-    # Convert float columns that contain only integers to integer type
-    for col in combined_table.columns:
-        if combined_table[col].dtype == float:
-            # Check if all non-null values are integers
-            non_null = combined_table[col].dropna()
-            if len(non_null) > 0 and all(non_null == non_null.astype(int)):
-                # Convert to integer type
-                combined_table[col] = combined_table[col].astype('Int64')  # pandas nullable integer type
-    
-    csv_dir = os.path.join(save_dir, "csv_files")
-    os.makedirs(csv_dir, exist_ok=True)
-    csv_path = os.path.join(csv_dir, f"{base_filename}_combined_tables.csv")
-    combined_table.to_csv(csv_path, index=False, quoting=1)
-    print(f"Saved CSV to: {csv_path}")
+def extract_text_tables(pdf_path, table_settings):
+    """Tables found with pdfplumber table_settings, as DataFrames with the header as first row"""
+    with open_pdf(pdf_path) as pdf:
+        return [pd.DataFrame(table) for page in pdf.pages for table in page.extract_tables(table_settings)]
 
 
 def extract_tables_from_pdf(pdf_path, output_dir):
-    """Extract tables from a PDF and process them"""
-    if pdf_path.endswith("_1.pdf"):
-        # beilage 1 used another package
-        tables = tabula.read_pdf(pdf_path, pages="all", multiple_tables=True)
-        return tables
+    """Extract tables from a PDF (path or PdfDocument) and process them"""
+    if _pdf_path(pdf_path).endswith("_1.pdf"):
+        # beilage 1 has no column lines (the header row stays in the table, see process_beilage_1)
+        return extract_text_tables(pdf_path, BEILAGE_1_TABLE_SETTINGS)
 
     tables = []
 
-    with pdfplumber.open(pdf_path) as pdf:
+    with open_pdf(pdf_path) as pdf:
         for page in pdf.pages:
             # Extract tables from each page
             page_tables = page.extract_tables()
@@ -1042,8 +690,9 @@ def main():
         )
         for pdf_path in pdf_paths:
             print(f"Processing: {pdf_path}")
-            tables = extract_tables_from_pdf(pdf_path, output_directory)
-            process_beilage_tables(tables, pdf_path, output_directory)
+            # Each PDF is read once for its tables, its parser and its question
+            with PdfDocument(pdf_path) as document:
+                process_beilage_tables(None, document, output_directory)
 
         print("Finished processing.")
         print("\nTo see warnings with context, run the following command:")
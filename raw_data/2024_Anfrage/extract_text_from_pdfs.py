@@ -1,44 +1,181 @@
+"""
+Extract the full text of the downloaded PDFs into extracted_data/text_files.
+
+    python extract_text_from_pdfs.py
+    python extract_text_from_pdfs.py --jobs 4 --pages
+    python extract_text_from_pdfs.py --pdf-dir ../2025_Anfrage --output-dir ../2025_Anfrage/extracted_data/text_files
+
+PDFs whose text file is newer than the PDF, or whose content hash matches the
+one recorded at the last extraction (e.g. after downloading the same file
+again), are skipped. The PDFs are extracted in parallel worker processes.
+With --pages the text of every page is also saved as JSON
+(text_files/pages/<name>.json), so later steps can use it per page without
+extracting again.
+"""
+import argparse
+import hashlib
+import json
 import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
 import PyPDF2
 
-def extract_text_from_pdf(pdf_path, output_dir):
-    # Extract text from the PDF
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Directory containing the PDFs
+pdf_directory = os.path.join(SCRIPT_DIR, 'downloaded_files')
+
+# Directory for saving text files
+text_directory = os.path.join(SCRIPT_DIR, 'extracted_data', 'text_files')
+
+# Content hashes of the extracted PDFs (file name -> SHA-256), kept in the text directory
+HASHES_FILE = "pdf_hashes.json"
+PAGES_DIR = "pages"
+
+
+def sha256_of_file(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def text_path(pdf_path, output_dir):
+    base_filename = os.path.splitext(os.path.basename(pdf_path))[0]
+    return os.path.join(output_dir, f"{base_filename}_full_text.txt")
+
+
+def pages_path(pdf_path, output_dir):
+    base_filename = os.path.splitext(os.path.basename(pdf_path))[0]
+    return os.path.join(output_dir, PAGES_DIR, f"{base_filename}.json")
+
+
+def saved_page_texts(pdf_path, pdf_hash):
+    """
+    Page texts saved with --pages for a PDF with this content hash, or None.
+
+    They are looked up in extracted_data/text_files/pages next to the PDF or
+    one folder up (e.g. 2024_Anfrage/downloaded_files/Beilage_1.pdf).
+    """
+    folder = os.path.dirname(os.path.abspath(pdf_path))
+    for anfrage_dir in (folder, os.path.dirname(folder)):
+        path = pages_path(pdf_path, os.path.join(anfrage_dir, 'extracted_data', 'text_files'))
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                saved = json.load(f)
+            if saved.get("sha256") == pdf_hash:
+                return saved["pages"]
+    return None
+
+
+def extract_page_texts(pdf_path):
+    """Return the text of every page of a PDF."""
     with open(pdf_path, 'rb') as file:
         reader = PyPDF2.PdfReader(file)
-        text = ""
-        for page in reader.pages:
-            text += page.extract_text() + "\n\n"
-    
-    # Get the base filename without extension
-    base_filename = os.path.splitext(os.path.basename(pdf_path))[0]
-    
-    # Save the extracted text to a file
-    txt_filename = f"{base_filename}_full_text.txt"
-    txt_path = os.path.join(output_dir, txt_filename)
+        return [page.extract_text() for page in reader.pages]
+
+
+def extract_text_from_pdf(pdf_path, output_dir, save_pages=False):
+    """
+    Extract the text of a PDF into <name>_full_text.txt (and the pages JSON if save_pages).
+
+    Returns the SHA-256 of the PDF.
+    """
+    page_texts = extract_page_texts(pdf_path)
+    pdf_hash = sha256_of_file(pdf_path)
+
+    # Pages are separated by a blank line; joined once instead of growing a string page by page
+    txt_path = text_path(pdf_path, output_dir)
     with open(txt_path, 'w', encoding='utf-8') as txt_file:
-        txt_file.write(text)
+        txt_file.write("".join(page_text + "\n\n" for page_text in page_texts))
     print(f"Saved text to: {txt_path}")
 
-# Directory containing the PDFs
-pdf_directory = 'downloaded_files'
+    if save_pages:
+        os.makedirs(os.path.join(output_dir, PAGES_DIR), exist_ok=True)
+        pages = {"pdf": os.path.basename(pdf_path), "sha256": pdf_hash, "pages": page_texts}
+        with open(pages_path(pdf_path, output_dir), 'w', encoding='utf-8') as f:
+            json.dump(pages, f, ensure_ascii=False, indent=1)
+    return pdf_hash
 
-# Directory for saving text files
-text_directory = 'extracted_data/text_files'
-os.makedirs(text_directory, exist_ok=True)
-
-# Iterate through all PDF files in the directory
-for filename in os.listdir(pdf_directory):
-    if filename.endswith('.pdf'):
-        pdf_path = os.path.join(pdf_directory, filename)
-        
-        print(f"Processing: {filename}")
-        
-        try:
-            extract_text_from_pdf(pdf_path, text_directory)
-            print(f"Finished processing {filename}")
-            print("="*50)
-        except Exception as e:
-            print(f"Error processing {filename}: {str(e)}")
-            print("="*50)
-
-print("Finished extracting text from all PDFs.")
+
+def load_hashes(output_dir):
+    path = os.path.join(output_dir, HASHES_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_hashes(output_dir, hashes):
+    with open(os.path.join(output_dir, HASHES_FILE), 'w', encoding='utf-8') as f:
+        json.dump(hashes, f, indent=2, sort_keys=True)
+
+
+def is_up_to_date(pdf_path, output_dir, hashes, save_pages=False):
+    """True if the text (and pages) of the PDF are newer than the PDF or were extracted from the same content."""
+    outputs = [text_path(pdf_path, output_dir)] + ([pages_path(pdf_path, output_dir)] if save_pages else [])
+    if not all(os.path.exists(output) for output in outputs):
+        return False
+    if all(os.path.getmtime(output) >= os.path.getmtime(pdf_path) for output in outputs):
+        return True
+    return hashes.get(os.path.basename(pdf_path)) == sha256_of_file(pdf_path)
+
+
+def extract_all(pdf_dir=pdf_directory, output_dir=text_directory, num_jobs=None, force=False, save_pages=False):
+    """
+    Extract the text of all PDFs in pdf_dir that changed since the last run.
+
+    Returns:
+        List of the PDF file names that failed
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    hashes = load_hashes(output_dir)
+    pdf_paths = [
+        os.path.join(pdf_dir, filename) for filename in sorted(os.listdir(pdf_dir)) if filename.endswith('.pdf')
+    ]
+    todo = [
+        pdf_path for pdf_path in pdf_paths
+        if force or not is_up_to_date(pdf_path, output_dir, hashes, save_pages)
+    ]
+    print(f"Extracting {len(todo)} of {len(pdf_paths)} PDFs ({len(pdf_paths) - len(todo)} up to date)")
+
+    failures = []
+    with ProcessPoolExecutor(max_workers=num_jobs) as executor:
+        futures = {
+            executor.submit(extract_text_from_pdf, pdf_path, output_dir, save_pages): os.path.basename(pdf_path)
+            for pdf_path in todo
+        }
+        for future in as_completed(futures):
+            filename = futures[future]
+            try:
+                hashes[filename] = future.result()
+                print(f"Finished processing {filename}")
+            except Exception as e:
+                print(f"Error processing {filename}: {str(e)}")
+                failures.append(filename)
+
+    save_hashes(output_dir, hashes)
+    return failures
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Extract the full text of the downloaded PDFs.")
+    parser.add_argument("--pdf-dir", default=pdf_directory, help="directory with the PDFs")
+    parser.add_argument("--output-dir", default=text_directory, help="directory for the text files")
+    parser.add_argument("--jobs", type=int, default=None, help="parallel worker processes (default: one per CPU)")
+    parser.add_argument("--force", action="store_true", help="also extract PDFs whose text is up to date")
+    parser.add_argument("--pages", action="store_true", help="also save the text of every page as JSON")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    failures = extract_all(args.pdf_dir, args.output_dir, args.jobs, force=args.force, save_pages=args.pages)
+    print("Finished extracting text from all PDFs.")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
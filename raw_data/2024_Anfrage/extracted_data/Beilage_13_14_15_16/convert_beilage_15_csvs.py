@@ -1,9 +1,11 @@
 import pandas as pd
 import os
 
+from data.german_numbers import add_cent_columns, parse_german_cents, parse_german_integer
+
 # Global paths
 INPUT_DIR = 'exports'
-OUTPUT_DIR = '../../../data/csv'
+OUTPUT_DIR = '../../../../data/csv'
 
 # Ensure output directory exists
 os.makedirs(OUTPUT_DIR, exist_ok=True)
@@ -15,12 +17,6 @@ files = [
     '15c_SVS_Ausgaben_MTD_Berufe_2021_2022_2023.csv'
 ]
 
-def clean_numeric_column(value):
-    if isinstance(value, str):
-        # Remove spaces and convert comma to point
-        return value.replace(' ', '').replace(',', '.')
-    return value
-
 # Process each file
 for filename in files:
     input_file = os.path.join(INPUT_DIR, filename)
@@ -29,18 +25,26 @@ for filename in files:
     # Read the CSV file with semicolon separator and latin-1 encoding
     df = pd.read_csv(input_file, sep=';', encoding='latin-1')
     
-    # Clean only numeric columns
-    numeric_columns = {
+    # Parse only numeric columns (spaces as thousands separator, comma as decimal separator)
+    count_columns = {
         '15a_SVS_Antraege_2023_pro_Fachrichtung.csv': ['Antragsanzahl'],
+        '15b_SVS_Betraege_2023_pro_Fachrichtung.csv': [],
+        '15c_SVS_Ausgaben_MTD_Berufe_2021_2022_2023.csv': []
+    }
+    amount_columns = {
+        '15a_SVS_Antraege_2023_pro_Fachrichtung.csv': [],
         '15b_SVS_Betraege_2023_pro_Fachrichtung.csv': ['Refundierungen', 'Rechnungsbeträge'],
         '15c_SVS_Ausgaben_MTD_Berufe_2021_2022_2023.csv': ['Ausgaben']
     }
     
-    for col in df.columns:
-        if col in numeric_columns[filename]:
-            df[col] = df[col].apply(clean_numeric_column)
+    for col in count_columns[filename]:
+        df[col] = parse_german_integer(df[col], thousands=' ')
+    for col in amount_columns[filename]:
+        df[col] = parse_german_cents(df[col], thousands=' ')
+    df = add_cent_columns(df, amount_columns[filename])
     
     # Save as standard CSV with comma separator and utf-8 encoding
-    df.to_csv(output_file, index=False, encoding='utf-8')
+    # (amounts with two decimal places, as in the source, plus the exact cents)
+    df.to_csv(output_file, index=False, encoding='utf-8', float_format='%.2f')
     
     print(f"Successfully converted {input_file} to {output_file}")
\ No newline at end of file
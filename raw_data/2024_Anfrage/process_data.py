@@ -1,13 +1,26 @@
-import locale
+import argparse
 import pandas as pd
 import os
-import numpy as np
+import sys
 
+from data.german_dates import parse_month_year_column
+from data.german_numbers import (
+    MONEY_COLUMNS, add_cent_columns, format_euro_cents, parse_german_cents, parse_german_number, read_cent_columns,
+)
+from data.reconciliation import add_neighbour_months, check_row_sums, check_total_rows, format_report
+from data.analytics_db import DATABASE_PATH, build_database
 
-EXPORT_DIR = "../../data/csv"
+# The registry of the Anfragen lives in raw_data/; its paths are relative to raw_data/
+RAW_DATA_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(RAW_DATA_DIR)
+from anfrage_registry import ANFRAGEN  # noqa: E402
 
-DATA_DIR = "../../raw_data/2023_Anfrage/extracted_data/csv_files/"
-DATA_DIR_BEILAGE_13_14_15_16 = "../../raw_data/2023_Anfrage/extracted_data/Beilage_13_14_15_16/exports/"
+
+EXPORT_DIR = os.path.join(os.path.dirname(RAW_DATA_DIR), "data", "csv")
+
+EXTRACTED_DIR = os.path.join(RAW_DATA_DIR, ANFRAGEN["2024_Anfrage"]["output_dir"])
+DATA_DIR = os.path.join(EXTRACTED_DIR, "csv_files", "")
+DATA_DIR_BEILAGE_13_14_15_16 = os.path.join(EXTRACTED_DIR, "Beilage_13_14_15_16", "exports", "")
 
 LST_TO_BUNDESLAND = {
     "W": "Wien",
@@ -21,9 +34,7 @@ LST_TO_BUNDESLAND = {
     "V": "Vorarlberg",
 }
 
-
 # Assert that all sums are correct
-# Are deciEuros better than Euros? -> no rounding errors
 # FG Code to int
 # make counts (Anzahl) also to true ints
 # Bundesländer Namen explizit
@@ -34,31 +45,29 @@ LST_TO_BUNDESLAND = {
 
 
 def convert_to_euro(column):
-    locale.setlocale(locale.LC_ALL, "de_DE.UTF-8")
-    return pd.to_numeric(column).map(
-        lambda x: locale.currency(x, symbol="€", grouping=True)
-    )
+    """Format a column of integer cents as German currency strings"""
+    return format_euro_cents(column)
+
+
+def money_to_cents(df, columns=MONEY_COLUMNS):
+    """Read the amount columns as exact integer cents (from the extracted "_cents" columns)"""
+    return read_cent_columns(df, columns)
+
+
+def money_to_euro(df, columns=MONEY_COLUMNS):
+    """Write the integer cent columns as Euro plus "_cents" columns for the export"""
+    return add_cent_columns(df, columns)
+
+
+def report_total_rows(df, is_total, name, keys=None):
+    """Print the check of the reported total rows against the sum of the other rows"""
+    discrepancies = check_total_rows(df, MONEY_COLUMNS, is_total, keys=keys)
+    print(format_report(discrepancies, f"{name} totals"))
 
 
 def convert_month_year_to_date(df):
     """Convert month.year column to proper datetime Period"""
-    df["Date"] = pd.to_datetime(
-        df["Monat.Jahr"]
-        .str.replace("Jän", "01")
-        .str.replace("Feb", "02")
-        .str.replace("Mär", "03")
-        .str.replace("Apr", "04")
-        .str.replace("Mai", "05")
-        .str.replace("Jun", "06")
-        .str.replace("Jul", "07")
-        .str.replace("Aug", "08")
-        .str.replace("Sep", "09")
-        .str.replace("Okt", "10")
-        .str.replace("Nov", "11")
-        .str.replace("Dez", "12")
-        .str.replace(".", "/"),
-        format="%m/%y",
-    ).dt.to_period("M")
+    df["Date"] = parse_month_year_column(df["Monat.Jahr"])
     return df
 
 
@@ -75,12 +84,15 @@ def ensure_directory(directory):
         print(f"Created directory: {directory}")
 
 
-def process_1():
+def process_1(export_dir=EXPORT_DIR):
     new_filename = "01_OEGK_Betraege_pro_Landesstelle_2023.csv"
     Beilage1_filename = (
         DATA_DIR + "Beilage_1_combined_tables.csv"
     )
     df_1 = pd.read_csv(Beilage1_filename)
+    df_1 = money_to_cents(df_1)
+    report_total_rows(df_1, df_1["LST"] == "Gesamt", "Beilage 1")
+
     df_1["Bundesland_pretty"] = (
         df_1["LST"].str.split("-", expand=True)[1].str.strip().map(LST_TO_BUNDESLAND)
     )
@@ -93,15 +105,17 @@ def process_1():
     df_1["Refundierungen_pretty"] = convert_to_euro(df_1["Refundierungen"])
     df_1["Rechnungsbeträge_pretty"] = convert_to_euro(df_1["Rechnungsbeträge"])
 
-    export_to_csv(df_1, new_filename)
+    export_to_csv(money_to_euro(df_1), new_filename, export_dir)
 
 
-def process_2():
+def process_2(export_dir=EXPORT_DIR):
     new_filename = "02_OEGK_Betraege_pro_Fachrichtung_2023.csv"
     Beilage2_filename = (
         DATA_DIR + "Beilage_2_combined_tables.csv"
     )
     df_2 = pd.read_csv(Beilage2_filename)
+    df_2 = money_to_cents(df_2)
+    report_total_rows(df_2, df_2["Fachrichtung"] == "Gesamt", "Beilage 2")
 
     df_2["Year"] = pd.Period("2023")
     # df_2.loc[df_2["FG-Code"] == "", "FG-Code"] = "Alle"
@@ -110,10 +124,10 @@ def process_2():
     df_2["LST"] = "ALL"
     df_2["Bundesland_pretty"] = "Alle"
 
-    export_to_csv(df_2, new_filename)
+    export_to_csv(money_to_euro(df_2), new_filename, export_dir)
 
 
-def process_3():
+def process_3(export_dir=EXPORT_DIR):
     new_filename = (
         "03_OEGK_Antraege_pro_Monat_2023_pro_Fachrichtung_online_postal_Bundesweit.csv"
     )
@@ -130,10 +144,10 @@ def process_3():
     df_3["LST"] = "ALL"
     df_3["Bundesland_pretty"] = "Alle"
 
-    export_to_csv(df_3, new_filename)
+    export_to_csv(df_3, new_filename, export_dir)
 
 
-def process_4():
+def process_4(export_dir=EXPORT_DIR):
     new_filename = "04_OEGK_Antraege_pro_Monat_2023_pro_Fachrichtung_online_postal_pro_Bundesland.csv"
     Beilage4_filename = (
         DATA_DIR + "Beilage_4_combined_tables.csv"
@@ -160,10 +174,10 @@ def process_4():
 
     df_4 = df_4.set_index(["Date", "FG-Code", "LST"])
 
-    export_to_csv(df_4, new_filename)
+    export_to_csv(df_4, new_filename, export_dir)
 
 
-def process_5():
+def process_5(export_dir=EXPORT_DIR):
     new_filename = "05_OEGK_Abgearbeitete_Antraege_pro_Monat_2023_pro_Fachrichtung_postal_online_Bundesweit.csv"
     Beilage5_filename = (
         DATA_DIR + "Beilage_5_combined_tables.csv"
@@ -179,9 +193,9 @@ def process_5():
     df_5["LST"] = "ALL"
     df_5["Bundesland_pretty"] = "Alle"
 
-    export_to_csv(df_5, new_filename)
+    export_to_csv(df_5, new_filename, export_dir)
 
-def process_6():
+def process_6(export_dir=EXPORT_DIR):
     new_filename = "06_OEGK_Abgearbeitete_Antraege_pro_Monat_2023_pro_Fachrichtung_postal_online_pro_Bundesland.csv"
     Beilage6_filename = (
         DATA_DIR + "Beilage_6_combined_tables.csv"
@@ -208,9 +222,9 @@ def process_6():
     # ÖGK-LS	Monat.Jahr	FG-Code	Fachrichtung	postal	online	Gesamt	calculated_sum	sum_matches
     # 2612	ÖGK-W	Jän.23	29.0	FA für Immunologie -	1.0	4.0	14.0	5.0	False
 
-    export_to_csv(df_6, new_filename)
+    export_to_csv(df_6, new_filename, export_dir)
 
-def process_5a():
+def process_5a(export_dir=EXPORT_DIR):
     new_filename = "05a_OEGK_Abgearbeitete_Antraege_pro_Monat_2021_bis_Mai_2023_pro_Fachrichtung_postal_online_Bundesweit.csv"
     Beilage5a_filename = (
         DATA_DIR + "Beilage_5a_combined_tables.csv"
@@ -225,9 +239,9 @@ def process_5a():
     df_5a["LST"] = "ALL"
     df_5a["Bundesland_pretty"] = "Alle"
 
-    export_to_csv(df_5a, new_filename)
+    export_to_csv(df_5a, new_filename, export_dir)
 
-def process_6a():
+def process_6a(export_dir=EXPORT_DIR):
     new_filename = "06a_OEGK_Abgearbeitete_Antraege_pro_Monat_2021_bis_Mai_2023_pro_Fachrichtung_postal_online_pro_Bundesland.csv"
     Beilage6a_filename = (
         DATA_DIR + "Beilage_6a_combined_tables.csv"
@@ -244,9 +258,9 @@ def process_6a():
     # df_6a.loc[df_6a["LST"] == "Gesamt", "Bundesland_pretty"] = "Alle"
     df_6a = df_6a.set_index(["Date", "FG-Code", "LST"])
 
-    export_to_csv(df_6a, new_filename)
+    export_to_csv(df_6a, new_filename, export_dir)
 
-def process_7():
+def process_7(export_dir=EXPORT_DIR):
     new_filename = "07_OEGK_Durchschnittliche_Bearbeitungszeit_pro_Monat_2023_postal_online_online_pro_Bundesland.csv"
     Beilage7_filename = (
         DATA_DIR + "Beilage_7_combined_tables.csv"
@@ -269,9 +283,9 @@ def process_7():
 
     df_7 = df_7.set_index(["Date", "LST"])
 
-    export_to_csv(df_7, new_filename)
+    export_to_csv(df_7, new_filename, export_dir)
 
-def process_7a():
+def process_7a(export_dir=EXPORT_DIR):
     new_filename = "07a_OEGK_Durchschnittliche_Bearbeitungszeit_pro_Monat_2021_bis_Mai_2023_postal_online_online_pro_Bundesland.csv"
     Beilage7a_filename = (
         DATA_DIR + "Beilage_7a_combined_tables.csv"
@@ -290,14 +304,19 @@ def process_7a():
         df_7a["LST"].str.split("-", expand=True)[1].str.strip().map(LST_TO_BUNDESLAND)
     )
 
-    export_to_csv(df_7a, new_filename)
+    export_to_csv(df_7a, new_filename, export_dir)
 
-def process_8():
+def process_8(export_dir=EXPORT_DIR):
     new_filename = "08_OEGK_Betraege_MTD_Berufe_2021_2022_2023_Bundesweit.csv"
     Beilage8_filename = (
         DATA_DIR + "Beilage_8_combined_tables.csv"
     )
     df_8 = pd.read_csv(Beilage8_filename)
+    df_8 = money_to_cents(df_8)
+
+    # The "Durchschnitt yy" rows hold the yearly totals
+    is_total = df_8["Monat.Jahr"].str.contains("Durchschnitt", na=False)
+    report_total_rows(df_8.assign(year=df_8["Monat.Jahr"].str[-2:]), is_total, "Beilage 8", keys=["year"])
 
     df_8 = df_8[~df_8["Monat.Jahr"].str.contains("Durchschnitt", na=False)]
 
@@ -306,15 +325,22 @@ def process_8():
 
     df_8 = df_8.set_index(["Year", "FG-Code"])
 
-    export_to_csv(df_8, new_filename)
+    export_to_csv(money_to_euro(df_8), new_filename, export_dir)
 
 
-def process_9():
+def process_9(export_dir=EXPORT_DIR):
     new_filename = "09_OEGK_Betraege_MTD_Berufe_2021_2022_2023_pro_Bundesland.csv"
     Beilage9_filename = (
         DATA_DIR + "Beilage_9_combined_tables.csv"
     )
     df_9 = pd.read_csv(Beilage9_filename)
+    df_9 = money_to_cents(df_9)
+
+    # The "Durchschnitt yy" rows hold the yearly totals per Landesstelle
+    is_total = df_9["Monat.Jahr"].str.contains("Durchschnitt", na=False)
+    report_total_rows(
+        df_9.assign(year=df_9["Monat.Jahr"].str[-2:]), is_total, "Beilage 9", keys=["ÖGK-LS", "year"]
+    )
 
     df_9 = df_9[~df_9["Monat.Jahr"].str.contains("Durchschnitt", na=False)]
 
@@ -327,9 +353,9 @@ def process_9():
 
     df_9 = df_9.set_index(["Year", "FG-Code", "LST"])
 
-    export_to_csv(df_9, new_filename)
+    export_to_csv(money_to_euro(df_9), new_filename, export_dir)
 
-def process_10():
+def process_10(export_dir=EXPORT_DIR):
     new_filename = "10_OEGK_Antraege_MTD_Berufe_pro_Monat_2021_2022_2023_postal_online_pro_Fachrichtung_Bundesweit_und_pro_Bundesland.csv"
     Beilage10_filename = (
         DATA_DIR + "Beilage_10_combined_tables.csv"
@@ -362,9 +388,9 @@ def process_10():
 
     df_10 = df_10.set_index(["Date", "FG-Code", "LST"])
 
-    export_to_csv(df_10, new_filename)
+    export_to_csv(df_10, new_filename, export_dir)
 
-def process_11():
+def process_11(export_dir=EXPORT_DIR):
     new_filename = "11_OEGK_Bearbeitete_Antraege_MTD_Berufe_pro_Monat_2021_2022_2023_postal_online_pro_Fachrichtung_Bundesweit_und_pro_Bundesland.csv"
     Beilage11_filename = (
         DATA_DIR + "Beilage_11_combined_tables.csv"
@@ -378,64 +404,27 @@ def process_11():
     df_11["Bundesland_pretty"] = (
         df_11["LST"].str.split("-", expand=True)[1].str.strip().map(LST_TO_BUNDESLAND)
     )
-    # Calculate totals for each row group and compare with original
-    df_calc = df_11.copy()
-    df_calc['Calc_Total'] = df_calc['postal'] + df_calc['online']
-    
-    # Compare calculated vs original totals
-    total_diff = df_calc['Calc_Total'] - df_calc['Gesamt']
-    discrepancies = total_diff[total_diff != 0]
-    
+    # Compare postal + online with the reported totals, showing the month
+    # before and after for the same LST and FG-Code
+    discrepancies = check_row_sums(
+        df_11, ["postal", "online"], "Gesamt", keys=["LST", "Date", "FG-Code", "Fachrichtung"]
+    )
+    discrepancies = add_neighbour_months(
+        discrepancies, df_11, group_keys=["LST", "FG-Code"], columns=["postal", "online", "Gesamt"]
+    )
+
     if len(discrepancies) > 0:
-        print("\nDiscrepancies found in Beilage 11 totals:")
-        print(discrepancies)
-        
-        # Print detailed information about discrepancies
-        for idx in discrepancies.index:
-            row = df_calc.loc[idx]
-            fg_code = row['FG-Code']
-            date = row['Date']
-            lst = row['LST']
-            fachrichtung = row['Fachrichtung']
-            postal = row['postal']
-            online = row['online']
-            gesamt = row['Gesamt']
-            calc_total = row['Calc_Total']
-            diff = calc_total - gesamt
-            print(f"LST: {lst}, Date: {date}, FG-Code: {fg_code}, Fachrichtung: {fachrichtung}")
-            print(f"postal: {postal}, online: {online}, Original Total: {gesamt}, Calculated Total: {calc_total}")
-            print(f"Difference: {diff}")
-
-            # Find rows with same FG-Code from month before and after
-            all_months = df_calc['Date'].unique()
-            current_idx = np.where(all_months == date)[0][0]
-            
-            # Get previous month if available
-            prev_month = all_months[current_idx - 1] if current_idx > 0 else None
-            # Get next month if available
-            next_month = all_months[current_idx + 1] if current_idx < len(all_months) - 1 else None
-            
-            print(f"\nDiscrepancy details for {date}, FG-Code: {fg_code}")
-            print(f"Current row: {row.to_dict()}")
-            
-            if prev_month:
-                prev_rows = df_calc[(df_calc['Date'] == prev_month) & (df_calc['FG-Code'] == fg_code)]
-                if not prev_rows.empty:
-                    print(f"Previous month ({prev_month}): {prev_rows.iloc[0].to_dict()}")
-            
-            if next_month:
-                next_rows = df_calc[(df_calc['Date'] == next_month) & (df_calc['FG-Code'] == fg_code)]
-                if not next_rows.empty:
-                    print(f"Next month ({next_month}): {next_rows.iloc[0].to_dict()}")
-        
+        print()
+        print(format_report(discrepancies, "Discrepancies found in Beilage 11 totals"))
+
     # Keep calculated totals
-    df_11['Gesamt'] = df_calc['Calc_Total']
+    df_11['Gesamt'] = df_11['postal'] + df_11['online']
 
     df_11 = df_11.set_index(["Date", "FG-Code", "LST"])
     
-    export_to_csv(df_11, new_filename)
+    export_to_csv(df_11, new_filename, export_dir)
 
-def process_12():
+def process_12(export_dir=EXPORT_DIR):
     new_filename = "12_OEGK_Durchschnittliche_Bearbeitungszeit_MTD_Berufe_pro_Monat_2023_postal_online_online_pro_Fachrichtung_Bundesweit_und_pro_Bundesland.csv"
     Beilage12_filename = (
         DATA_DIR + "Beilage_12_combined_tables.csv"
@@ -454,9 +443,9 @@ def process_12():
 
     df_12 = df_12.set_index(["Date", "LST"])
 
-    export_to_csv(df_12, new_filename)
+    export_to_csv(df_12, new_filename, export_dir)
 
-def process_13():
+def process_13(export_dir=EXPORT_DIR):
     new_filename = (
         "13_OEGK_Refundierungen_Heilbehelfe_pro_Monat_2021_2022_2023_pro_Bundesland.csv"
     )
@@ -490,20 +479,17 @@ def process_13():
 
     # Create long format data
     for year, data in [('2021', data_2021), ('2022', data_2022), ('2023', data_2023)]:
+        # Convert values with German formatting (comma as decimal separator) to integer cents,
+        # values that are not numbers (e.g., month names like 'Jänner') become <NA>
+        data = data.copy()
+        for month in range(1, 13):
+            data[month] = parse_german_cents(data[month], errors='coerce')
+
         for month in range(1, 13):
             for _, row in data.iterrows():
                 bundesland = row['bundesland']
                 value = row[month]
 
-                # Convert value from string with comma as decimal separator to float
-                if isinstance(value, str):
-                    try:
-                        # Handle numeric values with German formatting (comma as decimal separator)
-                        value = float(value.replace('.', '').replace(',', '.'))
-                    except (ValueError, AttributeError):
-                        # If conversion fails (e.g., for month names like 'Jänner'), set to NaN
-                        value = float('nan')
-
                 monthly_data.append({
                     'Date': pd.Period(f"{year}-{month:02d}", freq='M'),
                     'Bundesland': bundesland,
@@ -518,13 +504,14 @@ def process_13():
 
     # Sort by Date and Bundesland
     result_df = result_df.sort_values(['Date', 'Bundesland'])
+    result_df = add_cent_columns(result_df, ['Refundierung'])
 
     # Set index for consistency with other processed files
     result_df = result_df.set_index(['Date', 'Bundesland'])
 
-    export_to_csv(result_df, new_filename)
+    export_to_csv(result_df, new_filename, export_dir)
 
-def process_14():
+def process_14(export_dir=EXPORT_DIR):
     new_filename = "14_OEGK_Antraege_Heilbehelfe_pro_Monat_2021_2022_2023_pro_Bundesland.csv"
     Beilage14_filename = (
         DATA_DIR_BEILAGE_13_14_15_16 + "Beilage_14.csv"
@@ -561,20 +548,17 @@ def process_14():
 
     # Create long format data
     for year, data in [("2021", data_2021), ("2022", data_2022), ("2023", data_2023)]:
+        # Convert values with German formatting (comma as decimal separator) to float,
+        # values that are not numbers (e.g., month names like "Jänner") become NaN
+        data = data.copy()
+        for month in range(1, 13):
+            data[month] = parse_german_number(data[month], errors="coerce")
+
         for month in range(1, 13):
             for _, row in data.iterrows():
                 bundesland = row["bundesland"]
                 value = row[month]
 
-                # Convert value from string with comma as decimal separator to float
-                if isinstance(value, str):
-                    try:
-                        # Handle numeric values with German formatting (comma as decimal separator)
-                        value = float(value.replace(".", "").replace(",", "."))
-                    except (ValueError, AttributeError):
-                        # If conversion fails (e.g., for month names like 'Jänner'), set to NaN
-                        value = float("nan")
-
                 monthly_data.append(
                     {
                         "Date": pd.Period(f"{year}-{month:02d}", freq="M"),
@@ -595,31 +579,47 @@ def process_14():
     # Set index for consistency with other processed files
     result_df = result_df.set_index(["Date", "Bundesland"])
 
-    export_to_csv(result_df, new_filename)
+    export_to_csv(result_df, new_filename, export_dir)
 
 
-def process_data():
+def process_data(database_path=None, export_dir=EXPORT_DIR):
+    """Process all Beilagen into export_dir; optionally load the outputs into the analytical database"""
     print("Processing data...")
-    process_1()
-    process_2()
-    process_3()
-    process_4()
-    process_5()
-    process_6()
-    process_5a()
-    process_6a()
-    process_7()
-    process_7a()
-    process_8()
-    process_9()
-    process_10()
-    process_11()
-    process_12()
-    process_13()
-    process_14()
+    process_1(export_dir)
+    process_2(export_dir)
+    process_3(export_dir)
+    process_4(export_dir)
+    process_5(export_dir)
+    process_6(export_dir)
+    process_5a(export_dir)
+    process_6a(export_dir)
+    process_7(export_dir)
+    process_7a(export_dir)
+    process_8(export_dir)
+    process_9(export_dir)
+    process_10(export_dir)
+    process_11(export_dir)
+    process_12(export_dir)
+    process_13(export_dir)
+    process_14(export_dir)
     print("Data processing complete.")
-    print("Data saved to: " + EXPORT_DIR)
+    print("Data saved to: " + export_dir)
+
+    if database_path:
+        tables = build_database(path=database_path, csv_dir=export_dir)
+        print(f"Loaded {len(tables)} tables into: {database_path}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Process the extracted Beilagen into data/csv")
+    parser.add_argument(
+        "--database", nargs="?", const=DATABASE_PATH, default=None,
+        help="also load all outputs into the SQLite analytical database (default path: data/warra.sqlite)",
+    )
+    parser.add_argument("--export-dir", default=EXPORT_DIR, help="directory of the CSV exports (default: data/csv)")
+    args = parser.parse_args(argv)
+    process_data(database_path=args.database, export_dir=args.export_dir)
 
 
 if __name__ == "__main__":
-    process_data()
+    main()
@@ -1,34 +1,19 @@
+import argparse
 import json
 import os
-import requests
+import time
 from datetime import datetime
 import glob
 import re
 
+from data.http_fetch import MAX_WORKERS, download_many, format_timing_summary
+
 # Base URL for the parliament website
 base_url = "https://www.parlament.gv.at"
 
-# Create directories to store the downloaded files
+# Directories to store the downloaded files (created by main)
 antwort_dir = "Beantwortungen"
 anfrage_dir = "Anfragen"
-os.makedirs(os.path.join(antwort_dir, "pdfs"), exist_ok=True)
-os.makedirs(os.path.join(anfrage_dir, "pdfs"), exist_ok=True)
-
-def download_file(url, filename):
-    """Download a file from the given URL and save it to the specified filename."""
-    try:
-        response = requests.get(url)
-        if response.status_code == 200:
-            with open(filename, "wb") as f:
-                f.write(response.content)
-            print(f"Downloaded: {filename}")
-            return True
-        else:
-            print(f"Failed to download: {url} (Status code: {response.status_code})")
-            return False
-    except Exception as e:
-        print(f"Error downloading {url}: {str(e)}")
-        return False
 
 def create_safe_filename(title):
     """Create a safe filename from the given title."""
@@ -36,14 +21,14 @@ def create_safe_filename(title):
     safe_title = "".join(c for c in title if c.isalnum() or c in (' ', '-', '_')).strip()
     return safe_title.replace(' ', '_')
 
-def process_json_file(json_path):
-    """Process a single JSON file and download its associated PDFs and HTMLs."""
+def process_json_file(json_path, base_url=base_url):
+    """Process a single JSON file and return the (url, filename) of its PDFs, HTMLs and XLSXs."""
     try:
         with open(json_path, "r", encoding='utf-8') as f:
             data = json.load(f)
     except Exception as e:
         print(f"Error reading JSON file {json_path}: {str(e)}")
-        return
+        return []
 
     # Get basic information
     inr = data.get('inr')
@@ -52,7 +37,7 @@ def process_json_file(json_path):
     
     if not inr or not update_date:
         print(f"Missing required data in {json_path}")
-        return
+        return []
 
     # Determine if this is an answer or question based on the directory structure
     is_answer = "Beantwortungen" in json_path
@@ -96,42 +81,79 @@ def process_json_file(json_path):
     os.makedirs(inquiry_dir, exist_ok=True)
     os.makedirs(inquiry_html_dir, exist_ok=True)
 
-    # Download PDFs, HTMLs and XLSXs
+    # Collect PDFs, HTMLs and XLSXs
+    downloads = []
     for doc in data.get("documents", []):
         for file in doc.get("documents", []):
             file_url = base_url + file["link"]
             safe_title = create_safe_filename(doc['title'])
 
-            # Download PDF
+            # PDF
             if file["type"] == "PDF":
-                file_name = os.path.join(inquiry_dir, f"{safe_title}.pdf")
-                download_file(file_url, file_name)
-            # Download HTML
+                downloads.append((file_url, os.path.join(inquiry_dir, f"{safe_title}.pdf")))
+            # HTML
             elif file["type"] == "HTML":
-                file_name = os.path.join(inquiry_html_dir, f"{safe_title}.html")
-                download_file(file_url, file_name)
-            # Download XLSX
+                downloads.append((file_url, os.path.join(inquiry_html_dir, f"{safe_title}.html")))
+            # XLSX
             elif file["type"] == "XLSX":
-                file_name = os.path.join(inquiry_dir, f"{safe_title}.xlsx")  # Save XLSX in the pdfs directory
-                download_file(file_url, file_name)
+                # Save XLSX in the pdfs directory
+                downloads.append((file_url, os.path.join(inquiry_dir, f"{safe_title}.xlsx")))
+    return downloads
 
 
-def main(directory):
+def collect_downloads(directory, base_url=base_url):
+    """Return the (url, filename) downloads of all JSON exports in a directory."""
     # Find all JSON files in the parliament_json_exports directory
     json_files = glob.glob(os.path.join(directory, "parliament_json_exports", "*.json"))
-    
+
     if not json_files:
         print(f"No JSON files found in {directory}/parliament_json_exports")
-        return
+        return []
 
     print(f"Found {len(json_files)} JSON files to process in {directory}")
-    
+
+    downloads = []
     for json_file in json_files:
-        print(f"\nProcessing: {json_file}")
-        process_json_file(json_file)
+        downloads.extend(process_json_file(json_file, base_url=base_url))
+    return downloads
+
+
+def download_all(downloads, max_workers=MAX_WORKERS):
+    """Download all (url, filename) pairs in parallel over one pooled session.
+
+    Returns the number of files downloaded successfully.
+    """
+    # The same file can be listed twice (e.g. by an answer and its question)
+    downloads = {filename: url for url, filename in downloads}
+    downloaded = 0
+    for url, filename, result in download_many(
+        [(url, filename) for filename, url in downloads.items()],
+        # All files are on the parliament server, --workers is the number of connections to it
+        max_workers=max_workers, max_per_host=max_workers,
+    ):
+        if result["error"]:
+            print(f"Error downloading {url}: {result['error']}")
+        else:
+            print(f"Downloaded: {filename}")
+            downloaded += 1
+    return downloaded
+
+
+def main(directories=(antwort_dir, anfrage_dir), max_workers=MAX_WORKERS, base_url=base_url):
+    downloads = []
+    for directory in directories:
+        os.makedirs(os.path.join(directory, "pdfs"), exist_ok=True)
+        downloads.extend(collect_downloads(directory, base_url=base_url))
 
-    print(f"\nAll files have been downloaded for {directory}")
+    start = time.perf_counter()
+    downloaded = download_all(downloads, max_workers=max_workers)
+    total = len({filename for _, filename in downloads})
+    print(f"\nDownloaded {downloaded} of {total} files in {time.perf_counter() - start:.1f}s")
+    print(format_timing_summary())
 
 if __name__ == "__main__":
-    main(antwort_dir)
-    main(anfrage_dir)
+    parser = argparse.ArgumentParser(description="Download the documents of the exported Anfragen and Beantwortungen.")
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS, help=f"parallel downloads (default: {MAX_WORKERS})")
+    parser.add_argument("--base-url", default=base_url, help="server to download from (e.g. a local test server)")
+    args = parser.parse_args()
+    main(max_workers=args.workers, base_url=args.base_url)
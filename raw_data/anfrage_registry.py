@@ -0,0 +1,160 @@
+"""
+Which parser reads which Beilage of which Anfragebeantwortung.
+
+Every Anfrage folder in raw_data/ gets one entry in ANFRAGEN. Each of its
+Beilagen names a parser kind, the parser function and an output schema:
+
+    pdf_tables    function(tables, headers) on the tables found by pdfplumber
+    pdf_text      function(pdf_path), parses the text rows of the PDF pages itself
+    excel_blocks  function(xlsx_path, sheet_name), see extract_excel_blocks.py
+
+A PDF Beilage that is also published as XLSX names its Excel parser under
+"excel". The XLSX file is then read instead of the PDF (faster, and no
+guessing of the table layout); the PDF parser is the fallback when the XLSX
+file is missing and can be forced for cross-checks (ingest_anfragen.py --pdf).
+
+Parser functions are given by name and resolved by ingest_anfragen.py, so this
+file has no dependencies. Adding the next year's response means adding an
+entry here; run it with
+
+    python ingest_anfragen.py --anfrage 2026_Anfrage
+"""
+
+# Output schemas: the columns every parser for this kind of table returns, the
+# columns identifying a row (keys) and the metadata written next to the data
+# (units and descriptions)
+OUTPUT_SCHEMAS = {
+    "betraege_pro_landesstelle": {
+        "columns": ["LST", "Refundierungen", "Rechnungsbeträge"],
+        "keys": ["LST"],
+        "metadata": {
+            "units": {"Refundierungen": "EUR", "Rechnungsbeträge": "EUR"},
+            "original_headers": {
+                "columns": [
+                    "LST",
+                    "Wahlarztkostenrefundierungen",
+                    "Wahlarztkostenrechnungsbeträge",
+                ]
+            },
+        },
+    },
+    "betraege_pro_fachrichtung": {
+        "columns": ["FG-Code", "Fachrichtung", "Refundierungen", "Rechnungsbeträge"],
+        "keys": ["FG-Code"],
+        "metadata": {
+            "units": {"Refundierungen": "EUR", "Rechnungsbeträge": "EUR"},
+            "description": {
+                "Refundierungen": "Wahlarztkostenrefundierungen nach Fachrichtung",
+                "Rechnungsbeträge": "Wahlarztkostenrechnungsbeträge nach Fachrichtung",
+            },
+        },
+    },
+    "betraege_pro_monat": {
+        "columns": ["ÖGK-LS", "Monat.Jahr", "FG-Code", "Fachrichtung", "Refundierungen", "Rechnungsbeträge"],
+        "keys": ["ÖGK-LS", "Monat.Jahr", "FG-Code"],
+        "metadata": {
+            "units": {"Refundierungen": "EUR", "Rechnungsbeträge": "EUR"},
+            "description": {
+                "Refundierungen": "Wahlarztkostenrefundierungen nach Fachrichtung",
+                "Rechnungsbeträge": "Wahlarztkostenrechnungsbeträge nach Fachrichtung",
+            },
+        },
+    },
+    "antraege": {
+        "columns": ["ÖGK-LS", "Monat.Jahr", "FG-Code", "Fachrichtung", "postal", "online", "Gesamt"],
+        "keys": ["ÖGK-LS", "Monat.Jahr", "FG-Code"],
+        "integer_columns": ["postal", "online", "Gesamt"],
+        "metadata": {
+            "units": {"postal": "Anzahl", "online": "Anzahl", "Gesamt": "Anzahl"},
+            "description": {
+                "postal": "postalische Anträge nach Monat und Fachrichtung",
+                "online": "online Anträge nach Monat und Fachrichtung",
+            },
+        },
+    },
+    "bearbeitungszeit": {
+        "columns": ["ÖGK-LS", "Monat.Jahr", "Postal", "OnlineMeine", "OnlineWAH"],
+        "keys": ["ÖGK-LS", "Monat.Jahr"],
+        "metadata": {
+            "units": {
+                "postal": "Kalendertage",
+                "OnlineMeine": "Kalendertage",
+                "OnlineWAH": "Kalendertage",
+            },
+            "description": {
+                "postal": "postalische Anträge nach Monat",
+                "OnlineMeine": "online Anträge nach Monat",
+                "OnlineWAH": "online Anträge nach Monat",
+            },
+        },
+    },
+    "bearbeitungszeit_ohne_wah": {
+        "columns": ["ÖGK-LS", "Monat.Jahr", "Postal", "OnlineMeine"],
+        "keys": ["ÖGK-LS", "Monat.Jahr"],
+        "metadata": {
+            "units": {
+                "postal": "Kalendertage",
+                "OnlineMeine": "Kalendertage",
+            },
+            "description": {
+                "postal": "postalische Anträge nach Monat",
+                "OnlineMeine": "online Anträge nach Monat",
+            },
+        },
+    },
+}
+
+
+def _pdf_text(function, schema, **options):
+    return {"parser": "pdf_text", "function": function, "schema": schema, **options}
+
+
+def _excel_blocks(function, **options):
+    return {"parser": "excel_blocks", "function": function, **options}
+
+
+ANFRAGEN = {
+    # 18726/AB XXVII. GP, data for 2023 (and 2021/2022 for some Beilagen)
+    "2024_Anfrage": {
+        "year": "2023",
+        "source_dir": "2024_Anfrage/downloaded_files",
+        "output_dir": "2024_Anfrage/extracted_data",
+        "beilagen": {
+            "Beilage_1": {"parser": "pdf_tables", "function": "process_beilage_1", "schema": "betraege_pro_landesstelle"},
+            "Beilage_2": _pdf_text("process_beilage_2", "betraege_pro_fachrichtung"),
+            # check_integers: warn about counts with a fractional part (integer_columns of the schema)
+            "Beilage_3": _pdf_text("process_beilage_3", "antraege", check_integers=True),
+            "Beilage_4": _pdf_text("process_beilage_3", "antraege", check_integers=True),
+            "Beilage_5": _pdf_text("process_beilage_3", "antraege"),
+            "Beilage_5a": _pdf_text("process_beilage_3", "antraege"),
+            "Beilage_6": _pdf_text("process_beilage_3", "antraege"),
+            "Beilage_6a": _pdf_text("process_beilage_3", "antraege"),
+            "Beilage_7": _pdf_text("process_beilage_7", "bearbeitungszeit"),
+            "Beilage_7a": _pdf_text("process_beilage_7a", "bearbeitungszeit_ohne_wah"),
+            "Beilage_8": _pdf_text("process_beilage_8", "betraege_pro_monat"),
+            "Beilage_9": _pdf_text("process_beilage_8", "betraege_pro_monat"),
+            "Beilage_10": _pdf_text("process_beilage_3", "antraege", check_integers=True),
+            "Beilage_11": _pdf_text("process_beilage_3", "antraege", check_integers=True),
+            "Beilage_12": _pdf_text("process_beilage_7", "bearbeitungszeit"),
+            # Beilage_13 to _16 are extracted by hand (see extracted_data/Beilage_13_14_15_16)
+        },
+    },
+    # Follow-up Anfrage, data for 2023 and January to September 2024.
+    # Beilage_1, _2 and _4 are not ingested yet (different layout per Fachgebiet).
+    "2025_Anfrage": {
+        "year": "2024",
+        "source_dir": "2025_Anfrage",
+        "output_dir": "2025_Anfrage/extracted_data",
+        "beilagen": {
+            # Only published as XLSX: the PDFs of these Beilagen are placeholders ("Aus technischen
+            # Gründen ist dieses Dokument nicht als PDF abrufbar"), so they have no PDF parser
+            "Beilage_5": _excel_blocks(
+                "process_bearbeitungszeit_blocks", schema="bearbeitungszeit", sheet_name="F3_2023", year="2023",
+            ),
+            "Beilage_6": _excel_blocks("process_bearbeitungszeit_blocks", schema="bearbeitungszeit", sheet_name="F3_2024"),
+        },
+    },
+}
+
+# File extension of the source file for each parser kind
+SOURCE_EXTENSIONS = {"pdf_tables": ".pdf", "pdf_text": ".pdf", "excel_blocks": ".xlsx"}
@@ -0,0 +1,204 @@
+"""
+Output of the parsed Beilagen, shared by all Anfragen and parser kinds.
+
+Every parser returns a DataFrame (amounts in integer cents); save_beilage_table()
+writes it (amounts as Euro plus an exact "<column>_cents" column) as extracted_data/json_files/<Beilage>_data.json (with metadata) and
+extracted_data/csv_files/<Beilage>_combined_tables.csv.
+"""
+
+import json
+import os
+
+import pandas as pd
+
+from data.german_numbers import MONEY_COLUMNS, add_cent_columns
+
+from anfrage_registry import OUTPUT_SCHEMAS
+
+
+def check_and_convert_to_int(df, columns, filename=None):
+    """
+    Check if any values in the specified columns are floats and convert them to integers.
+    Raises a warning if floating point values are found.
+    
+    Args:
+        df (pandas.DataFrame): The dataframe to check and convert
+        columns (list): List of column names to check and convert
+        filename (str, optional): Name of the file being processed, for better warning messages
+        
+    Returns:
+        pandas.DataFrame: The dataframe with converted columns
+    """
+    file_info = f" in {filename}" if filename else ""
+    
+    for col in columns:
+        if col in df.columns:
+            # Check if any non-null values have decimal parts
+            non_null_values = df[col].dropna()
+            if len(non_null_values) > 0:
+                # Check if any values are not equal to their integer representation
+                if any(non_null_values != non_null_values.astype(int)):
+                    print(f"WARNING: Found floating point values in column {col}{file_info}!")
+                    # Print the problematic values for debugging
+                    problematic = non_null_values[non_null_values != non_null_values.astype(int)]
+                    print(f"Problematic values: {problematic.tolist()}")
+                
+                # Convert to int regardless (will truncate any decimals)
+                df[col] = df[col].apply(
+                    lambda x: int(x) if pd.notnull(x) else None
+                )
+    
+    return df
+
+
+def ensure_integers_in_dict(data_dict):
+    """
+    Recursively check dictionaries and lists for float values that are actually integers
+    and convert them to proper integers.
+    
+    Args:
+        data_dict: Dictionary, list, or scalar value to process
+        
+    Returns:
+        Processed data with floats converted to ints where appropriate
+    """
+    if isinstance(data_dict, dict):
+        return {k: ensure_integers_in_dict(v) for k, v in data_dict.items()}
+    elif isinstance(data_dict, list):
+        return [ensure_integers_in_dict(item) for item in data_dict]
+    elif isinstance(data_dict, float) and data_dict.is_integer():
+        return int(data_dict)
+    else:
+        return data_dict
+
+
+def beilage_metadata(spec, year, question):
+    """Metadata for a parsed Beilage: the question plus units and descriptions of its output schema"""
+    schema_metadata = OUTPUT_SCHEMAS[spec["schema"]]["metadata"]
+    metadata = {"question": question, "units": schema_metadata["units"], "year": year}
+    metadata.update({key: value for key, value in schema_metadata.items() if key != "units"})
+    return metadata
+
+
+def save_beilage_table(combined_table, metadata, base_filename, save_dir):
+    """Save a parsed Beilage as JSON (with metadata) and CSV in save_dir; an empty table raises ValueError"""
+    if combined_table.empty:
+        raise ValueError(f"{base_filename}: the parser returned no rows, not overwriting the saved output")
+
+    # Amounts are processed as integer cents, the CSV and JSON files hold
+    # Euro and the exact cents ("<column>_cents")
+    combined_table = add_cent_columns(combined_table, MONEY_COLUMNS)
+
+    # Nullable integer columns (Excel parsers) are written like float columns
+    for col in combined_table.columns:
+        if pd.api.types.is_extension_array_dtype(combined_table[col]) and pd.api.types.is_integer_dtype(combined_table[col]):
+            combined_table[col] = combined_table[col].astype(float)
+
+    # Convert all numeric columns to integers where appropriate
+    for col in combined_table.columns:
+        if combined_table[col].dtype == float:
+            # Check if all non-null values are integers
+            non_null = combined_table[col].dropna()
+            if len(non_null) > 0 and all(non_null == non_null.astype(int)):
+                # Convert to integer type for both CSV and JSON output
+                combined_table[col] = combined_table[col].apply(
+                    lambda x: int(x) if pd.notnull(x) else None
+                )
+
+    # Save as JSON with metadata
+    data_dict = combined_table.to_dict(orient="records")
+    
+    # Ensure all integer values are properly represented in the data dictionary
+    data_dict = ensure_integers_in_dict(data_dict)
+    
+    data_with_metadata = {
+        "metadata": metadata,
+        "data": data_dict,
+    }
+    save_json(save_dir, base_filename, data_with_metadata)
+    save_csv(save_dir, base_filename, combined_table)
+
+
+def verify_json_integers(json_path):
+    """
+    Verify that integer values are properly saved as integers in the JSON file.
+    
+    Args:
+        json_path (str): Path to the JSON file to verify
+        
+    Returns:
+        bool: True if all integer values are properly saved as integers, False otherwise
+    """
+    with open(json_path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    
+    def check_for_integer_floats(obj, path=""):
+        """Check if any floats should be integers in the JSON data"""
+        if isinstance(obj, dict):
+            for k, v in obj.items():
+                current_path = f"{path}.{k}" if path else k
+                if not check_for_integer_floats(v, current_path):
+                    return False
+        elif isinstance(obj, list):
+            for i, item in enumerate(obj):
+                current_path = f"{path}[{i}]"
+                if not check_for_integer_floats(item, current_path):
+                    return False
+        elif isinstance(obj, float) and obj.is_integer():
+            print(f"WARNING: Found float with integer value at {path}: {obj}")
+            return False
+        return True
+    
+    return check_for_integer_floats(data)
+
+
+def save_json(save_dir, base_filename, data_with_metadata):
+    """
+    Save data with metadata as JSON file.
+    Ensures integer values are saved as integers, not floats.
+    """
+    # Custom JSON encoder to handle integer values
+    class IntegerEncoder(json.JSONEncoder):
+        def default(self, obj):
+            if isinstance(obj, pd.Series):
+                return obj.tolist()
+            if isinstance(obj, float) and obj.is_integer():
+                return int(obj)
+            return super().default(obj)
+    
+    # Apply the conversion to the entire data structure
+    processed_data = ensure_integers_in_dict(data_with_metadata)
+
+    json_dir = os.path.join(save_dir, "json_files")
+    os.makedirs(json_dir, exist_ok=True)
+    json_path = os.path.join(json_dir, f"{base_filename}_data.json")
+    with open(json_path, "w", encoding="utf-8") as f:
+        json.dump(processed_data, f, ensure_ascii=False, indent=4, cls=IntegerEncoder)
+    print(f"Saved JSON to: {json_path}")
+    
+    # Verify that integer values are properly saved
+    if not verify_json_integers(json_path):
+        print(f"WARNING: Some integer values may not be properly saved in {json_path}")
+    else:
+        print(f"Integer values verified in {json_path}")
+
+
+def save_csv(save_dir, base_filename, combined_table):
+    """
+    Save combined table as CSV file.
+    Ensures integer values are saved as integers, not floats.
+    """
+    # Convert float columns that contain only integers to integer type
+    for col in combined_table.columns:
+        if combined_table[col].dtype == float:
+            # Check if all non-null values are integers
+            non_null = combined_table[col].dropna()
+            if len(non_null) > 0 and all(non_null == non_null.astype(int)):
+                # Convert to integer type
+                combined_table[col] = combined_table[col].astype('Int64')  # pandas nullable integer type
+    
+    csv_dir = os.path.join(save_dir, "csv_files")
+    os.makedirs(csv_dir, exist_ok=True)
+    csv_path = os.path.join(csv_dir, f"{base_filename}_combined_tables.csv")
+    combined_table.to_csv(csv_path, index=False, quoting=1)
+    print(f"Saved CSV to: {csv_path}")
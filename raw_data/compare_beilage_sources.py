@@ -0,0 +1,160 @@
+"""
+Cross-check the PDF parsers against the XLSX files of the same Beilagen.
+
+Beilagen published as PDF and XLSX (an "excel" parser in anfrage_registry.py)
+are parsed both ways, brought into the columns of their output schema,
+aligned on the schema keys and compared cell by cell (see
+reconciliation.compare_cells). The XLSX data is the reference, so this is a
+regression check for the PDF parsers in 2024_Anfrage/extract_tables_from_pdfs.py:
+
+    python compare_beilage_sources.py
+    python compare_beilage_sources.py --anfrage 2025_Anfrage --beilage Beilage_6
+
+Instead of parsing the PDF again, the saved CSV output of an already
+extracted Beilage with the same figures can be compared, e.g. the 2023
+processing times of the 2024 Anfrage against the 2025 XLSX:
+
+    python compare_beilage_sources.py --beilage Beilage_5 --pdf-output 2024_Anfrage/Beilage_7
+"""
+import argparse
+import os
+import sys
+import time
+
+import pandas as pd
+
+from anfrage_registry import ANFRAGEN, OUTPUT_SCHEMAS
+from ingest_anfragen import output_path, parse_beilage, source_path
+
+from data.reconciliation import compare_cells, format_report
+
+# Summary rows only the PDF parsers return (the Excel reader stops at the "Ø" row)
+SUMMARY_LABELS = ["Durchschnitt", "Gesamt"]
+
+
+def comparable_beilagen(anfragen=None, beilagen=None, pdf_output=False):
+    """
+    Return the (anfrage, beilage) pairs that can be compared.
+
+    These are the Beilagen with an Excel and a PDF parser and both source
+    files, or with pdf_output (a saved CSV replaces the PDF) every Beilage
+    with an Excel source file.
+    """
+    pairs = []
+    for anfrage in anfragen or ANFRAGEN:
+        for beilage, spec in ANFRAGEN[anfrage]["beilagen"].items():
+            if beilagen and beilage not in beilagen:
+                continue
+            excel_source = source_path(anfrage, beilage, prefer_excel=True)
+            if not excel_source.endswith(".xlsx") or not os.path.exists(excel_source):
+                continue
+            pdf_source = source_path(anfrage, beilage, prefer_excel=False)
+            if pdf_output or (pdf_source != excel_source and os.path.exists(pdf_source)):
+                pairs.append((anfrage, beilage))
+    return pairs
+
+
+def canonical_table(table, schema):
+    """
+    Select the schema columns in order and drop the summary rows.
+
+    Schema columns missing in the table are left out (see missing_columns);
+    a table without all key columns cannot be aligned and is returned without
+    rows, so all rows of the other table are reported as missing.
+    """
+    keys = OUTPUT_SCHEMAS[schema]["keys"]
+    columns = [column for column in OUTPUT_SCHEMAS[schema]["columns"] if column in table.columns]
+    if not all(key in columns for key in keys):
+        return pd.DataFrame(columns=keys + [column for column in columns if column not in keys], dtype=object)
+    table = table[columns]
+    is_summary = table[keys].isin(SUMMARY_LABELS).any(axis=1)
+    return table[~is_summary].reset_index(drop=True)
+
+
+def missing_columns(left, right, keys, labels):
+    """One discrepancy row ("only in <label>") per value column that only one of the tables has."""
+    rows = [
+        {"column": column, "status": f"only in {label}"}
+        for label, table, other in ((labels[0], left, right), (labels[1], right, left))
+        for column in table.columns
+        if column not in keys and column not in other.columns
+    ]
+    return pd.DataFrame(rows, columns=keys + ["column", *labels, "status"])
+
+
+def read_saved_output(anfrage, beilage):
+    """Read the CSV output of an extracted Beilage (all columns as text)."""
+    return pd.read_csv(output_path(anfrage, beilage), dtype=str)
+
+
+def compare_beilage(anfrage, beilage, pdf_output=None, tolerance=0):
+    """
+    Compare the PDF and the XLSX parse of a Beilage.
+
+    Args:
+        anfrage, beilage: the Beilage to compare
+        pdf_output: (anfrage, beilage) whose saved CSV replaces the PDF parse
+        tolerance: maximum allowed absolute difference of numeric cells
+
+    Returns:
+        Discrepancy DataFrame (see reconciliation.compare_cells), plus one row per
+        schema column that only one of the sources has
+    """
+    schema = ANFRAGEN[anfrage]["beilagen"][beilage]["schema"]
+    keys = OUTPUT_SCHEMAS[schema]["keys"]
+    labels = ("pdf", "xlsx")
+    if pdf_output:
+        pdf_table = read_saved_output(*pdf_output)
+    else:
+        pdf_table, _ = parse_beilage(anfrage, beilage, prefer_excel=False)
+    excel_table, _ = parse_beilage(anfrage, beilage, prefer_excel=True)
+
+    pdf_table = canonical_table(pdf_table, schema)
+    excel_table = canonical_table(excel_table, schema)
+    if pdf_output:
+        # A saved output may cover more months than the XLSX, compare the shared rows only
+        shared = pdf_table.set_index(keys).index.isin(excel_table.set_index(keys).index)
+        pdf_table = pdf_table[shared]
+
+    discrepancies = compare_cells(pdf_table, excel_table, keys, tolerance=tolerance, labels=labels)
+    missing = missing_columns(pdf_table, excel_table, keys, labels)
+    if missing.empty:
+        return discrepancies
+    return pd.concat([discrepancies, missing], ignore_index=True)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Compare the PDF and XLSX versions of the Beilagen.")
+    parser.add_argument("--anfrage", action="append", help="only compare this Anfrage folder (repeatable)")
+    parser.add_argument("--beilage", action="append", help="only compare this Beilage (repeatable)")
+    parser.add_argument("--tolerance", type=float, default=0, help="allowed absolute difference of numbers")
+    parser.add_argument(
+        "--pdf-output", metavar="ANFRAGE/BEILAGE",
+        help="compare the saved CSV output of this Beilage instead of parsing the PDF",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    pdf_output = tuple(args.pdf_output.split("/")) if args.pdf_output else None
+    pairs = comparable_beilagen(args.anfrage, args.beilage, pdf_output=bool(pdf_output))
+    if not pairs:
+        print("No Beilagen with both a PDF and an XLSX parser and source file")
+        return 0
+    if pdf_output and len(pairs) > 1:
+        print("--pdf-output needs a single Beilage, select it with --anfrage and --beilage")
+        return 2
+
+    failed = 0
+    for anfrage, beilage in pairs:
+        start = time.perf_counter()
+        discrepancies = compare_beilage(anfrage, beilage, pdf_output=pdf_output, tolerance=args.tolerance)
+        elapsed = time.perf_counter() - start
+        print(format_report(discrepancies, f"{anfrage}/{beilage} PDF vs. XLSX ({elapsed:.2f}s)"))
+        failed += not discrepancies.empty
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
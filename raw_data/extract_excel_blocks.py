@@ -0,0 +1,130 @@
+"""
+Read the table blocks of the Excel Beilagen (2025 Anfrage and later).
+
+The Excel Beilagen repeat one block per Landesstelle on a sheet:
+
+    Bearbeitungszeit - Arztbereich
+    Burgenland
+
+    ÖGK-LS | Monat | postalische KE | online KE MeineÖGK | online KE WAHonline
+    B      | 44927 | 29             | 39                 |
+    ...
+    Ø      |       | 72.75          | 72.9               | 29.4
+
+read_blocks() streams the sheet once with openpyxl in read-only mode, finds
+the blocks by their header row and keeps the rows up to the "Ø" (average)
+row, so it does not depend on fixed row offsets. The process_* functions
+return the same columns as the PDF parsers in
+2024_Anfrage/extract_tables_from_pdfs.py, so an Excel Beilage can replace its
+PDF (see the "excel" option in anfrage_registry.py).
+"""
+
+import pandas as pd
+from openpyxl import load_workbook
+
+from data.german_dates import format_month_year
+
+HEADER_MARKER = "ÖGK-LS"
+END_MARKER = "Ø"
+
+# Excel column headers -> column names of the PDF parsers
+BEARBEITUNGSZEIT_COLUMNS = {
+    "ÖGK-LS": "ÖGK-LS",
+    "Monat": "Monat.Jahr",
+    "postalische KE": "Postal",
+    "online KE\nMeineÖGK": "OnlineMeine",
+    "online KE\nWAHonline": "OnlineWAH",
+}
+
+# Landesstellen codes used in the Excel files that differ from the PDFs
+LS_CODES = {"NÖ": "N", "OÖ": "O"}
+
+
+def _sheet_rows(file_path, sheet_name=0):
+    """Yield the rows of a sheet as tuples of cell values (read-only, no styles or formulas)."""
+    workbook = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        sheet = workbook.worksheets[sheet_name] if isinstance(sheet_name, int) else workbook[sheet_name]
+        yield from sheet.iter_rows(values_only=True)
+    finally:
+        workbook.close()
+
+
+def read_blocks(file_path, sheet_name=0, header_marker=HEADER_MARKER, end_marker=END_MARKER):
+    """
+    Read all blocks of a sheet into one DataFrame.
+
+    A block starts with a header row containing header_marker and ends
+    before the first row whose cell below the marker is empty or
+    end_marker. The sheet is streamed once, row by row.
+    """
+    records = []
+    header = None
+    for row in _sheet_rows(file_path, sheet_name):
+        if header is None:
+            if header_marker in row:
+                start = row.index(header_marker)
+                header = list(row[start:])
+                while header and header[-1] is None:
+                    header.pop()
+            continue
+
+        first = row[start] if len(row) > start else None
+        if first is None or first == end_marker:
+            header = None
+            continue
+        records.append(dict(zip(header, row[start:start + len(header)])))
+
+    return pd.DataFrame.from_records(records)
+
+
+def _excel_dates(values):
+    """Convert Excel dates (datetimes or serial day numbers) to Timestamps."""
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values
+    is_serial = values.map(lambda value: isinstance(value, (int, float)) and not isinstance(value, bool))
+    serials = pd.to_datetime(pd.to_numeric(values.where(is_serial)), unit="D", origin="1899-12-30")
+    return serials.fillna(pd.to_datetime(values.where(~is_serial), errors="coerce"))
+
+
+def _days(values):
+    """Parse processing times ("29", "65 KT", "-") to nullable integers."""
+    text = values.astype("string").str.replace("KT", "", regex=False).str.strip()
+    return pd.to_numeric(text.replace("-", pd.NA), errors="coerce").round().astype("Int64")
+
+
+def normalize_ls(values):
+    """Normalize Landesstellen codes ("B", "OÖ", "ÖGK-W") to the "ÖGK-B" form of the PDFs."""
+    codes = values.astype("string").str.strip().str.removeprefix("ÖGK-")
+    return "ÖGK-" + codes.replace(LS_CODES)
+
+
+def process_bearbeitungszeit_blocks(file_path, sheet_name=0):
+    """
+    Read the average processing times per Landesstelle and month.
+
+    Returns the columns of process_beilage_7 ("ÖGK-LS", "Monat.Jahr",
+    "Postal", "OnlineMeine", "OnlineWAH"). Months without any value (after
+    the reporting date) are dropped.
+    """
+    blocks = read_blocks(file_path, sheet_name=sheet_name)
+    df = blocks.rename(columns=BEARBEITUNGSZEIT_COLUMNS)[list(BEARBEITUNGSZEIT_COLUMNS.values())]
+
+    df["ÖGK-LS"] = normalize_ls(df["ÖGK-LS"])
+    df["Monat.Jahr"] = _excel_dates(df["Monat.Jahr"]).map(format_month_year)
+    value_columns = ["Postal", "OnlineMeine", "OnlineWAH"]
+    for col in value_columns:
+        df[col] = _days(df[col])
+
+    return df.dropna(subset=value_columns, how="all").reset_index(drop=True)
+
+
+def read_title(file_path, sheet_name=0, max_rows=10):
+    """Return the first text cell of a sheet (the question of the Beilage)."""
+    for index, row in enumerate(_sheet_rows(file_path, sheet_name)):
+        if index >= max_rows:
+            break
+        for cell in row:
+            if isinstance(cell, str) and cell.strip():
+                return " ".join(cell.split())
+    return "Question not found"
@@ -0,0 +1,151 @@
+"""
+Single driver that ingests the Beilagen of all Anfragen in anfrage_registry.py.
+
+Usage (from anywhere):
+
+    python raw_data/ingest_anfragen.py --list
+    python raw_data/ingest_anfragen.py --jobs 4
+    python raw_data/ingest_anfragen.py --anfrage 2025_Anfrage --beilage Beilage_6 --force
+
+Beilagen published as PDF and XLSX are read from the XLSX file; --pdf parses
+the PDF instead (e.g. to cross-check the PDF parser against the Excel data).
+Beilagen whose CSV output is newer than their source file are skipped, so
+only new or changed sources are parsed. Each Beilage is an independent job;
+with --jobs > 1 the jobs run in parallel worker processes. The parsers are
+imported in the workers, so Excel-only runs do not need the PDF libraries.
+"""
+import argparse
+import os
+import sys
+
+from data.batch_jobs import run_jobs
+
+# The registry paths are relative to this directory
+RAW_DATA_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(RAW_DATA_DIR)
+from anfrage_registry import ANFRAGEN, SOURCE_EXTENSIONS
+
+# Directory of the PDF parsers (extract_tables_from_pdfs.py)
+PDF_PARSER_DIR = os.path.join(RAW_DATA_DIR, "2024_Anfrage")
+
+
+def _source_file(anfrage, beilage, spec):
+    extension = SOURCE_EXTENSIONS[spec["parser"]]
+    return os.path.join(RAW_DATA_DIR, ANFRAGEN[anfrage]["source_dir"], beilage + extension)
+
+
+def beilage_spec(anfrage, beilage, prefer_excel=True):
+    """
+    The parser spec used for a Beilage.
+
+    If the spec names an "excel" parser and the XLSX file exists, the Excel
+    parser is used (unless prefer_excel is False); otherwise the PDF parser.
+    """
+    spec = ANFRAGEN[anfrage]["beilagen"][beilage]
+    excel = spec.get("excel")
+    if excel and prefer_excel and os.path.exists(_source_file(anfrage, beilage, excel)):
+        pdf_options = {key: value for key, value in spec.items() if key != "excel"}
+        return {**pdf_options, **excel}
+    return spec
+
+
+def source_path(anfrage, beilage, prefer_excel=True):
+    """Path of the source file (PDF or XLSX) of a Beilage."""
+    return _source_file(anfrage, beilage, beilage_spec(anfrage, beilage, prefer_excel))
+
+
+def output_dir(anfrage):
+    return os.path.join(RAW_DATA_DIR, ANFRAGEN[anfrage]["output_dir"])
+
+
+def output_path(anfrage, beilage):
+    """Path of the CSV output of a Beilage (see beilage_output.save_csv)."""
+    return os.path.join(output_dir(anfrage), "csv_files", f"{beilage}_combined_tables.csv")
+
+
+def is_up_to_date(anfrage, beilage, prefer_excel=True):
+    """True if the CSV output exists and is newer than the source file."""
+    output = output_path(anfrage, beilage)
+    source = source_path(anfrage, beilage, prefer_excel)
+    return os.path.exists(output) and os.path.getmtime(output) >= os.path.getmtime(source)
+
+
+def build_jobs(anfragen=None, beilagen=None, force=False, prefer_excel=True):
+    """Return the (anfrage, beilage) jobs to run, skipping up-to-date outputs unless forced."""
+    jobs = []
+    for anfrage in anfragen or ANFRAGEN:
+        if anfrage not in ANFRAGEN:
+            raise ValueError(f"Unknown Anfrage '{anfrage}', choose from {', '.join(ANFRAGEN)}")
+        for beilage in ANFRAGEN[anfrage]["beilagen"]:
+            if beilagen and beilage not in beilagen:
+                continue
+            source = source_path(anfrage, beilage, prefer_excel)
+            if not os.path.exists(source):
+                print(f"Missing source for {anfrage}/{beilage}: {source}")
+                continue
+            if not force and is_up_to_date(anfrage, beilage, prefer_excel):
+                continue
+            jobs.append((anfrage, beilage))
+    return jobs
+
+
+def parse_beilage(anfrage, beilage, prefer_excel=True):
+    """Run the registered parser of a Beilage; returns the table and the question."""
+    spec = beilage_spec(anfrage, beilage, prefer_excel)
+    path = _source_file(anfrage, beilage, spec)
+
+    if spec["parser"] == "excel_blocks":
+        import extract_excel_blocks
+        parser = getattr(extract_excel_blocks, spec["function"])
+        table = parser(path, sheet_name=spec.get("sheet_name", 0))
+        return table, extract_excel_blocks.read_title(path, sheet_name=spec.get("sheet_name", 0))
+
+    if PDF_PARSER_DIR not in sys.path:
+        sys.path.append(PDF_PARSER_DIR)
+    import extract_tables_from_pdfs
+    # The parser and the question extractor share one read of the PDF
+    with extract_tables_from_pdfs.PdfDocument(path) as document:
+        table = extract_tables_from_pdfs.parse_pdf_beilage(spec, document)
+        return table, extract_tables_from_pdfs.extract_question_from_pdf(document)
+
+
+def ingest_beilage(anfrage, beilage, prefer_excel=True):
+    """Parse a Beilage and save it as JSON and CSV (runs in the worker processes)."""
+    from beilage_output import beilage_metadata, save_beilage_table
+
+    spec = ANFRAGEN[anfrage]["beilagen"][beilage]
+    table, question = parse_beilage(anfrage, beilage, prefer_excel)
+    metadata = beilage_metadata(spec, spec.get("year", ANFRAGEN[anfrage]["year"]), question)
+    save_beilage_table(table, metadata, beilage, output_dir(anfrage))
+    return anfrage, beilage
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Extract the Beilagen of all registered Anfragen.")
+    parser.add_argument("--anfrage", action="append", help="only ingest this Anfrage folder (repeatable)")
+    parser.add_argument("--beilage", action="append", help="only ingest this Beilage, e.g. Beilage_7 (repeatable)")
+    parser.add_argument("--force", action="store_true", help="also re-ingest Beilagen whose output is up to date")
+    parser.add_argument("--pdf", action="store_true", help="parse the PDF even if the Beilage is also published as XLSX")
+    parser.add_argument("--jobs", type=int, default=1, help="number of parallel worker processes (default: 1)")
+    parser.add_argument("--list", action="store_true", help="list the jobs that would run and exit")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    prefer_excel = not args.pdf
+    jobs = build_jobs(args.anfrage, args.beilage, force=args.force, prefer_excel=prefer_excel)
+    if args.list:
+        for job in jobs:
+            print("/".join(job))
+        return 0
+
+    failures = run_jobs(
+        ingest_beilage, jobs, num_jobs=args.jobs, verb="Ingesting", describe="/".join, prefer_excel=prefer_excel,
+    )
+    print(f"Finished {len(jobs) - len(failures)} of {len(jobs)} Beilagen")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
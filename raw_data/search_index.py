@@ -0,0 +1,320 @@
+"""
+Full-text index over the downloaded Anfragen, Beantwortungen and Beilagen.
+
+    python search_index.py build
+    python search_index.py query "Bearbeitungszeit AND Wahlarzt"
+    python search_index.py query Refundierung --beilage Beilage_7 --limit 5
+
+Every page of every PDF (and every HTML document, as one page) in COLLECTIONS
+is stored in a SQLite FTS5 table together with the metadata of its document
+(INR, citation, date, Beilage), so a query returns the matching pages
+directly. The metadata comes from the parliament JSON exports next to the
+files. Building again only re-reads documents whose content changed; PDF
+pages saved by extract_text_from_pdfs.py --pages are used instead of
+extracting them again. The query syntax is the FTS5 one (AND, OR, NOT,
+"phrases", prefix*, NEAR(a b, 5)); bare terms with punctuation such as ÖGK-W
+or 18726/AB are searched as phrases.
+"""
+import argparse
+import glob
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+RAW_DATA_DIR = os.path.dirname(os.path.abspath(__file__))
+INDEX_PATH = os.path.join(RAW_DATA_DIR, "text_index.sqlite")
+
+# Directory of extract_text_from_pdfs.py (imported by the workers that read PDFs)
+sys.path.append(os.path.join(RAW_DATA_DIR, "2024_Anfrage"))
+
+# Indexed folders (relative to raw_data/) and the JSON exports with their metadata
+COLLECTIONS = {
+    "2024_Anfrage": {
+        "dirs": ["2024_Anfrage/downloaded_files"],
+        "exports": "2024_Anfrage/extras/*.json",
+    },
+    "2025_Anfrage": {
+        "dirs": ["2025_Anfrage"],
+        "exports": None,
+    },
+    "Anfragen": {
+        "dirs": ["alle_Anfragen_Beantwortungen/Anfragen/pdfs", "alle_Anfragen_Beantwortungen/Anfragen/htmls"],
+        "exports": "alle_Anfragen_Beantwortungen/Anfragen/parliament_json_exports/*.json",
+    },
+    "Beantwortungen": {
+        "dirs": [
+            "alle_Anfragen_Beantwortungen/Beantwortungen/pdfs",
+            "alle_Anfragen_Beantwortungen/Beantwortungen/htmls",
+        ],
+        "exports": "alle_Anfragen_Beantwortungen/Beantwortungen/parliament_json_exports/*.json",
+    },
+}
+
+# Folders of download_parliament_files.py: "<date>_INR_<inr>_..."
+FOLDER_PATTERN = re.compile(r"^(\d{4}-\d{2}-\d{2})_INR_(\d+)_")
+BEILAGE_PATTERN = re.compile(r"^Beilage_\w+$")
+
+# Phrases and bare terms of an FTS5 query; NEAR(...) parentheses and commas separate terms
+QUERY_TERM = re.compile(r'"[^"]*"|[^\s"(),]+')
+# Bare terms FTS5 accepts unquoted: words, prefix* and column:filters
+BARE_TERM = re.compile(r"^\^?[\w:]+\*?$")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    collection TEXT,
+    inr INTEGER,
+    citation TEXT,
+    date TEXT,
+    beilage TEXT,
+    title TEXT,
+    sha256 TEXT,
+    page_count INTEGER
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS pages USING fts5(
+    text, document_id UNINDEXED, page UNINDEXED, tokenize = 'unicode61 remove_diacritics 2'
+);
+"""
+
+# Columns of the documents table that can filter a query
+FILTER_COLUMNS = ["collection", "inr", "citation", "date", "beilage"]
+
+
+def load_exports(pattern):
+    """Parliament JSON exports matching pattern, by INR."""
+    exports = {}
+    for export_path in glob.glob(os.path.join(RAW_DATA_DIR, pattern)):
+        with open(export_path, encoding="utf-8") as f:
+            export = json.load(f)
+        exports[export.get("inr")] = export
+    return exports
+
+
+def _metadata(path, collection, exports):
+    """INR, citation, date, Beilage and title of a document."""
+    inr = date = None
+    match = FOLDER_PATTERN.match(os.path.basename(os.path.dirname(path)))
+    if match:
+        date, inr = match.group(1), int(match.group(2))
+    elif len(exports) == 1:
+        # A folder with the files of a single Anfragebeantwortung
+        inr = next(iter(exports))
+
+    export = exports.get(inr, {})
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return {
+        "path": os.path.relpath(path, RAW_DATA_DIR),
+        "collection": collection,
+        "inr": inr,
+        "citation": export.get("zitation"),
+        "date": date or (export.get("einlangen") or "")[:10] or None,
+        "beilage": stem if BEILAGE_PATTERN.match(stem) else None,
+        "title": export.get("title"),
+    }
+
+
+def find_documents(collections=COLLECTIONS):
+    """Return the metadata of all PDF and HTML documents in the collections."""
+    documents = []
+    for collection, config in collections.items():
+        exports = load_exports(config["exports"]) if config["exports"] else {}
+        for directory in config["dirs"]:
+            for root, _, filenames in os.walk(os.path.join(RAW_DATA_DIR, directory)):
+                for filename in sorted(filenames):
+                    if filename.lower().endswith((".pdf", ".html")):
+                        documents.append(_metadata(os.path.join(root, filename), collection, exports))
+    return documents
+
+
+def sha256_of_file(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def read_pages(path, sha256=None):
+    """Text of every page of a PDF, or the text of an HTML document as a single page."""
+    if path.lower().endswith(".html"):
+        from bs4 import BeautifulSoup
+
+        with open(path, encoding="utf-8", errors="replace") as f:
+            return [BeautifulSoup(f.read(), "html.parser").get_text("\n", strip=True)]
+
+    from extract_text_from_pdfs import extract_page_texts, saved_page_texts
+
+    pages = saved_page_texts(path, sha256) if sha256 else None
+    if pages is None:
+        pages = extract_page_texts(path)
+    return [page or "" for page in pages]
+
+
+def _read_document(path, sha256):
+    return read_pages(os.path.join(RAW_DATA_DIR, path), sha256)
+
+
+def connect(path=INDEX_PATH):
+    connection = sqlite3.connect(path)
+    connection.executescript(SCHEMA)
+    return connection
+
+
+def build_index(path=INDEX_PATH, collections=COLLECTIONS, num_jobs=None, rebuild=False):
+    """
+    Index all documents of the collections whose content changed since the last build.
+
+    Returns:
+        dict with the number of "indexed", "unchanged", "removed" and "failed" documents
+    """
+    if rebuild and os.path.exists(path):
+        os.remove(path)
+    connection = connect(path)
+    known = dict(connection.execute("SELECT path, sha256 FROM documents").fetchall())
+
+    documents = find_documents(collections)
+    for document in documents:
+        document["sha256"] = sha256_of_file(os.path.join(RAW_DATA_DIR, document["path"]))
+    changed = [document for document in documents if known.get(document["path"]) != document["sha256"]]
+    counts = {"indexed": 0, "unchanged": len(documents) - len(changed), "removed": 0, "failed": 0}
+
+    # Documents that are no longer on disk
+    on_disk = {document["path"] for document in documents}
+    for removed_path in set(known) - on_disk:
+        _delete_document(connection, removed_path)
+        counts["removed"] += 1
+
+    print(f"Indexing {len(changed)} of {len(documents)} documents")
+    with ProcessPoolExecutor(max_workers=num_jobs) as executor:
+        futures = [executor.submit(_read_document, document["path"], document["sha256"]) for document in changed]
+        # Written in the main process, in document order
+        for document, future in zip(changed, futures):
+            try:
+                pages = future.result()
+            except Exception as e:
+                print(f"Error reading {document['path']}: {e}")
+                counts["failed"] += 1
+                continue
+            _delete_document(connection, document["path"])
+            cursor = connection.execute(
+                "INSERT INTO documents (path, collection, inr, citation, date, beilage, title, sha256, page_count) "
+                "VALUES (:path, :collection, :inr, :citation, :date, :beilage, :title, :sha256, :page_count)",
+                {**document, "page_count": len(pages)},
+            )
+            connection.executemany(
+                "INSERT INTO pages (text, document_id, page) VALUES (?, ?, ?)",
+                [(text, cursor.lastrowid, number) for number, text in enumerate(pages, start=1)],
+            )
+            connection.commit()
+            counts["indexed"] += 1
+
+    connection.execute("INSERT INTO pages (pages) VALUES ('optimize')")
+    connection.commit()
+    connection.close()
+    return counts
+
+
+def _delete_document(connection, path):
+    row = connection.execute("SELECT id FROM documents WHERE path = ?", (path,)).fetchone()
+    if row:
+        connection.execute("DELETE FROM pages WHERE document_id = ?", row)
+        connection.execute("DELETE FROM documents WHERE id = ?", row)
+
+
+def quote_terms(query):
+    """Quote the bare terms FTS5 would reject, e.g. ÖGK-W -> "ÖGK-W" and ÖGK-W* -> "ÖGK-W"*."""
+    def quote(match):
+        term = match.group(0)
+        if term.startswith('"') or BARE_TERM.match(term):
+            return term
+        prefix = "*" if term.endswith("*") else ""
+        return f'"{term.rstrip("*")}"{prefix}'
+
+    return QUERY_TERM.sub(quote, query)
+
+
+def search(query, path=INDEX_PATH, limit=20, **filters):
+    """
+    Find the pages matching an FTS5 query, best matches first.
+
+    Args:
+        query: FTS5 query, e.g. 'Bearbeitungszeit AND Wahlarzt' (see quote_terms)
+        limit: maximum number of pages returned
+        filters: document metadata to match exactly (collection, inr, citation, date, beilage)
+
+    Returns:
+        DataFrame with the citation, INR, date, Beilage, path, page and a snippet of every hit
+
+    Raises:
+        ValueError: for an unknown filter or a query FTS5 cannot parse
+    """
+    unknown = set(filters) - set(FILTER_COLUMNS)
+    if unknown:
+        raise ValueError(f"Unknown filter {', '.join(sorted(unknown))}, choose from {', '.join(FILTER_COLUMNS)}")
+    conditions = "".join(f" AND d.{column} = :{column}" for column in filters)
+    sql = f"""
+        SELECT d.citation, d.inr, d.date, d.beilage, d.path, pages.page,
+               snippet(pages, 0, '[', ']', '…', 16) AS snippet
+        FROM pages
+        JOIN documents AS d ON d.id = pages.document_id
+        WHERE pages MATCH :query{conditions}
+        ORDER BY bm25(pages)
+        LIMIT :limit
+    """
+    connection = sqlite3.connect(path)
+    try:
+        return pd.read_sql_query(sql, connection, params={"query": quote_terms(query), "limit": limit, **filters})
+    except pd.errors.DatabaseError as e:
+        raise ValueError(f"Invalid query {query!r}: {e.__cause__ or e}") from e
+    finally:
+        connection.close()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Full-text index over the downloaded parliament documents.")
+    parser.add_argument("--index", default=INDEX_PATH, help="index database (default: raw_data/text_index.sqlite)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build = commands.add_parser("build", help="index new and changed documents")
+    build.add_argument("--rebuild", action="store_true", help="start from an empty index")
+    build.add_argument("--jobs", type=int, default=None, help="parallel worker processes (default: one per CPU)")
+
+    query = commands.add_parser("query", help="print the pages matching a query")
+    query.add_argument("query", help="FTS5 query, e.g. 'Bearbeitungszeit AND Wahlarzt'")
+    query.add_argument("--limit", type=int, default=20, help="maximum number of hits (default: 20)")
+    for column in FILTER_COLUMNS:
+        query.add_argument(f"--{column}", type=int if column == "inr" else str, help=f"only documents with this {column}")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.command == "build":
+        counts = build_index(args.index, num_jobs=args.jobs, rebuild=args.rebuild)
+        print(", ".join(f"{count} {name}" for name, count in counts.items()))
+        return 1 if counts["failed"] else 0
+
+    filters = {column: getattr(args, column) for column in FILTER_COLUMNS if getattr(args, column) is not None}
+    try:
+        hits = search(args.query, args.index, limit=args.limit, **filters)
+    except ValueError as e:
+        print(e)
+        return 2
+    if hits.empty:
+        print("No matches")
+        return 1
+    for hit in hits.itertuples():
+        source = " ".join(str(value) for value in (hit.citation, hit.date, hit.beilage) if value)
+        print(f"{source} | {hit.path} p.{hit.page}\n    {' '.join(hit.snippet.split())}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,33 @@
+"""
+Golden-file test of the Beilage_1 PDF parser.
+
+process_beilage_1 on the downloaded Beilage_1.pdf of the 2024 Anfrage must
+reproduce the committed extracted_data CSV (Landesstellen, Euro amounts and
+exact cents):
+
+    python -m pytest tests/test_beilage_1_golden.py
+"""
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+pytest.importorskip("pdfplumber")
+
+ANFRAGE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "raw_data", "2024_Anfrage")
+PDF_PATH = os.path.join(ANFRAGE_DIR, "downloaded_files", "Beilage_1.pdf")
+GOLDEN_CSV = os.path.join(ANFRAGE_DIR, "extracted_data", "csv_files", "Beilage_1_combined_tables.csv")
+
+sys.path.append(ANFRAGE_DIR)
+from extract_tables_from_pdfs import extract_tables_from_pdf, process_beilage_1  # noqa: E402
+
+from data.german_numbers import MONEY_COLUMNS, add_cent_columns  # noqa: E402
+
+
+def test_beilage_1_matches_golden_csv():
+    tables = extract_tables_from_pdf(PDF_PATH, None)
+    table = process_beilage_1(tables, tables[0].iloc[0]).reset_index(drop=True)
+
+    golden = pd.read_csv(GOLDEN_CSV, dtype={"LST": "str"})
+    pd.testing.assert_frame_equal(add_cent_columns(table, MONEY_COLUMNS), golden, check_dtype=False)
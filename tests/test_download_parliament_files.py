@@ -0,0 +1,130 @@
+"""
+Test of the parliament downloader against a local stand-in server.
+
+The script is run with --base-url pointing at an http.server that answers
+one file with a transient 503 and breaks off another one halfway through the
+first response; both must arrive complete after the retry:
+
+    python -m pytest tests/test_download_parliament_files.py
+"""
+import json
+import os
+import subprocess
+import sys
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+REPO_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+SCRIPT_DIR = os.path.join(REPO_DIR, "raw_data", "alle_Anfragen_Beantwortungen")
+SCRIPT = os.path.join(SCRIPT_DIR, "download_parliament_files.py")
+
+# Files on the stand-in server, by link
+FILES = {
+    "/dokument/XXVII/AB/18726/imfname_1.pdf": b"%PDF-1.4 Anfragebeantwortung " + b"x" * 5000,
+    "/dokument/XXVII/AB/18726/fnameorig_1.html": "<html><body>Anfragebeantwortung</body></html>".encode(),
+    "/dokument/XXVII/AB/18726/imfname_2.pdf": b"%PDF-1.4 Beilage 7 " + b"y" * 80000,
+    "/dokument/XXVII/AB/18726/imfname_3.xlsx": b"PK Beilage 8 " + b"z" * 3000,
+}
+TRANSIENT_ERROR = "/dokument/XXVII/AB/18726/imfname_1.pdf"  # 503 on the first request
+INTERRUPTED = "/dokument/XXVII/AB/18726/imfname_2.pdf"  # first response breaks off halfway
+
+EXPORT = {
+    "inr": 18726,
+    "einlangen": "2024-10-08T00:00:00",
+    "zitation": "18726/AB",
+    "reference": [{"art": "BA", "zitation": "19270/J"}],
+    "documents": [
+        {
+            "title": "Anfragebeantwortung",
+            "documents": [
+                {"link": "/dokument/XXVII/AB/18726/imfname_1.pdf", "type": "PDF"},
+                {"link": "/dokument/XXVII/AB/18726/fnameorig_1.html", "type": "HTML"},
+            ],
+        },
+        {"title": "Beilage 7", "documents": [{"link": "/dokument/XXVII/AB/18726/imfname_2.pdf", "type": "PDF"}]},
+        {"title": "Beilage 8", "documents": [{"link": "/dokument/XXVII/AB/18726/imfname_3.xlsx", "type": "XLSX"}]},
+    ],
+}
+TARGET_DIR = "2024-10-08_INR_18726_beantwortet_19270J"
+TARGETS = {
+    "/dokument/XXVII/AB/18726/imfname_1.pdf": os.path.join("pdfs", TARGET_DIR, "Anfragebeantwortung.pdf"),
+    "/dokument/XXVII/AB/18726/fnameorig_1.html": os.path.join("htmls", TARGET_DIR, "Anfragebeantwortung.html"),
+    "/dokument/XXVII/AB/18726/imfname_2.pdf": os.path.join("pdfs", TARGET_DIR, "Beilage_7.pdf"),
+    "/dokument/XXVII/AB/18726/imfname_3.xlsx": os.path.join("pdfs", TARGET_DIR, "Beilage_8.xlsx"),
+}
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    requests = Counter()
+    lock = threading.Lock()
+
+    def do_GET(self):
+        with self.lock:
+            self.requests[self.path] += 1
+            attempt = self.requests[self.path]
+        if self.path not in FILES:
+            self.send_error(404)
+            return
+        if self.path == TRANSIENT_ERROR and attempt == 1:
+            self.send_error(503)
+            return
+
+        body = FILES[self.path]
+        self.send_response(200)
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.path == INTERRUPTED and attempt == 1:
+            # Close the connection after half of the announced body
+            self.wfile.write(body[: len(body) // 2])
+            self.close_connection = True
+            return
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def base_url():
+    StandInHandler.requests = Counter()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_import_creates_no_directories(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.syspath_prepend(SCRIPT_DIR)
+    import download_parliament_files  # noqa: F401
+
+    assert os.listdir(tmp_path) == []
+
+
+def test_downloads_survive_transient_errors_and_interruptions(base_url, tmp_path):
+    export_dir = tmp_path / "Beantwortungen" / "parliament_json_exports"
+    export_dir.mkdir(parents=True)
+    (export_dir / "18726_AB.json").write_text(json.dumps(EXPORT), encoding="utf-8")
+
+    completed = subprocess.run(
+        [sys.executable, SCRIPT, "--base-url", base_url, "--workers", "4"],
+        cwd=tmp_path, capture_output=True, text=True, timeout=120,
+    )
+    assert completed.returncode == 0, completed.stderr
+    assert f"Downloaded {len(FILES)} of {len(FILES)} files" in completed.stdout
+
+    for link, target in TARGETS.items():
+        assert (tmp_path / "Beantwortungen" / target).read_bytes() == FILES[link]
+    assert not list(tmp_path.rglob("*.part"))
+    assert (tmp_path / "Anfragen" / "pdfs").is_dir()
+
+    # One retry for the 503 and one for the broken-off response, no other repeats
+    assert StandInHandler.requests[TRANSIENT_ERROR] == 2
+    assert StandInHandler.requests[INTERRUPTED] == 2
+    assert sum(StandInHandler.requests.values()) == len(FILES) + 2
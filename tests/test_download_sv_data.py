@@ -0,0 +1,107 @@
+"""
+Test of the SV data downloader against a local copy of the website.
+
+tests/fixtures/sv_site holds saved category pages (trimmed to their file
+links) and small stand-ins for the linked files. They are served with
+http.server, and main(site_url=...) is run twice in a temporary directory:
+
+    python -m pytest tests/test_download_sv_data.py
+"""
+import hashlib
+import json
+import os
+import sys
+import threading
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+pytest.importorskip("bs4")
+
+REPO_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+SITE_DIR = os.path.join(REPO_DIR, "tests", "fixtures", "sv_site")
+
+sys.path.append(os.path.join(REPO_DIR, "data", "extras", "SV_Daten_Archive"))
+import download_sv_data  # noqa: E402
+
+# Files linked from the saved category pages: manifest key -> content id on the site
+EXPECTED_FILES = {
+    "Beschaeftigte_Oesterreich/boe_2501.xlsx": "10008.1000001",
+    "Beschaeftigte_Oesterreich/boe_2502.xlsx": "10008.1000002",
+    "Sozialversicherung_Zahlen/sv_in_zahlen_2024.pdf": "10008.1000003",
+    "Statistisches_Handbuch/statistisches_handbuch_2024.pdf": "10008.1000004",
+    "Statistisches_Handbuch/statistisches_handbuch_2023_tabellen.zip": "10008.1000005",
+}
+
+
+class SavedSiteHandler(SimpleHTTPRequestHandler):
+    """
+    Serves /cdscontent/?contentid=<id> from cdscontent/<id>.html and
+    /cdscontent/load?contentid=<id> from cdscontent/load/<id>, with
+    Last-Modified and If-Modified-Since as for any file (http.server)
+    """
+
+    def translate_path(self, path):
+        url = urlsplit(path)
+        contentid = parse_qs(url.query)["contentid"][0]
+        if url.path == "/cdscontent/":
+            return os.path.join(self.directory, "cdscontent", f"{contentid}.html")
+        return os.path.join(self.directory, "cdscontent", "load", contentid)
+
+    def guess_type(self, path):
+        if path.endswith(".html"):
+            return "text/html; charset=utf-8"
+        return "application/octet-stream"
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def site_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), partial(SavedSiteHandler, directory=SITE_DIR))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+def fixture_file(contentid):
+    with open(os.path.join(SITE_DIR, "cdscontent", "load", contentid), "rb") as f:
+        return f.read()
+
+
+def test_second_run_finds_every_file_unchanged(site_url, tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(download_sv_data, "REQUESTS_PER_SECOND", 1000)
+
+    download_sv_data.main(site_url=site_url)
+    assert f"Downloaded {len(EXPECTED_FILES)}, unchanged 0, failed 0" in capsys.readouterr().out
+
+    with open(tmp_path / download_sv_data.MANIFEST_FILE, encoding="utf-8") as f:
+        manifest = json.load(f)
+    assert sorted(manifest) == sorted(EXPECTED_FILES)
+    for key, contentid in EXPECTED_FILES.items():
+        content = fixture_file(contentid)
+        entry = manifest[key]
+        assert (tmp_path / key).read_bytes() == content
+        assert entry["url"].startswith(f"{site_url}/cdscontent/load?contentid={contentid}&")
+        assert entry["size"] == len(content)
+        assert entry["sha256"] == hashlib.sha256(content).hexdigest()
+        assert entry["last_modified"]
+    assert manifest["Beschaeftigte_Oesterreich/boe_2502.xlsx"]["month"] == 2
+    assert manifest["Sozialversicherung_Zahlen/sv_in_zahlen_2024.pdf"]["year"] == "2024"
+    assert manifest["Statistisches_Handbuch/statistisches_handbuch_2023_tabellen.zip"]["size_label"] == "ZIP,2 MB"
+
+    download_sv_data.main(site_url=site_url)
+    output = capsys.readouterr().out
+    assert f"Downloaded 0, unchanged {len(EXPECTED_FILES)}, failed 0" in output
+    for key in EXPECTED_FILES:
+        assert f"Unchanged since the last download: {key}" in output
+
+    with open(tmp_path / download_sv_data.MANIFEST_FILE, encoding="utf-8") as f:
+        assert json.load(f) == manifest
+    assert "Last updated on website: 17. März 2025" in (tmp_path / "README.md").read_text(encoding="utf-8")
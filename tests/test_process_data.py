@@ -0,0 +1,32 @@
+"""
+Smoke test of process_data.py on the committed extracted_data of the 2024 Anfrage.
+
+main() must run from any working directory and reproduce the committed
+data/csv exports:
+
+    python -m pytest tests/test_process_data.py
+"""
+import os
+import sys
+
+REPO_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+ANFRAGE_DIR = os.path.join(REPO_DIR, "raw_data", "2024_Anfrage")
+EXPORT_DIR = os.path.join(REPO_DIR, "data", "csv")
+
+sys.path.append(ANFRAGE_DIR)
+from process_data import main  # noqa: E402
+
+
+def test_main_reproduces_committed_exports(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    export_dir = tmp_path / "csv"
+
+    main(["--export-dir", str(export_dir)])
+
+    exported = sorted(os.listdir(export_dir))
+    assert len(exported) == 17
+    for filename in exported:
+        with open(export_dir / filename, encoding="utf-8") as f:
+            written = f.read()
+        with open(os.path.join(EXPORT_DIR, filename), encoding="utf-8") as f:
+            assert written == f.read(), filename
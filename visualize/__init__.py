@@ -0,0 +1,7 @@
+"""
+Plot scripts of WARRA (plot_*.py) and the batch runner warra_plot.py.
+
+The plot scripts are run from this directory and import their helpers by
+module name; the package only exists so that the ``warra-plot`` command
+(see pyproject.toml) can import ``visualize.warra_plot``.
+"""
@@ -0,0 +1,116 @@
+import pandas as pd
+import numpy as np
+
+# Group cutoff percentages for the rank-based grouping
+TOP_GROUP_CUTOFF = 89  # Top group includes Fachrichtungen responsible for up to 89% of total applications
+BOTTOM_GROUP_CUTOFF = 99  # Bottom group includes Fachrichtungen responsible for the last 1% of total applications
+
+VALUE_COLUMNS = ["postal", "online", "Gesamt"]
+
+def build_antraege_matrices(df):
+    """Pivot a prepared Anträge DataFrame into dense date × FG-Code matrices.
+
+    Returns a dict with the sorted ``dates``, the ``fg_codes`` (column order)
+    and one float array of shape (len(dates), len(fg_codes)) per value column.
+    Missing months are filled with 0, so every FG-Code has a value for every date.
+    """
+    df = df.dropna(subset=["FG-Code"])
+    pivoted = df.pivot_table(
+        index="Date", columns="FG-Code", values=VALUE_COLUMNS, aggfunc="sum", sort=True
+    )
+
+    dates = pivoted.index
+    fg_codes = pivoted.columns.get_level_values("FG-Code").unique()
+
+    matrices = {"dates": dates, "fg_codes": fg_codes}
+    matrices["reported"] = pivoted["Gesamt"].reindex(columns=fg_codes).notna().to_numpy()
+    for column in VALUE_COLUMNS:
+        matrices[column] = (
+            pivoted[column].reindex(columns=fg_codes).fillna(0).to_numpy(dtype=float)
+        )
+
+    # Yearly average per FG-Code, only counting months in which the FG-Code was reported
+    # (matches df.groupby("FG-Code")["Gesamt"].mean())
+    counts = df.groupby("FG-Code")["Gesamt"].count().reindex(fg_codes).to_numpy()
+    with np.errstate(invalid="ignore", divide="ignore"):
+        matrices["yearly_avg"] = np.nan_to_num(matrices["Gesamt"].sum(axis=0) / counts)
+
+    return matrices
+
+def select_fg_columns(matrices, column_idx):
+    """Return a view of the matrices restricted to the given FG-Code column positions."""
+    column_idx = np.asarray(column_idx, dtype=int)
+    selected = {"dates": matrices["dates"], "fg_codes": matrices["fg_codes"][column_idx]}
+    for key in VALUE_COLUMNS + ["reported", "yearly_avg"]:
+        selected[key] = matrices[key][..., column_idx]
+    return selected
+
+def rank_fg_groups(matrices, cutoffs=(TOP_GROUP_CUTOFF, BOTTOM_GROUP_CUTOFF)):
+    """Rank FG-Codes by yearly average and split them by cumulative share.
+
+    Returns the per-group matrices (ordered by descending yearly average) and a
+    DataFrame with the rank, cumulative percentage and group of every FG-Code.
+    FG-Codes with a cumulative share up to ``cutoffs[0]`` fall into group 0,
+    up to ``cutoffs[1]`` into group 1, and so on.
+    """
+    yearly_avg = matrices["yearly_avg"]
+    order = np.argsort(-yearly_avg, kind="stable")
+    cumsum_percentage = np.cumsum(yearly_avg[order]) / yearly_avg.sum() * 100
+    group_of_rank = np.searchsorted(np.asarray(cutoffs), cumsum_percentage, side="left")
+
+    ranking = pd.DataFrame({
+        "FG-Code": matrices["fg_codes"][order],
+        "yearly_avg": yearly_avg[order],
+        "cumsum_percentage": cumsum_percentage,
+        "group": group_of_rank,
+    })
+
+    groups = [
+        select_fg_columns(matrices, order[group_of_rank == group])
+        for group in range(len(cutoffs) + 1)
+    ]
+    return groups, ranking
+
+def balanced_fg_groups(matrices, num_groups):
+    """Split FG-Codes ranked by yearly average into groups of equal size.
+
+    Returns a list of ``(group, start_rank, end_rank)`` tuples, where ``group``
+    holds the matrices of that rank slice. Each group gets
+    ``floor(total / num_groups)`` FG-Codes.
+    """
+    order = np.argsort(-matrices["yearly_avg"], kind="stable")
+    fgs_per_group = len(order) // num_groups
+    starts = np.arange(num_groups) * fgs_per_group
+    ends = np.minimum(starts + fgs_per_group, len(order))
+    return [
+        (select_fg_columns(matrices, order[start:end]), start, end)
+        for start, end in zip(starts, ends)
+    ]
+
+def compute_deviations(matrices):
+    """Compute monthly deviations from the yearly average (weighted by month length).
+
+    Returns ``(deviation, deviation_percentage)`` as date × FG-Code arrays. Months
+    in which an FG-Code was not reported get a deviation of 0.
+    """
+    days_in_month = np.asarray(matrices["dates"].days_in_month, dtype=float)
+    weights = days_in_month[:, None] * matrices["reported"]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        weighted_avg = (matrices["Gesamt"] * weights).sum(axis=0) / weights.sum(axis=0)
+        deviation = np.where(matrices["reported"], matrices["Gesamt"] - weighted_avg, 0.0)
+        deviation_percentage = np.nan_to_num(deviation / weighted_avg)
+    return np.nan_to_num(deviation), deviation_percentage
+
+def stack_offsets(values):
+    """Compute stacking offsets for positive and negative bars.
+
+    Positive values are stacked upwards from 0, negative values downwards.
+    Returns the bottom of every bar (same shape as ``values``) and the
+    stacked extent per date as ``(positive_top, negative_bottom)``.
+    """
+    positive = np.where(values > 0, values, 0.0)
+    negative = np.where(values < 0, values, 0.0)
+    positive_top = np.cumsum(positive, axis=1)
+    negative_bottom = np.cumsum(negative, axis=1)
+    bottoms = np.where(values > 0, positive_top - positive, negative_bottom - negative)
+    return bottoms, positive_top[:, -1], negative_bottom[:, -1]
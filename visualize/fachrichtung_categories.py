@@ -0,0 +1,116 @@
+import pandas as pd
+import os
+from functools import lru_cache
+
+REPO_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+# FG-Code -> Kategorie lookup table, stored with the FG-Code reference data
+CATEGORY_TABLE = os.path.join(REPO_DIR, "misc", "FG-Codes", "fg_code_kategorien.csv")
+DEFAULT_CATEGORY = "Sonstige"
+
+# Source Antraege tables used to (re)generate the lookup table (Ärzte and MTD-Berufe)
+SOURCE_FILES = [
+    os.path.join(REPO_DIR, "data", "csv", "03_OEGK_Antraege_pro_Monat_2023_pro_Fachrichtung_online_postal_Bundesweit.csv"),
+    os.path.join(REPO_DIR, "data", "csv", "04_OEGK_Antraege_pro_Monat_2023_pro_Fachrichtung_online_postal_pro_Bundesland.csv"),
+    os.path.join(
+        REPO_DIR, "data", "csv",
+        "10_OEGK_Antraege_MTD_Berufe_pro_Monat_2021_2022_2023_postal_online_pro_Fachrichtung_Bundesweit_und_pro_Bundesland.csv",
+    ),
+]
+
+FACHRICHTUNG_CATEGORIES = {
+    # Primärversorgung
+    "Arzt für Allgemeinmedizin": "Primärversorgung",
+    "FA für Innere Medizin": "Primärversorgung",
+    "FA für Kinder- und Jugendheilkunde": "Primärversorgung",
+
+    # Chirurgische Fächer
+    "FA für Chirurgie": "Chirurgische Fächer",
+    "FA für Unfallchirurgie": "Chirurgische Fächer",
+    "FA für Orthopädie und orthopädische Chirurgie": "Chirurgische Fächer",
+    "FA für Plastische Chirurgie": "Chirurgische Fächer",
+    "FA für Kinderchirurgie": "Chirurgische Fächer",
+    "FA für Mund., Kiefer- und Gesichtschirurgie": "Chirurgische Fächer",
+
+    # Frauenheilkunde
+    "FA für Frauenheilkunde und Geburtshilfe": "Frauenheilkunde",
+
+    # Psychiatrie & Neurologie
+    "FA für Psychiatrie": "Psychiatrie & Neurologie",
+    "FA für Neurologie": "Psychiatrie & Neurologie",
+    "FA für Kinder- und Jugendpsychiatrie": "Psychiatrie & Neurologie",
+    "FA für Neurologie und Psychiatrie/ Psychiatrie und Neurologie": "Psychiatrie & Neurologie",
+
+    # Anästhesie & Intensivmedizin
+    "FA für Anästhesiologie und Intensivmedizin": "Anästhesie & Intensivmedizin",
+    "FA für Neurochirurgie": "Anästhesie & Intensivmedizin",
+
+    # Fachärzte für spezifische Organe
+    "FA für Augenheilkunde und Optometrie": "Fachärzte für spezifische Organe",
+    "FA für Hals-, Nasen- und Ohrenerkrankungen": "Fachärzte für spezifische Organe",
+    "FA für Urologie": "Fachärzte für spezifische Organe",
+    "FA für Haut- und Geschlechtskrankheiten": "Fachärzte für spezifische Organe",
+    "FA für Lungenkrankheiten": "Fachärzte für spezifische Organe",
+
+    # Diagnostische Fächer
+    "FA für Radiologie": "Diagnostische Fächer",
+    "FA für Nuklearmedizin": "Diagnostische Fächer",
+    "FA für Strahlentherapie - Radioonkologie": "Diagnostische Fächer",
+    "FA für medizinische und chemische Labordiagnostik": "Diagnostische Fächer",
+    "FA für Pathologie und Histologie": "Diagnostische Fächer",
+    "FA für Hygiene und Mikrobiologie bzw. Labordiagnostik": "Diagnostische Fächer",
+    "FA für medizinische Biologie": "Diagnostische Fächer",
+    "FA für Immunologie": "Diagnostische Fächer",
+
+    # MTD-Berufe (Beilage 10/11)
+    "Physiotherapie": "MTD-Berufe",
+    "Logopäde": "MTD-Berufe",
+    "Ergotherapeut": "MTD-Berufe",
+}
+
+def get_fachrichtung_category(fachrichtung):
+    """Map a Fachrichtung name to its category."""
+    return FACHRICHTUNG_CATEGORIES.get(fachrichtung, DEFAULT_CATEGORY)
+
+def generate_category_table(dfs, output_file=CATEGORY_TABLE):
+    """Generate the FG-Code -> Kategorie table from Anträge DataFrames.
+
+    Each FG-Code is classified once via its (first seen) Fachrichtung name.
+    Rows already present in ``output_file`` are kept, so manually added or
+    corrected FG-Codes survive a regeneration.
+    """
+    pairs = pd.concat([df[["FG-Code", "Fachrichtung"]] for df in dfs]).dropna()
+    pairs["Fachrichtung"] = pairs["Fachrichtung"].str.strip(" -")
+    table = pairs.drop_duplicates("FG-Code").copy()
+    table["FG-Code"] = table["FG-Code"].astype(int)
+    table["Kategorie"] = table["Fachrichtung"].map(FACHRICHTUNG_CATEGORIES).fillna(DEFAULT_CATEGORY)
+
+    if os.path.exists(output_file):
+        existing = pd.read_csv(output_file)
+        table = pd.concat([existing, table]).drop_duplicates("FG-Code", keep="first")
+
+    table = table.sort_values("FG-Code")
+    table.to_csv(output_file, index=False)
+    load_category_map.cache_clear()
+    load_fachrichtung_map.cache_clear()
+    return table
+
+@lru_cache(maxsize=None)
+def load_category_map(table_file=CATEGORY_TABLE):
+    """Load the FG-Code -> Kategorie table as a Series indexed by FG-Code."""
+    table = pd.read_csv(table_file)
+    return pd.Series(table["Kategorie"].values, index=table["FG-Code"].astype(float))
+
+@lru_cache(maxsize=None)
+def load_fachrichtung_map(table_file=CATEGORY_TABLE):
+    """Load the FG-Code -> Fachrichtung table (one spelling per FG-Code) as a Series indexed by FG-Code."""
+    table = pd.read_csv(table_file)
+    return pd.Series(table["Fachrichtung"].values, index=table["FG-Code"].astype("Int16"))
+
+def map_fg_categories(fg_codes):
+    """Map a Series of FG-Codes to categories (unknown codes become 'Sonstige')."""
+    return fg_codes.astype(float).map(load_category_map()).fillna(DEFAULT_CATEGORY)
+
+if __name__ == "__main__":
+    table = generate_category_table([pd.read_csv(source_file) for source_file in SOURCE_FILES])
+    print(f"Wrote {len(table)} FG-Codes to {CATEGORY_TABLE}")
@@ -0,0 +1,52 @@
+import os
+import matplotlib.pyplot as plt
+
+# Environment variable selecting the output profile. Using the environment
+# lets the batch runner (warra_plot.py) pass the profile on to its worker
+# processes, and works for the single scripts as well:
+#   WARRA_PLOT_PROFILE=preview python plot_oegk_antraege.py
+PROFILE_ENV_VAR = "WARRA_PLOT_PROFILE"
+DEFAULT_PROFILE = "default"
+
+# Settings that override the save_kwargs of the plot scripts.
+# "bbox_inches": None disables the tight bounding box (saves an extra layout pass).
+# "suffix" is appended to the file name, so other PNG profiles never overwrite
+# the committed default figures.
+OUTPUT_PROFILES = {
+    "default": {"dpi": 300, "bbox_inches": "tight", "format": "png"},  # Same as before: 300 dpi PNG
+    "preview": {"dpi": 72, "bbox_inches": None, "format": "png", "suffix": "_preview"},  # Fast, for iterating on a plot
+    "print": {"dpi": 600, "bbox_inches": "tight", "format": "png", "suffix": "_print"},  # High resolution raster
+    "pdf": {"bbox_inches": "tight", "format": "pdf"},  # Vector output for the thesis
+    "svg": {"bbox_inches": "tight", "format": "svg"},  # Vector output for the web
+}
+
+def get_output_profile():
+    """Return the name of the active output profile."""
+    profile = os.environ.get(PROFILE_ENV_VAR, DEFAULT_PROFILE)
+    if profile not in OUTPUT_PROFILES:
+        raise ValueError(f"Unknown output profile '{profile}', choose from {', '.join(OUTPUT_PROFILES)}")
+    return profile
+
+def set_output_profile(profile):
+    """Select the output profile for all following save_figure calls."""
+    if profile not in OUTPUT_PROFILES:
+        raise ValueError(f"Unknown output profile '{profile}', choose from {', '.join(OUTPUT_PROFILES)}")
+    os.environ[PROFILE_ENV_VAR] = profile
+
+def save_figure(filename, **save_kwargs):
+    """Save the current figure using the active output profile.
+
+    The profile overrides dpi, bbox_inches and the file format; the file
+    extension of ``filename`` is replaced to match the format and the profile
+    suffix (if any) is added. Returns the filename actually written.
+    """
+    settings = dict(OUTPUT_PROFILES[get_output_profile()])
+    file_format = settings.pop("format")
+    suffix = settings.pop("suffix", "")
+    save_kwargs.update(settings)
+    if save_kwargs["bbox_inches"] is None:
+        del save_kwargs["bbox_inches"]
+
+    filename = f"{os.path.splitext(filename)[0]}{suffix}.{file_format}"
+    plt.savefig(filename, format=file_format, **save_kwargs)
+    return filename
@@ -2,6 +2,7 @@ import pandas as pd
 import matplotlib.pyplot as plt
 import numpy as np
 import os
+from output_profiles import save_figure
 
 # Output directory for the visualization
 OUTPUT_DIR = "../figures/BVAEB/Betraege"
@@ -309,22 +310,18 @@ def create_plot(input_file, dark_mode=True, is_updated=False):
     )
     fig.lines.append(vertical_line)
 
-    plt.savefig(filename, **save_kwargs)
+    save_figure(filename, **save_kwargs)
     plt.close()
 
 
-def main():
+def main(dark_modes=(True, False)):
     """Generate plots in both dark and light mode using the updated data."""
-    create_plot(
-        "../data/csv/manually_extracted/BVAEB_Betraege_updated.csv",
-        dark_mode=True,
-        is_updated=True,
-    )
-    create_plot(
-        "../data/csv/manually_extracted/BVAEB_Betraege_updated.csv",
-        dark_mode=False,
-        is_updated=True,
-    )
+    for dark_mode in dark_modes:
+        create_plot(
+            "../data/csv/manually_extracted/BVAEB_Betraege_updated.csv",
+            dark_mode=dark_mode,
+            is_updated=True,
+        )
 
 
 if __name__ == "__main__":
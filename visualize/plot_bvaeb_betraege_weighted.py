@@ -4,6 +4,8 @@ import numpy as np
 import os
 import colorsys
 import glob
+from functools import lru_cache
+from output_profiles import save_figure
 
 # Global settings
 OUTPUT_DIR = "../figures/BVAEB/Betraege"  # Output directory for the plot
@@ -85,16 +87,19 @@ VPI_DATA = {
     "2025": 136.8,
 }
 
-# Read insured population data from Excel files
-INSURED_POPULATION = read_insured_population_from_excel()
+@lru_cache(maxsize=None)
+def get_insured_population():
+    """Read the insured population data from the Excel files on first use."""
+    insured_population = read_insured_population_from_excel()
 
-# Add 2024Q1-Q3 data as a lambda function
-INSURED_POPULATION["2024Q1-Q3"] = lambda: {k: int(v) for k, v in INSURED_POPULATION["2024"].items()}
+    # Add 2024Q1-Q3 data as a lambda function
+    insured_population["2024Q1-Q3"] = lambda: {k: int(v) for k, v in insured_population["2024"].items()}
+    return insured_population
 
 def get_population_for_year(year):
     """Get the population data for a specific year"""
     year_str = str(year)
-    data = INSURED_POPULATION[year_str]
+    data = get_insured_population()[year_str]
     return data() if callable(data) else data
 
 def adjust_for_inflation(value, year, base_year=2024):
@@ -344,37 +349,18 @@ def create_plot(input_file, dark_mode=True, is_updated=False, plot_type="betraeg
     else:
         save_kwargs.update({"facecolor": "white", "edgecolor": "none"})
 
-    plt.savefig(filename, **save_kwargs)
+    save_figure(filename, **save_kwargs)
     plt.close()
 
-def main():
-    # Original data
-    create_plot(
-        "../data/csv/manually_extracted/BVAEB_Betraege_updated.csv",
-        dark_mode=True,
-        is_updated=False,
-        plot_type="betraege",
-    )
-    create_plot(
-        "../data/csv/manually_extracted/BVAEB_Betraege_updated.csv",
-        dark_mode=False,
-        is_updated=False,
-        plot_type="betraege",
-    )
-
-    # Personal loss plots
-    create_plot(
-        "../data/csv/manually_extracted/BVAEB_Betraege_updated.csv",
-        dark_mode=True,
-        is_updated=False,
-        plot_type="personal_loss",
-    )
-    create_plot(
-        "../data/csv/manually_extracted/BVAEB_Betraege_updated.csv",
-        dark_mode=False,
-        is_updated=False,
-        plot_type="personal_loss",
-    )
+def main(dark_modes=(True, False)):
+    for plot_type in ["betraege", "personal_loss"]:
+        for dark_mode in dark_modes:
+            create_plot(
+                "../data/csv/manually_extracted/BVAEB_Betraege_updated.csv",
+                dark_mode=dark_mode,
+                is_updated=False,
+                plot_type=plot_type,
+            )
 
 if __name__ == "__main__":
     main() 
@@ -3,6 +3,7 @@ import matplotlib.pyplot as plt
 import numpy as np
 import os
 import matplotlib.patches as patches
+from output_profiles import save_figure
 
 # Output directory for the visualization
 OUTPUT_DIR = "../figures/Insurance_Comparison"
@@ -347,32 +348,23 @@ def create_plot(bvaeb_file, oegk_file, svs_file, dark_mode=True):
         )
         fig.lines.append(line)
 
-    plt.savefig(filename, **save_kwargs)
+    save_figure(filename, **save_kwargs)
     plt.close()
 
 
-def main():
+def main(dark_modes=(True, False)):
     """Generate plots in both dark and light mode comparing insurance providers."""
     # Create output directory if it doesn't exist
     os.makedirs(OUTPUT_DIR, exist_ok=True)
     
-    # Generate dark mode plot
-    create_plot(
-        "../data/csv/manually_extracted/BVAEB_Betraege_updated.csv",
-        "../data/csv/manually_extracted/OEGK_Betraege_updated2025.csv",
-        "../data/csv/manually_extracted/SVS_Betraege_updated.csv",
-        dark_mode=True,
-    )
-    
-    # Generate light mode plot
-    create_plot(
-        "../data/csv/manually_extracted/BVAEB_Betraege_updated.csv",
-        "../data/csv/manually_extracted/OEGK_Betraege_updated2025.csv",
-        "../data/csv/manually_extracted/SVS_Betraege_updated.csv",
-        dark_mode=False,
-    )
+    for dark_mode in dark_modes:
+        create_plot(
+            "../data/csv/manually_extracted/BVAEB_Betraege_updated.csv",
+            "../data/csv/manually_extracted/OEGK_Betraege_updated2025.csv",
+            "../data/csv/manually_extracted/SVS_Betraege_updated.csv",
+            dark_mode=dark_mode,
+        )
 
 
 if __name__ == "__main__":
     main() 
-
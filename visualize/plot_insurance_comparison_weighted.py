@@ -4,6 +4,8 @@ import numpy as np
 import os
 import colorsys
 import glob
+from functools import lru_cache
+from output_profiles import save_figure
 
 # Global settings
 OUTPUT_DIR = "../figures/Insurance_Comparison"  # Output directory for the plot
@@ -68,17 +70,20 @@ VPI_DATA = {
     "2024": 134.0,
 }
 
-# Read insured population data from Excel files
-INSURED_POPULATION = read_insured_population_from_excel()
+@lru_cache(maxsize=None)
+def get_insured_population():
+    """Read the insured population data from the Excel files on first use."""
+    insured_population = read_insured_population_from_excel()
 
-# Add 2024Q1-Q3 data using 2024 data directly
-for insurance in ["BVAEB", "ÖGK", "SVS"]:
-    INSURED_POPULATION[insurance]["2024Q1-Q3"] = INSURED_POPULATION[insurance]["2024"]
+    # Add 2024Q1-Q3 data using 2024 data directly
+    for insurance in ["BVAEB", "ÖGK", "SVS"]:
+        insured_population[insurance]["2024Q1-Q3"] = insured_population[insurance]["2024"]
+    return insured_population
 
 def get_population_for_year(year, insurance):
     """Get the population data for a specific year and insurance provider"""
     year_str = str(year)
-    data = INSURED_POPULATION[insurance][year_str]
+    data = get_insured_population()[insurance][year_str]
     return data() if callable(data) else data
 
 def adjust_for_inflation(value, year, base_year=2024):
@@ -342,45 +347,20 @@ def create_plot(bvaeb_file, oegk_file, svs_file, dark_mode=True, is_updated=Fals
     else:
         save_kwargs.update({"facecolor": "white", "edgecolor": "none"})
 
-    plt.savefig(filename, **save_kwargs)
+    save_figure(filename, **save_kwargs)
     plt.close()
 
-def main():
-    # Original data
-    create_plot(
-        "../data/csv/manually_extracted/BVAEB_Betraege_updated.csv",
-        "../data/csv/manually_extracted/OEGK_Betraege_updated2025.csv",
-        "../data/csv/manually_extracted/SVS_Betraege_updated.csv",
-        dark_mode=True,
-        is_updated=False,
-        plot_type="betraege",
-    )
-    create_plot(
-        "../data/csv/manually_extracted/BVAEB_Betraege_updated.csv",
-        "../data/csv/manually_extracted/OEGK_Betraege_updated2025.csv",
-        "../data/csv/manually_extracted/SVS_Betraege_updated.csv",
-        dark_mode=False,
-        is_updated=False,
-        plot_type="betraege",
-    )
-
-    # Personal loss plots
-    create_plot(
-        "../data/csv/manually_extracted/BVAEB_Betraege_updated.csv",
-        "../data/csv/manually_extracted/OEGK_Betraege_updated2025.csv",
-        "../data/csv/manually_extracted/SVS_Betraege_updated.csv",
-        dark_mode=True,
-        is_updated=False,
-        plot_type="personal_loss",
-    )
-    create_plot(
-        "../data/csv/manually_extracted/BVAEB_Betraege_updated.csv",
-        "../data/csv/manually_extracted/OEGK_Betraege_updated2025.csv",
-        "../data/csv/manually_extracted/SVS_Betraege_updated.csv",
-        dark_mode=False,
-        is_updated=False,
-        plot_type="personal_loss",
-    )
+def main(dark_modes=(True, False)):
+    for plot_type in ["betraege", "personal_loss"]:
+        for dark_mode in dark_modes:
+            create_plot(
+                "../data/csv/manually_extracted/BVAEB_Betraege_updated.csv",
+                "../data/csv/manually_extracted/OEGK_Betraege_updated2025.csv",
+                "../data/csv/manually_extracted/SVS_Betraege_updated.csv",
+                dark_mode=dark_mode,
+                is_updated=False,
+                plot_type=plot_type,
+            )
 
 if __name__ == "__main__":
     main() 
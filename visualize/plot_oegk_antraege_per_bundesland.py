@@ -3,7 +3,18 @@ import matplotlib.pyplot as plt
 import numpy as np
 from matplotlib.patches import Rectangle
 import os
-import math
+
+from antraege_matrix import (
+    balanced_fg_groups,
+    build_antraege_matrices,
+    compute_deviations,
+    rank_fg_groups,
+    stack_offsets,
+)
+from fachrichtung_categories import map_fg_categories
+from output_profiles import save_figure
+
+from data.german_dates import format_german_month
 
 # Global settings
 BASE_OUTPUT_DIR = "../figures/OEGK/Antraege/perBundesland"  # Base output directory for the plots
@@ -11,21 +22,7 @@ NUM_GROUPS = 4
 
 def translate_to_german_date(date):
     """Translate a date to German format."""
-    month_str = date.strftime("%b %Y")
-    return (
-        month_str.replace("Jan", "Jän")
-        .replace("Feb", "Feb")
-        .replace("Mar", "Mär")
-        .replace("Apr", "Apr")
-        .replace("May", "Mai")
-        .replace("Jun", "Jun")
-        .replace("Jul", "Jul")
-        .replace("Aug", "Aug")
-        .replace("Sep", "Sep")
-        .replace("Oct", "Okt")
-        .replace("Nov", "Nov")
-        .replace("Dec", "Dez")
-    )
+    return format_german_month(date)
 
 def setup_plot_style(dark_mode=True):
     """Setup the plot style based on dark/light mode."""
@@ -73,7 +70,7 @@ def save_plot(fig, output_filename, dark_mode, bg_color):
             "edgecolor": "none"
         })
     
-    plt.savefig(output_filename, **save_kwargs)
+    save_figure(output_filename, **save_kwargs)
     plt.close()
 
 def setup_legend(ax, dark_mode, bg_color, text_color):
@@ -255,26 +252,9 @@ def create_ranked_grouped_plot(df, bundesland, dark_mode=True):
     # Prepare the DataFrame
     df, fg_mapping = prepare_dataframe(df, bundesland)
     
-    # Calculate yearly average applications per Fachrichtung
-    yearly_avg = df.groupby("Fachrichtung")["Gesamt"].mean()
-    yearly_avg = yearly_avg.sort_values(ascending=False)  # Sort by yearly average in descending order
-    
-    # Calculate cumulative percentage based on yearly averages
-    total_sum = yearly_avg.sum()
-    cumsum_percentage = yearly_avg.cumsum() / total_sum * 100
-    
-    # Group cutoff percentages
-    TOP_GROUP_CUTOFF = 89  # Top group includes Fachrichtungen responsible for up to 89% of total applications
-    BOTTOM_GROUP_CUTOFF = 99  # Bottom group includes Fachrichtungen responsible for the last 1% of total applications
-
-    # Group Fachrichtungen based on cumulative percentage
-    group1_mask = cumsum_percentage <= TOP_GROUP_CUTOFF
-    group2_mask = (cumsum_percentage > TOP_GROUP_CUTOFF) & (cumsum_percentage <= BOTTOM_GROUP_CUTOFF)
-    group3_mask = cumsum_percentage > BOTTOM_GROUP_CUTOFF
-    
-    group1_fgs = yearly_avg[group1_mask].index
-    group2_fgs = yearly_avg[group2_mask].index
-    group3_fgs = yearly_avg[group3_mask].index
+    # Rank FG-Codes by yearly average and split them into groups by cumulative share
+    matrices = build_antraege_matrices(df)
+    (group1, group2, group3), _ = rank_fg_groups(matrices)
     
     # Create figure with subplots
     fig, (ax1, ax2, ax3) = plt.subplots(3, 1, figsize=(20, 30))
@@ -298,11 +278,11 @@ def create_ranked_grouped_plot(df, bundesland, dark_mode=True):
     color_idx = 0
     
     # Create plots for each group
-    color_idx = create_group_subplot(df, group1_fgs, ax1, f"Gruppe 1: Fachrichtungen mit höchstem Volumen (89% aller Anträge)",
+    color_idx = create_group_subplot(group1, fg_mapping, ax1, f"Gruppe 1: Fachrichtungen mit höchstem Volumen (89% aller Anträge)",
                                    text_color, grid_alpha, dark_mode, bg_color, color_idx)
-    color_idx = create_group_subplot(df, group2_fgs, ax2, f"Gruppe 2: Fachrichtungen mit niedrigerem Volumen (die nächsten 10% aller Anträge)",
+    color_idx = create_group_subplot(group2, fg_mapping, ax2, f"Gruppe 2: Fachrichtungen mit niedrigerem Volumen (die nächsten 10% aller Anträge)",
                                    text_color, grid_alpha, dark_mode, bg_color, color_idx)
-    color_idx = create_group_subplot(df, group3_fgs, ax3, f"Gruppe 3: Fachrichtungen mit kleinstem Volumen (die letzten 1% aller Anträge)",
+    color_idx = create_group_subplot(group3, fg_mapping, ax3, f"Gruppe 3: Fachrichtungen mit kleinstem Volumen (die letzten 1% aller Anträge)",
                                    text_color, grid_alpha, dark_mode, bg_color, color_idx)
     
     # Adjust layout but keep space for title
@@ -312,102 +292,61 @@ def create_ranked_grouped_plot(df, bundesland, dark_mode=True):
     output_filename = os.path.join(output_dir, "oegk_antraege_ranked_groups_dark.png" if dark_mode else "oegk_antraege_ranked_groups.png")
     save_plot(fig, output_filename, dark_mode, bg_color)
 
-def create_group_subplot(df, fachrichtungen, ax, title, text_color, grid_alpha, dark_mode, bg_color, start_color_idx=0):
-    """Create a subplot for a specific group of Fachrichtungen."""
-    # Filter data for the group
-    group_data = df[df["Fachrichtung"].isin(fachrichtungen)]
-    
+def create_group_subplot(group, fg_mapping, ax, title, text_color, grid_alpha, dark_mode, bg_color, start_color_idx=0):
+    """Create a subplot for a specific group of Fachrichtungen from its date × FG-Code matrices."""
     # Check if group is empty
-    if len(group_data) == 0:
+    if len(group["fg_codes"]) == 0:
         ax.text(0.5, 0.5, "Keine Daten verfügbar", 
                 ha='center', va='center', transform=ax.transAxes, 
                 color=text_color, fontsize=12)
         ax.set_title(title, fontsize=14, pad=30, color=text_color)
         return start_color_idx
     
-    # Get mapping from the original DataFrame
-    _, fg_mapping = prepare_dataframe(df, df["Bundesland_pretty"].iloc[0])
-    
-    # Get unique dates and sort data
-    dates = sorted(group_data["Date"].unique())
+    dates = group["dates"]
     
-    # Calculate yearly average for each FG-Code in this group and sort by it
-    yearly_avg = group_data.groupby("FG-Code", group_keys=False)["Gesamt"].mean().sort_values(ascending=False)
-    fg_codes = yearly_avg.index.dropna().unique()
-    
-    # Check if we have any valid FG codes
-    if len(fg_codes) == 0:
-        ax.text(0.5, 0.5, "Keine gültigen Fachrichtungen", 
-                ha='center', va='center', transform=ax.transAxes, 
-                color=text_color, fontsize=12)
-        ax.set_title(title, fontsize=14, pad=30, color=text_color)
-        return start_color_idx
+    # Sort the FG-Codes of this group by their yearly average
+    order = np.argsort(-group["yearly_avg"], kind="stable")
+    fg_codes = group["fg_codes"][order]
+    postal_matrix = group["postal"][:, order]
+    online_matrix = group["online"][:, order]
+    total_matrix = postal_matrix + online_matrix
     
     # Setup colors with continuation from previous groups
     base_colors = create_base_colors(len(fg_codes))
     postal_colors, online_colors, next_color_idx = get_colors_for_group(base_colors, fg_codes, start_color_idx)
     
-    # Plot stacked bars
+    # Stacking offsets and postal/online split for all bars at once
     bar_width = 0.8
-    bottom = np.zeros(len(dates))
+    x = np.arange(len(dates))
+    bottoms = np.cumsum(total_matrix, axis=1) - total_matrix
+    postal_ratios = np.divide(postal_matrix, total_matrix, out=np.zeros_like(total_matrix), where=total_matrix > 0)
     
     # Calculate total height with safety check
-    total_height = group_data.groupby("Date")["Gesamt"].sum().max()
+    total_height = group["Gesamt"].sum(axis=1).max()
     if pd.isna(total_height) or total_height == 0:
         total_height = 1  # Set a default height if no data
     
     for i, fg in enumerate(fg_codes):
-        # Get data for this FG code and ensure we have values for all dates
-        fg_data = group_data[group_data["FG-Code"] == fg].set_index("Date")
+        visible = total_matrix[:, i] > 0
+        if not visible.any():
+            continue
         
-        # Reindex to ensure we have all dates (fill missing with 0)
-        fg_data = fg_data.reindex(dates, fill_value=0)
+        x_left = x[visible] - bar_width / 2
+        postal_widths = bar_width * postal_ratios[visible, i]
+        totals = total_matrix[visible, i]
+        bottom = bottoms[visible, i]
         
-        postal_values = fg_data["postal"].fillna(0).values
-        online_values = fg_data["online"].fillna(0).values
-        total_values = postal_values + online_values
+        # Postal bars
+        ax.bar(x_left, totals, width=postal_widths, bottom=bottom, align="edge",
+               facecolor=postal_colors[i], alpha=0.8, label=f"{fg} - {fg_mapping[fg]} (Postal)")
         
-        for j, date in enumerate(dates):
-            total = total_values[j]
-            if total > 0:
-                postal_ratio = postal_values[j] / total
-                online_ratio = online_values[j] / total
-                
-                # Postal rectangle
-                postal_rect = Rectangle(
-                    (j - bar_width / 2, bottom[j]),
-                    bar_width * postal_ratio,
-                    total,
-                    facecolor=postal_colors[i],
-                    alpha=0.8,
-                    label=f"{fg} - {fg_mapping[fg]} (Postal)" if j == 0 else "",
-                )
-                ax.add_patch(postal_rect)
-                
-                # Online rectangle
-                online_rect = Rectangle(
-                    (j - bar_width / 2 + bar_width * postal_ratio, bottom[j]),
-                    bar_width * online_ratio,
-                    total,
-                    facecolor=online_colors[i],
-                    alpha=0.8,
-                    label=f"{fg} - {fg_mapping[fg]} (Online)" if j == 0 else "",
-                )
-                ax.add_patch(online_rect)
-                
-                # Add FG code text
-                ax.text(
-                    j,
-                    bottom[j] + total / 2,
-                    str(int(fg)),
-                    ha="center",
-                    va="center",
-                    fontsize=8,
-                    color=text_color
-                )
+        # Online bars
+        ax.bar(x_left + postal_widths, totals, width=bar_width - postal_widths, bottom=bottom, align="edge",
+               facecolor=online_colors[i], alpha=0.8, label=f"{fg} - {fg_mapping[fg]} (Online)")
         
-        # Update bottom with the full array
-        bottom += total_values
+        # Add FG code text
+        for j, y in zip(x[visible], bottom + totals / 2):
+            ax.text(j, y, str(int(fg)), ha="center", va="center", fontsize=8, color=text_color)
     
     # Customize subplot
     ax.set_title(title, fontsize=14, pad=30, color=text_color)
@@ -449,18 +388,10 @@ def create_deviation_plot(df, bundesland, dark_mode=True):
     # Prepare the DataFrame
     df, fg_mapping = prepare_dataframe(df, bundesland)
 
-    # Add days per month column
-    df['days_in_month'] = df['Date'].dt.days_in_month
-
-    # Calculate weighted yearly average for each Fachrichtung
-    yearly_avg = df.groupby("Fachrichtung", group_keys=False).apply(
-        lambda x: np.average(x["Gesamt"], weights=x["days_in_month"])
-    ).rename("yearly_avg")
-
-    # Calculate deviations from yearly average
-    df = df.merge(yearly_avg, on="Fachrichtung")
-    df["Deviation"] = df["Gesamt"] - df["yearly_avg"]
-    df["Deviation_Percentage"] = df["Deviation"] / df["yearly_avg"]
+    # Build the date × FG-Code matrices once and compute deviations from the yearly average
+    matrices = build_antraege_matrices(df)
+    deviations, deviation_percentages = compute_deviations(matrices)
+    bottoms, positive_top, negative_bottom = stack_offsets(deviations)
 
     # Create figure
     fig, ax = plt.subplots(figsize=(14, 11))
@@ -470,84 +401,50 @@ def create_deviation_plot(df, bundesland, dark_mode=True):
     fig.patch.set_facecolor(bg_color)
     ax.set_facecolor(bg_color)
 
-    # Get unique dates and Fachrichtungen
-    dates = df["Date"].unique()
-    fachrichtungen = df["Fachrichtung"].dropna().unique()
+    # Get dates and FG-Codes
+    dates = matrices["dates"]
+    fg_codes = matrices["fg_codes"]
+    x = np.arange(len(dates))
 
     # Setup colors
-    base_colors = create_base_colors(len(fachrichtungen))
-    colors = [pair[0] for pair in base_colors[: len(fachrichtungen)]]
+    base_colors = create_base_colors(len(fg_codes))
+    colors = [pair[0] for pair in base_colors[: len(fg_codes)]]
 
     # Plot deviations
     bar_width = 0.8
 
-    # Initialize arrays to track maximum positive and negative deviations
-    max_positive_deviation = 0
-    max_negative_deviation = 0
-    # Plot bars
-    # Initialize positive and negative bottoms for stacking
-    positive_bottom = np.zeros(len(dates))
-    negative_bottom = np.zeros(len(dates))
-
-    for i, fachrichtung in enumerate(fachrichtungen):
-        fachrichtung_data = df[df["Fachrichtung"] == fachrichtung].sort_values("Date")
-        fg_code = fachrichtung_data["FG-Code"].dropna().unique()
-        assert len(fg_code) == 1, f"Expected exactly one FG-Code for {fachrichtung}, got {len(fg_code)}"
-        fg_code = fg_code[0]
-
-        deviations = fachrichtung_data["Deviation"].fillna(0).values
-        deviation_percentage = fachrichtung_data["Deviation_Percentage"].fillna(0).values
-
-        for j, date in enumerate(dates):
-            if j >= len(deviations):
-                continue
-            
-            deviation = deviations[j]
-            if deviation != 0:  # Only plot non-zero deviations
-                color = colors[i]
-                alpha = 0.8
-
-                # Plot bar
-                if deviation > 0:
-                    # Positive deviation (above zero)
-                    rect = Rectangle(
-                        (j - bar_width / 2, positive_bottom[j]),
-                        bar_width,
-                        deviation,
-                        facecolor=color,
-                        alpha=alpha,
-                        label=f"{int(fg_code)}: {fachrichtung}" if j == 0 else "",
-                    )
-                    # Update positive bottom for next bar
-                    positive_bottom[j] += deviation
-                    max_positive_deviation = max(max_positive_deviation, positive_bottom[j])
-                else:
-                    # Negative deviation (below zero)
-                    rect = Rectangle(
-                        (j - bar_width / 2, negative_bottom[j] + deviation),
-                        bar_width,
-                        abs(deviation),
-                        facecolor=color,
-                        alpha=alpha,
-                        label=f"{int(fg_code)}: {fachrichtung}" if j == 0 else "",
-                    )
-                    # Update negative bottom for next bar
-                    negative_bottom[j] += deviation
-                    max_negative_deviation = min(max_negative_deviation, negative_bottom[j])
-                ax.add_patch(rect)
-
-                # Add value label for significant deviations (>15%)
-                if j < len(deviation_percentage) and ((abs(deviation_percentage[j]) > 0.15 and abs(deviation) > 600) or abs(deviation) > 2200):
-                    label_position = positive_bottom[j] - deviation/2 if deviation > 0 else negative_bottom[j] - deviation/2
-                    ax.text(
-                        j,
-                        label_position,
-                        f"{int(fg_code)}: {int(deviation):+d}",
-                        ha="center",
-                        va="center",
-                        fontsize=8,
-                        color=text_color
-                    )
+    # Maximum stacked positive and negative deviations
+    max_positive_deviation = max(positive_top.max(), 0)
+    max_negative_deviation = min(negative_bottom.min(), 0)
+
+    # Label significant deviations (>15%)
+    significant = ((np.abs(deviation_percentages) > 0.15) & (np.abs(deviations) > 600)) | (np.abs(deviations) > 2200)
+
+    for i, fg_code in enumerate(fg_codes):
+        visible = deviations[:, i] != 0  # Only plot non-zero deviations
+        if not visible.any():
+            continue
+
+        ax.bar(
+            x[visible],
+            deviations[visible, i],
+            width=bar_width,
+            bottom=bottoms[visible, i],
+            facecolor=colors[i],
+            alpha=0.8,
+            label=f"{int(fg_code)}: {fg_mapping[fg_code]}",
+        )
+
+        for j in np.flatnonzero(visible & significant[:, i]):
+            ax.text(
+                j,
+                bottoms[j, i] + deviations[j, i] / 2,
+                f"{int(fg_code)}: {int(deviations[j, i]):+d}",
+                ha="center",
+                va="center",
+                fontsize=8,
+                color=text_color
+            )
 
     plt.title(
         f"ÖGK Wahlarztkostenrückerstattung Anträge Abweichungen vom Jahresmittel nach Fachrichtung 2023 - {bundesland}",
@@ -585,42 +482,26 @@ def create_balanced_grouped_plot(df, bundesland, dark_mode=True):
     # Prepare the DataFrame
     df, fg_mapping = prepare_dataframe(df, bundesland)
     
-    # Calculate yearly average applications per Fachrichtung
-    yearly_avg = df.groupby("Fachrichtung")["Gesamt"].mean()
-    yearly_avg = yearly_avg.sort_values(ascending=False)  # Sort by yearly average in descending order
-    
-    # Get the total number of Fachrichtungen
-    total_fgs = len(yearly_avg)
+    # Split FG-Codes ranked by yearly average into groups of equal size
+    matrices = build_antraege_matrices(df)
+    balanced_groups = balanced_fg_groups(matrices, NUM_GROUPS)
     
-    # Calculate the number of Fachrichtungen per group (rounded up to ensure all are included)
-    fgs_per_group = math.floor(total_fgs / NUM_GROUPS)
-    
-    # Create groups with equal number of Fachrichtungen
+    # Create group names and descriptions in German
     groups = []
     group_names = []
     group_descriptions = []
+    volume_labels = [
+        ("Höchstes Volumen", "höchstem Volumen"),
+        ("Hohes Volumen", "hohem Volumen"),
+        ("Mittleres Volumen", "mittlerem Volumen"),
+        ("Niedriges Volumen", "niedrigem Volumen"),
+    ]
     
-    for i in range(NUM_GROUPS):
-        start_idx = i * fgs_per_group
-        end_idx = min(start_idx + fgs_per_group, total_fgs)
-        
-        # Get the Fachrichtungen for this group
-        group_fgs = yearly_avg.index[start_idx:end_idx]
-        groups.append(group_fgs)
-        
-        # Create group name and description in German
-        if i == 0:
-            group_names.append(f"Gruppe {i+1}: Höchstes Volumen")
-            group_descriptions.append(f"Fachrichtungen mit höchstem Volumen (Rang {start_idx+1}-{end_idx})")
-        elif i == 1:
-            group_names.append(f"Gruppe {i+1}: Hohes Volumen")
-            group_descriptions.append(f"Fachrichtungen mit hohem Volumen (Rang {start_idx+1}-{end_idx})")
-        elif i == 2:
-            group_names.append(f"Gruppe {i+1}: Mittleres Volumen")
-            group_descriptions.append(f"Fachrichtungen mit mittlerem Volumen (Rang {start_idx+1}-{end_idx})")
-        else:  # i == 3
-            group_names.append(f"Gruppe {i+1}: Niedriges Volumen")
-            group_descriptions.append(f"Fachrichtungen mit niedrigem Volumen (Rang {start_idx+1}-{end_idx})")
+    for i, (group, start_idx, end_idx) in enumerate(balanced_groups):
+        name, description = volume_labels[min(i, len(volume_labels) - 1)]
+        groups.append(group)
+        group_names.append(f"Gruppe {i+1}: {name}")
+        group_descriptions.append(f"Fachrichtungen mit {description} (Rang {start_idx+1}-{end_idx})")
     
     # Create figure with four subplots with increased spacing
     fig, axes = plt.subplots(NUM_GROUPS, 1, figsize=(20, 40))
@@ -646,9 +527,9 @@ def create_balanced_grouped_plot(df, bundesland, dark_mode=True):
     color_idx = 0
     
     # Create plots for each group
-    for i, (group_fgs, ax) in enumerate(zip(groups, axes)):
+    for i, (group, ax) in enumerate(zip(groups, axes)):
         ax.set_facecolor(bg_color)
-        color_idx = create_group_subplot(df, group_fgs, ax, group_descriptions[i], 
+        color_idx = create_group_subplot(group, fg_mapping, ax, group_descriptions[i], 
                                        text_color, grid_alpha, dark_mode, bg_color, color_idx)
     
     # Adjust layout but keep space for title
@@ -658,54 +539,6 @@ def create_balanced_grouped_plot(df, bundesland, dark_mode=True):
     output_filename = os.path.join(output_dir, "oegk_antraege_balanced_groups_dark.png" if dark_mode else "oegk_antraege_balanced_groups.png")
     save_plot(fig, output_filename, dark_mode, bg_color)
 
-def get_fachrichtung_category(fachrichtung):
-    """Map Fachrichtung to its category."""
-    categories = {
-        # Primärversorgung
-        "Arzt für Allgemeinmedizin": "Primärversorgung",
-        "FA für Innere Medizin": "Primärversorgung",
-        "FA für Kinder- und Jugendheilkunde": "Primärversorgung",
-        
-        # Chirurgische Fächer
-        "FA für Chirurgie": "Chirurgische Fächer",
-        "FA für Unfallchirurgie": "Chirurgische Fächer",
-        "FA für Orthopädie und orthopädische Chirurgie": "Chirurgische Fächer",
-        "FA für Plastische Chirurgie": "Chirurgische Fächer",
-        "FA für Kinderchirurgie": "Chirurgische Fächer",
-        "FA für Mund., Kiefer- und Gesichtschirurgie": "Chirurgische Fächer",
-        
-        # Frauenheilkunde
-        "FA für Frauenheilkunde und Geburtshilfe": "Frauenheilkunde",
-        
-        # Psychiatrie & Neurologie
-        "FA für Psychiatrie": "Psychiatrie & Neurologie",
-        "FA für Neurologie": "Psychiatrie & Neurologie",
-        "FA für Kinder- und Jugendpsychiatrie": "Psychiatrie & Neurologie",
-        "FA für Neurologie und Psychiatrie/ Psychiatrie und Neurologie": "Psychiatrie & Neurologie",
-        
-        # Anästhesie & Intensivmedizin
-        "FA für Anästhesiologie und Intensivmedizin": "Anästhesie & Intensivmedizin",
-        "FA für Neurochirurgie": "Anästhesie & Intensivmedizin",
-        
-        # Fachärzte für spezifische Organe
-        "FA für Augenheilkunde und Optometrie": "Fachärzte für spezifische Organe",
-        "FA für Hals-, Nasen- und Ohrenerkrankungen": "Fachärzte für spezifische Organe",
-        "FA für Urologie": "Fachärzte für spezifische Organe",
-        "FA für Haut- und Geschlechtskrankheiten": "Fachärzte für spezifische Organe",
-        "FA für Lungenkrankheiten": "Fachärzte für spezifische Organe",
-        
-        # Diagnostische Fächer
-        "FA für Radiologie": "Diagnostische Fächer",
-        "FA für Nuklearmedizin": "Diagnostische Fächer",
-        "FA für Strahlentherapie - Radioonkologie": "Diagnostische Fächer",
-        "FA für medizinische und chemische Labordiagnostik": "Diagnostische Fächer",
-        "FA für Pathologie und Histologie": "Diagnostische Fächer",
-        "FA für Hygiene und Mikrobiologie bzw. Labordiagnostik": "Diagnostische Fächer",
-        "FA für medizinische Biologie": "Diagnostische Fächer",
-        "FA für Immunologie": "Diagnostische Fächer"
-    }
-    return categories.get(fachrichtung, "Sonstige")
-
 def get_category_icon(category):
     """Get a Unicode icon for a medical category."""
     icons = {
@@ -729,7 +562,7 @@ def create_categorized_plot(df, bundesland, dark_mode=True, show_icons=True):
     df, fg_mapping = prepare_dataframe(df, bundesland)
     
     # Add category column
-    df["Category"] = df["Fachrichtung"].apply(get_fachrichtung_category)
+    df["Category"] = map_fg_categories(df["FG-Code"])
     
     # Group by category and date
     grouped_data = df.groupby(["Date", "Category"]).agg({
@@ -843,38 +676,36 @@ def create_categorized_plot(df, bundesland, dark_mode=True, show_icons=True):
     output_filename = os.path.join(output_dir, "oegk_antraege_categories_dark.png" if dark_mode else "oegk_antraege_categories.png")
     save_plot(fig, output_filename, dark_mode, bg_color)
 
-def main():
+def main(dark_modes=(True, False), bundeslaender=None):
+    """Create the plots for the given Bundesländer (default: all in the data)."""
     # Read the CSV file
     df = pd.read_csv(
         "../data/csv/04_OEGK_Antraege_pro_Monat_2023_pro_Fachrichtung_online_postal_pro_Bundesland.csv"
     )
     
     # Get unique Bundesländer
-    bundeslaender = df["Bundesland_pretty"].unique()
+    if bundeslaender is None:
+        bundeslaender = df["Bundesland_pretty"].unique()
     
     # Create plots for each Bundesland
     for bundesland in bundeslaender:
         print(f"Creating plots for {bundesland}...")
         
-        # Create stacked plots
-        create_stacked_plot(df, bundesland, dark_mode=True)
-        create_stacked_plot(df, bundesland, dark_mode=False)
-        
-        # Create ranked grouped plots
-        create_ranked_grouped_plot(df, bundesland, dark_mode=True)
-        create_ranked_grouped_plot(df, bundesland, dark_mode=False)
-        
-        # Create deviation plots
-        create_deviation_plot(df, bundesland, dark_mode=True)
-        create_deviation_plot(df, bundesland, dark_mode=False)
-        
-        # Create balanced grouped plots
-        create_balanced_grouped_plot(df, bundesland, dark_mode=True)
-        create_balanced_grouped_plot(df, bundesland, dark_mode=False)
-        
-        # Create categorized plots
-        create_categorized_plot(df, bundesland, dark_mode=True, show_icons=True)
-        create_categorized_plot(df, bundesland, dark_mode=False, show_icons=True)
+        for dark_mode in dark_modes:
+            # Create stacked plots
+            create_stacked_plot(df, bundesland, dark_mode=dark_mode)
+            
+            # Create ranked grouped plots
+            create_ranked_grouped_plot(df, bundesland, dark_mode=dark_mode)
+            
+            # Create deviation plots
+            create_deviation_plot(df, bundesland, dark_mode=dark_mode)
+            
+            # Create balanced grouped plots
+            create_balanced_grouped_plot(df, bundesland, dark_mode=dark_mode)
+            
+            # Create categorized plots
+            create_categorized_plot(df, bundesland, dark_mode=dark_mode, show_icons=True)
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
@@ -2,28 +2,23 @@ import pandas as pd
 import matplotlib.pyplot as plt
 import numpy as np
 import os
+import sys
 from datetime import datetime
+from output_profiles import save_figure
+
+from data.german_dates import format_german_month, parse_month_year_column
+from data.reconciliation import assert_reconciled, compare_totals
+
+# The Excel Beilagen of the 2025 Anfrage are read with the block reader in raw_data/
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "raw_data"))
+from extract_excel_blocks import process_bearbeitungszeit_blocks
 
 # Global settings
 BASE_OUTPUT_DIR = "../figures/OEGK/Bearbeitungszeit"  # Base output directory for the plots
 
 def translate_to_german_date(date):
     """Translate a date to German format."""
-    month_str = date.strftime("%b %Y")
-    return (
-        month_str.replace("Jan", "Jän")
-        .replace("Feb", "Feb")
-        .replace("Mar", "Mär")
-        .replace("Apr", "Apr")
-        .replace("May", "Mai")
-        .replace("Jun", "Jun")
-        .replace("Jul", "Jul")
-        .replace("Aug", "Aug")
-        .replace("Sep", "Sep")
-        .replace("Oct", "Okt")
-        .replace("Nov", "Nov")
-        .replace("Dec", "Dez")
-    )
+    return format_german_month(date)
 
 def prettify_bundesland(bundesland):
     """Prettify the Bundesland name."""
@@ -32,6 +27,7 @@ def prettify_bundesland(bundesland):
         "K": "Kärnten",
         "N": "Niederösterreich",
         "NÖ": "Niederösterreich",
+        "O": "Oberösterreich",
         "OÖ": "Oberösterreich",
         "S": "Salzburg",
         "ST": "Steiermark",
@@ -41,6 +37,15 @@ def prettify_bundesland(bundesland):
     }
     return LST_to_bundesland[bundesland]
 
+def read_bearbeitungszeit_excel(file_path, sheet_name=0):
+    """Read an Excel Beilage with processing times in the columns of the 07 CSV (Date, Bundesland_pretty, ...)."""
+    df = process_bearbeitungszeit_blocks(file_path, sheet_name=sheet_name)
+    df["Date"] = parse_month_year_column(df["Monat.Jahr"]).dt.to_timestamp()
+    df["Bundesland_pretty"] = df["ÖGK-LS"].str.removeprefix("ÖGK-").map(prettify_bundesland)
+    for col in ["Postal", "OnlineMeine", "OnlineWAH"]:
+        df[col] = df[col].astype(float)
+    return df
+
 def setup_plot_style(dark_mode=True):
     """Setup the plot style based on dark/light mode."""
     plt.style.use('seaborn-v0_8')  # Use seaborn style as base
@@ -123,7 +128,7 @@ def save_plot(fig, output_filename, dark_mode, bg_color):
             "edgecolor": "none"
         })
     
-    plt.savefig(output_filename, **save_kwargs)
+    save_figure(output_filename, **save_kwargs)
     plt.close()
 
 def get_bundesland_output_dir(bundesland):
@@ -589,7 +594,12 @@ def create_grid_processing_time_plot(df_2023, df_historical, df_beilage6, dark_m
     plt.tight_layout(rect=[0, 0.02, 1, 0.98])  # Adjusted layout to leave space for legend and title
     save_plot(fig, output_filename, dark_mode, bg_color)
 
-def main():
+def main(dark_modes=(True, False), bundeslaender=None):
+    """Create the Bearbeitungszeit plots.
+
+    If ``bundeslaender`` is given, only the plots for those Bundesländer are
+    created (the national grid and combined plots are skipped).
+    """
     # Read the CSV files with absolute paths
     df_2023 = pd.read_csv(
         "../data/csv/07_OEGK_Durchschnittliche_Bearbeitungszeit_pro_Monat_2023_postal_online_online_pro_Bundesland.csv"
@@ -597,67 +607,9 @@ def main():
     df_historical = pd.read_csv(
         "../data/csv/07a_OEGK_Durchschnittliche_Bearbeitungszeit_pro_Monat_2021_bis_Mai_2023_postal_online_online_pro_Bundesland.csv"
     )
-    # Read Beilage_5 and Beilage_6 data
-    # Process Excel files by skipping first column and first 5 rows,
-    # then taking 14 rows (including header), then skipping 5 rows, etc.
-    def process_excel_file(file_path, sheet_name=0):
-        # Read all data first
-        df_raw = pd.read_excel(file_path, sheet_name=sheet_name, header=None)
-
-        # Drop the first column
-        df_raw = df_raw.iloc[:, 1:]
-
-        # Initialize empty list to store chunks
-        chunks = []
-
-        # Start from row 5 (skipping first 5 rows)
-        row_idx = 6
-
-        # Process in chunks: take 14 rows, skip 5 rows
-        while row_idx < len(df_raw):
-            # Check if we have enough rows left
-            end_idx = min(row_idx + 13, len(df_raw))
-
-            # Extract chunk with header in first row
-            chunk = df_raw.iloc[row_idx:end_idx].copy()
-
-            # Set the first row as header
-            header = chunk.iloc[0]
-            chunk = chunk.iloc[1:]
-            # Convert rows that end with "KT" to integers
-            for i in range(len(chunk)):
-                for col in chunk.columns:
-                    if isinstance(chunk.iloc[i, chunk.columns.get_loc(col)], str) and chunk.iloc[i, chunk.columns.get_loc(col)].endswith(" KT"):
-                        # Extract the numeric part and convert to int
-                        value_str = chunk.iloc[i, chunk.columns.get_loc(col)].rstrip(" KT").strip()
-                        try:
-                            chunk.iloc[i, chunk.columns.get_loc(col)] = int(value_str)
-                        except ValueError:
-                            # If conversion fails, keep the original value
-                            pass
-            chunk.columns = header
-
-            # Add to chunks list
-            chunks.append(chunk)
-
-            # Move to next chunk (skip 5 rows after the 14 we just processed)
-            row_idx = end_idx + 7
-
-        # Combine all chunks
-        if chunks:
-            df = pd.concat(chunks, ignore_index=True)
-            # Convert numeric columns to numeric type
-            numeric_columns = ["postalische KE", "online KE\nMeineÖGK", "online KE\nWAHonline"]
-            for col in numeric_columns:
-                if col in df.columns:
-                    df[col] = pd.to_numeric(df[col].replace("-", pd.NA), errors='coerce')
-            return df
-        else:
-            return pd.DataFrame()
-
-    # Process the Excel files
-    df_beilage5 = process_excel_file("../raw_data/2025_Anfrage/Beilage_5.xlsx")
-    df_beilage6 = process_excel_file("../raw_data/2025_Anfrage/Beilage_6.xlsx", sheet_name="F3_2024")
+    # Read Beilage_5 and Beilage_6 with the shared Excel block reader
+    df_beilage5 = read_bearbeitungszeit_excel("../raw_data/2025_Anfrage/Beilage_5.xlsx")
+    df_beilage6 = read_bearbeitungszeit_excel("../raw_data/2025_Anfrage/Beilage_6.xlsx", sheet_name="F3_2024")
 
     # Print column names to debug
     print("2023 columns:", df_2023.columns.tolist())
@@ -670,31 +622,9 @@ def main():
     df_2023["Date"] = pd.to_datetime(df_2023["Date"])
     df_historical["Date"] = pd.to_datetime(df_historical["Date"])
 
-    # Convert dates in processed files
-    df_beilage5["Date"] = pd.to_datetime(df_beilage5["Monat"])
-    df_beilage6["Date"] = pd.to_datetime(df_beilage6["Monat"])
-
-    df_beilage5 = df_beilage5.rename(
-        columns={
-            "postalische KE": "Postal",
-            "online KE\nMeineÖGK": "OnlineMeine",
-            "online KE\nWAHonline": "OnlineWAH",
-        }
-    )
-    df_beilage6 = df_beilage6.rename(
-        columns={
-            "postalische KE": "Postal",
-            "online KE\nMeineÖGK": "OnlineMeine",
-            "online KE\nWAHonline": "OnlineWAH"
-        }
-    )
-
-    df_beilage5["Bundesland_pretty"] = df_beilage5["ÖGK-LS"].apply(prettify_bundesland)
-    df_beilage6["Bundesland_pretty"] = df_beilage6["ÖGK-LS"].apply(prettify_bundesland)
-
     # Ensure numeric columns are numeric type
     numeric_columns = ["Postal", "OnlineMeine", "OnlineWAH"]
-    for df in [df_2023, df_historical, df_beilage5, df_beilage6]:
+    for df in [df_2023, df_historical]:
         for col in numeric_columns:
             if col in df.columns:
                 df[col] = pd.to_numeric(df[col].replace("-", pd.NA), errors='coerce')
@@ -707,46 +637,41 @@ def main():
     df_2023_overlap = df_2023[(df_2023["Date"] >= overlap_start) & (df_2023["Date"] <= overlap_end)]
     df_beilage5_overlap = df_beilage5[(df_beilage5["Date"] >= overlap_start) & (df_beilage5["Date"] <= overlap_end)]
 
-    # Compare values for overlapping dates
-    for date in df_2023_overlap["Date"].unique():
-        df_2023_date = df_2023_overlap[df_2023_overlap["Date"] == date]
-        df_beilage5_date = df_beilage5_overlap[df_beilage5_overlap["Date"] == date]
-
-        # Compare postal and online values
-        postal_2023 = df_2023_date["Postal"].sum()
-        online_2023 = df_2023_date["OnlineMeine"].sum()
-        online_2023_wah = df_2023_date["OnlineWAH"].sum()
-        postal_5 = df_beilage5_date["Postal"].sum()
-        online_5 = df_beilage5_date["OnlineMeine"].sum()
-        online_5_wah = df_beilage5_date["OnlineWAH"].sum()
-
-        # Assert values match
-        assert abs(postal_2023 - postal_5) < 1e-10, f"Postal values don't match for date {date}"
-        assert abs(online_2023 - online_5) < 1e-10, f"Online values don't match for date {date}"
-        assert abs(online_2023_wah - online_5_wah) < 1e-10, f"Online WAH values don't match for date {date}"
+    # Compare the monthly sums of the postal and online values
+    discrepancies = compare_totals(
+        df_2023_overlap,
+        df_beilage5_overlap,
+        keys=["Date"],
+        columns=["Postal", "OnlineMeine", "OnlineWAH"],
+        tolerance=1e-10,
+        labels=("07", "Beilage_5"),
+        how="left",
+    )
+    assert_reconciled(discrepancies, "Beilage_5 values don't match the existing data")
 
     print("Data consistency check passed: Beilage_5 matches existing data")
 
-    # Create grid plots first
-    print("Creating grid plots...")
-    create_grid_processing_time_plot(df_2023, df_historical, df_beilage6, dark_mode=True)
-    create_grid_processing_time_plot(df_2023, df_historical, df_beilage6, dark_mode=False)
+    if bundeslaender is None:
+        # Create grid plots first
+        print("Creating grid plots...")
+        for dark_mode in dark_modes:
+            create_grid_processing_time_plot(df_2023, df_historical, df_beilage6, dark_mode=dark_mode)
 
-    # Create combined plots
-    print("Creating combined plots...")
-    create_combined_processing_time_plot(df_2023, df_historical, df_beilage6, dark_mode=True)
-    create_combined_processing_time_plot(df_2023, df_historical, df_beilage6, dark_mode=False)
+        # Create combined plots
+        print("Creating combined plots...")
+        for dark_mode in dark_modes:
+            create_combined_processing_time_plot(df_2023, df_historical, df_beilage6, dark_mode=dark_mode)
 
-    # Get unique Bundesländer
-    bundeslaender = df_2023["Bundesland_pretty"].unique()
+        # Get unique Bundesländer
+        bundeslaender = df_2023["Bundesland_pretty"].unique()
 
     # Create individual plots for each Bundesland
     for bundesland in bundeslaender:
         print(f"Creating plots for {bundesland}...")
 
-        # Create plots in both dark and light mode
-        create_processing_time_plot(df_2023, df_historical, df_beilage6, bundesland, dark_mode=True)
-        create_processing_time_plot(df_2023, df_historical, df_beilage6, bundesland, dark_mode=False)
+        # Create plots in the requested modes
+        for dark_mode in dark_modes:
+            create_processing_time_plot(df_2023, df_historical, df_beilage6, bundesland, dark_mode=dark_mode)
 
 if __name__ == "__main__":
     main() 
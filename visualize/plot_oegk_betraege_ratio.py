@@ -2,6 +2,7 @@ import pandas as pd
 import matplotlib.pyplot as plt
 import numpy as np
 import os
+from output_profiles import save_figure
 
 # Global settings
 OUTPUT_DIR = "../figures/OEGK/Betraege"  # Output directory for the plot
@@ -148,34 +149,18 @@ def create_plot(input_file, dark_mode=True, is_updated=False):
     else:
         save_kwargs.update({"facecolor": "white", "edgecolor": "none"})
 
-    plt.savefig(filename, **save_kwargs)
+    save_figure(filename, **save_kwargs)
     plt.close()
 
 
-def main():
-    # Original data
-    create_plot(
-        "../data/csv/manually_extracted/OEGK_Betraege.csv",
-        dark_mode=True,
-        is_updated=False,
-    )
-    create_plot(
-        "../data/csv/manually_extracted/OEGK_Betraege.csv",
-        dark_mode=False,
-        is_updated=False,
-    )
-
-    # Updated data
-    create_plot(
-        "../data/csv/manually_extracted/OEGK_Betraege_updated2025.csv",
-        dark_mode=True,
-        is_updated=True,
-    )
-    create_plot(
-        "../data/csv/manually_extracted/OEGK_Betraege_updated2025.csv",
-        dark_mode=False,
-        is_updated=True,
-    )
+def main(dark_modes=(True, False)):
+    # Original and updated data
+    for input_file, is_updated in [
+        ("../data/csv/manually_extracted/OEGK_Betraege.csv", False),
+        ("../data/csv/manually_extracted/OEGK_Betraege_updated2025.csv", True),
+    ]:
+        for dark_mode in dark_modes:
+            create_plot(input_file, dark_mode=dark_mode, is_updated=is_updated)
 
 
 if __name__ == "__main__":
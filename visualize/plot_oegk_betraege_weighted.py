@@ -3,6 +3,7 @@ import matplotlib.pyplot as plt
 import numpy as np
 import os
 import colorsys  # Add this import at the top
+from output_profiles import save_figure
 
 # Global settings
 OUTPUT_DIR = "../figures/OEGK/Betraege"  # Output directory for the plot
@@ -374,7 +375,7 @@ def create_plot(input_file, dark_mode=True, is_updated=False, plot_type="betraeg
     else:
         save_kwargs.update({"facecolor": "white", "edgecolor": "none"})
 
-    plt.savefig(filename, **save_kwargs)
+    save_figure(filename, **save_kwargs)
     plt.close()
 
 
@@ -397,64 +398,22 @@ def check_population_consistency():
             print()
 
 
-def main():
+def main(dark_modes=(True, False)):
     # Check population data consistency
     check_population_consistency()
-    # Original data
-    create_plot(
-        "../data/csv/manually_extracted/OEGK_Betraege.csv",
-        dark_mode=True,
-        is_updated=False,
-        plot_type="betraege",
-    )
-    create_plot(
-        "../data/csv/manually_extracted/OEGK_Betraege.csv",
-        dark_mode=False,
-        is_updated=False,
-        plot_type="betraege",
-    )
-
-    # Updated data
-    create_plot(
-        "../data/csv/manually_extracted/OEGK_Betraege_updated2025.csv",
-        dark_mode=True,
-        is_updated=True,
-        plot_type="betraege",
-    )
-    create_plot(
-        "../data/csv/manually_extracted/OEGK_Betraege_updated2025.csv",
-        dark_mode=False,
-        is_updated=True,
-        plot_type="betraege",
-    )
-
-    # Personal loss plots
-    create_plot(
-        "../data/csv/manually_extracted/OEGK_Betraege.csv",
-        dark_mode=True,
-        is_updated=False,
-        plot_type="personal_loss",
-    )
-    create_plot(
-        "../data/csv/manually_extracted/OEGK_Betraege.csv",
-        dark_mode=False,
-        is_updated=False,
-        plot_type="personal_loss",
-    )
-
-    # Updated personal loss plots
-    create_plot(
-        "../data/csv/manually_extracted/OEGK_Betraege_updated2025.csv",
-        dark_mode=True,
-        is_updated=True,
-        plot_type="personal_loss",
-    )
-    create_plot(
-        "../data/csv/manually_extracted/OEGK_Betraege_updated2025.csv",
-        dark_mode=False,
-        is_updated=True,
-        plot_type="personal_loss",
-    )
+    # Original and updated data, then the personal loss plots for both
+    for plot_type in ["betraege", "personal_loss"]:
+        for input_file, is_updated in [
+            ("../data/csv/manually_extracted/OEGK_Betraege.csv", False),
+            ("../data/csv/manually_extracted/OEGK_Betraege_updated2025.csv", True),
+        ]:
+            for dark_mode in dark_modes:
+                create_plot(
+                    input_file,
+                    dark_mode=dark_mode,
+                    is_updated=is_updated,
+                    plot_type=plot_type,
+                )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,165 @@
+"""Headless batch runner for the plot_*.py scripts in this directory.
+
+Usage (from anywhere; ``warra-plot`` is installed with the repository, see
+pyproject.toml, and is the same as ``python visualize/warra_plot.py``):
+
+    warra-plot --list
+    warra-plot --dataset antraege --theme light --jobs 4
+    warra-plot --dataset antraege_per_bundesland --bundesland Wien --bundesland Tirol
+    warra-plot --profile preview
+
+Every ``plot_<dataset>.py`` module is a plot target. Its ``main()`` may accept
+``dark_modes`` (themes to render) and ``bundeslaender`` (restrict per-Bundesland
+plots); targets without these parameters always render all their variants.
+The output format/resolution is selected with ``--profile`` (see output_profiles.py).
+"""
+import argparse
+import ast
+import glob
+import importlib
+import os
+import sys
+
+import matplotlib
+
+from data.batch_jobs import run_jobs
+from visualize.output_profiles import DEFAULT_PROFILE, OUTPUT_PROFILES, set_output_profile
+
+# Render without a display, also in the worker processes
+matplotlib.use("Agg")
+
+# The plot scripts use paths relative to this directory
+VISUALIZE_DIR = os.path.dirname(os.path.abspath(__file__))
+MODULE_PREFIX = "plot_"
+THEMES = {"dark": (True,), "light": (False,), "all": (True, False)}
+BUNDESLAENDER = [
+    "Burgenland", "Kärnten", "Niederösterreich", "Oberösterreich", "Salzburg",
+    "Steiermark", "Tirol", "Vorarlberg", "Wien",
+]
+
+def discover_targets():
+    """Return the dataset names of all plot_*.py modules, sorted."""
+    return sorted(
+        os.path.splitext(os.path.basename(path))[0][len(MODULE_PREFIX):]
+        for path in glob.glob(os.path.join(VISUALIZE_DIR, MODULE_PREFIX + "*.py"))
+    )
+
+def load_target(dataset):
+    """Import the plot module for a dataset (importing has no side effects)."""
+    if VISUALIZE_DIR not in sys.path:
+        sys.path.insert(0, VISUALIZE_DIR)
+    return importlib.import_module(MODULE_PREFIX + dataset)
+
+def main_parameters(dataset):
+    """Return the parameter names accepted by the target's main().
+
+    Read from the source, so listing and splitting the jobs does not import
+    the targets (and a target with a missing dependency only fails its own jobs).
+    """
+    path = os.path.join(VISUALIZE_DIR, MODULE_PREFIX + dataset + ".py")
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read(), filename=path)
+    for node in tree.body:
+        if isinstance(node, ast.FunctionDef) and node.name == "main":
+            arguments = node.args
+            return {argument.arg for argument in arguments.posonlyargs + arguments.args + arguments.kwonlyargs}
+    return set()
+
+def select_targets(datasets=None):
+    """Return all targets whose name contains one of the given substrings."""
+    targets = discover_targets()
+    if not datasets:
+        return targets
+    return [target for target in targets if any(dataset in target for dataset in datasets)]
+
+def build_jobs(targets, theme="all", bundeslaender=None):
+    """Split the selected targets into independent (dataset, kwargs) jobs.
+
+    Targets that render per Bundesland get one job per requested Bundesland.
+    If Bundesländer are requested, targets without per-Bundesland plots are
+    skipped, and so are targets without theme support unless all themes are
+    requested.
+    """
+    jobs = []
+    for dataset in targets:
+        parameters = main_parameters(dataset)
+        kwargs = {}
+
+        if "dark_modes" in parameters:
+            kwargs["dark_modes"] = THEMES[theme]
+        elif theme == "dark":
+            # Targets without theme support only render light mode
+            continue
+
+        if bundeslaender:
+            if "bundeslaender" not in parameters:
+                continue
+            for bundesland in bundeslaender:
+                jobs.append((dataset, dict(kwargs, bundeslaender=[bundesland])))
+        else:
+            jobs.append((dataset, kwargs))
+    return jobs
+
+def run_job(dataset, kwargs, profile=DEFAULT_PROFILE):
+    """Run a single plot job from inside the visualize directory."""
+    matplotlib.use("Agg")
+    set_output_profile(profile)
+    os.chdir(VISUALIZE_DIR)
+    load_target(dataset).main(**kwargs)
+    return dataset, kwargs
+
+def describe_job(dataset, kwargs):
+    """Short human readable description of a job."""
+    details = []
+    if "dark_modes" in kwargs:
+        details.append("/".join("dark" if dark_mode else "light" for dark_mode in kwargs["dark_modes"]))
+    if "bundeslaender" in kwargs:
+        details.extend(kwargs["bundeslaender"])
+    return f"{dataset} ({', '.join(details)})" if details else dataset
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="warra-plot",
+        description="Render the WARRA figures without a display.",
+    )
+    parser.add_argument(
+        "--dataset", action="append",
+        help="only plot targets whose name contains this string (repeatable)",
+    )
+    parser.add_argument(
+        "--bundesland", action="append", choices=BUNDESLAENDER, metavar="BUNDESLAND",
+        help="only render per-Bundesland plots for this Bundesland (repeatable): %(choices)s",
+    )
+    parser.add_argument("--theme", choices=sorted(THEMES), default="all", help="themes to render (default: all)")
+    parser.add_argument(
+        "--profile", choices=list(OUTPUT_PROFILES), default=DEFAULT_PROFILE,
+        help="output profile: resolution and format of the figures (default: %(default)s)",
+    )
+    parser.add_argument("--jobs", type=int, default=1, help="number of parallel worker processes (default: 1)")
+    parser.add_argument("--list", action="store_true", help="list the selected jobs and exit")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    os.chdir(VISUALIZE_DIR)
+
+    targets = select_targets(args.dataset)
+    if not targets:
+        print(f"No plot targets match {args.dataset}. Available: {', '.join(discover_targets())}")
+        return 1
+
+    jobs = build_jobs(targets, theme=args.theme, bundeslaender=args.bundesland)
+    if args.list:
+        for job in jobs:
+            print(describe_job(*job))
+        return 0
+
+    failures = run_jobs(
+        run_job, jobs, num_jobs=args.jobs, verb="Plotting", describe=lambda job: describe_job(*job),
+        profile=args.profile,
+    )
+    print(f"Finished {len(jobs) - len(failures)} of {len(jobs)} plot jobs")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())